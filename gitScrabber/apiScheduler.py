@@ -0,0 +1,196 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from concurrent.futures import ThreadPoolExecutor
+from httpCache import session
+from urllib.parse import urlparse
+
+import threading
+import time
+
+# Seconds to back off from a secondary rate limit that didn't say how long -
+# doubled with every retry
+backoff_seconds = 60
+
+
+class ApiScheduler():
+    """
+    The ApiScheduler sends the requests to web apis - from the threads of its
+    pool, so that the processes that analyse the projects never wait for the
+    network, and from the threads of the callers.
+
+    It keeps a budget per rate limited resource that is read from the
+    X-RateLimit-Remaining and X-RateLimit-Reset headers of the responses.
+    Once a budget is used up the requests for the resource wait until it is
+    reset. Requests that hit the rate limit anyway are retried once the
+    budget of their resource is reset. Requests that hit a secondary rate
+    limit (403 or 429 with a Retry-After header or the respective message)
+    are retried after backing off - meanwhile no request is sent at all.
+
+    :param  requests:  The number of requests that are sent concurrently by
+                       the threads of the pool
+    :param  retries:   The number of times a rate limited request is retried
+    """
+
+    def __init__(self, requests=4, retries=5):
+        self.__requests = requests
+        self.__retries = retries
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.__budgets = {}
+        self.__blocked_until = 0
+
+    def submit(self, function, *args):
+        """
+        Runs the function in a thread of the pool - the requests it sends
+        through request are sent concurrently to the ones of the other
+        threads
+
+        :param    function:  The function to run
+        :param    args:      The arguments of the function
+
+        :returns: The concurrent.futures.Future of the result
+        """
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(
+                    max_workers=self.__requests)
+        return self.__executor.submit(function, *args)
+
+    def __wait(self, resource):
+        """
+        Waits until a request for the resource may be sent and takes it from
+        the budget of the resource
+
+        :param    resource:  The rate limited resource
+        """
+        while True:
+            with self.__lock:
+                now = time.time()
+                delay = self.__blocked_until - now
+                budget = self.__budgets.get(resource)
+
+                if delay <= 0 and budget is not None and budget[0] <= 0:
+                    delay = budget[1] - now
+                    if delay <= 0:
+                        del self.__budgets[resource]  # reset
+                        budget = None
+
+                if delay <= 0:
+                    if budget is not None:
+                        budget[0] -= 1
+                    return
+            time.sleep(delay)
+
+    def __update_budget(self, resource, response):
+        """
+        Updates the budget of the resource by the rate limit headers of the
+        response
+
+        :param    resource:  The rate limited resource
+        :param    response:  The response
+        """
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+
+        with self.__lock:
+            self.__budgets[resource] = [int(remaining), int(reset)]
+
+    def __backoff(self, resource, response, attempt):
+        """
+        Checks weather the request was rate limited - if the primary rate
+        limit of the resource was hit its budget is used up until the reset,
+        so that only the requests for the resource wait for it
+
+        :param    resource:  The rate limited resource
+        :param    response:  The response
+        :param    attempt:   The number of retries of the request so far
+
+        :returns: The number of seconds no request at all may be sent before
+                  the request is retried or None if the request wasn't rate
+                  limited
+        """
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None and retry_after.isdigit():
+            return int(retry_after)
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = int(response.headers.get('X-RateLimit-Reset', 0))
+            with self.__lock:
+                self.__budgets[resource] = [0, max(reset, time.time()) + 1]
+            return 0
+        if (response.status_code == 429
+                or 'secondary rate limit' in response.text.lower()):
+            return backoff_seconds * 2 ** attempt
+        return None  # forbidden for another reason
+
+    def request(self, method, url, resource=None, **kwargs):
+        """
+        Sends a request through the session of the process once the rate
+        limits allow it
+
+        :param    method:    The HTTP method
+        :param    url:       The url
+        :param    resource:  The name of the rate limited resource - defaults
+                             to the host of the url. The GitHub api limits
+                             the GraphQL api apart from the REST api.
+        :param    kwargs:    The arguments passed on to requests
+
+        :returns: The requests.Response - it is only rate limited if it still
+                  was after all retries
+        """
+        if resource is None:
+            resource = urlparse(url).netloc
+
+        attempt = 0
+        while True:
+            self.__wait(resource)
+            response = session().request(method, url, **kwargs)
+            self.__update_budget(resource, response)
+
+            delay = self.__backoff(resource, response, attempt)
+            if delay is None or attempt >= self.__retries:
+                return response
+
+            attempt += 1
+            if delay > 0:
+                with self.__lock:
+                    self.__blocked_until = max(self.__blocked_until,
+                                               time.time() + delay)
+
+    def close(self):
+        """
+        Stops the threads of the pool - functions that didn't start yet are
+        cancelled
+        """
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -137,6 +137,20 @@ def __setup_parser():
                               type=PathType(exists=None, type='file'),
                               default=None,
                               help="Path where the report will be saved to")
+    program_args.add_argument('-s', '--store',
+                              type=PathType(exists=None, type='dir'),
+                              default=None,
+                              help="Directory of a report store that keeps "
+                              "the report of every project in its own file. "
+                              "It is used as old report and the new report "
+                              "is saved to it - only the projects that "
+                              "changed are written")
+    program_args.add_argument('--export-yaml',
+                              type=PathType(exists=None, type='file'),
+                              default=None,
+                              help="Path where the report will be exported to "
+                              "as yaml file - handy in combination with "
+                              "--store")
     program_args.add_argument('-c', '--config',
                               type=PathType(exists=True, type='file'),
                               default=None,
@@ -154,6 +168,43 @@ def __setup_parser():
                               action='store_true',
                               help="Before scrabbing the tool will try to "
                               "update the sources")
+    program_args.add_argument('--clone',
+                              type=str,
+                              choices=['auto', 'full', 'blobless', 'shallow'],
+                              default='auto',
+                              help="How the git repositories are cloned - "
+                              "'auto' clones only the history the tasks need"
+                              " - defaults to auto")
+    program_args.add_argument('--acquisitions',
+                              type=int,
+                              default=8,
+                              help="Number of projects that are cloned, "
+                              "updated or downloaded concurrently - besides "
+                              "the analysis - defaults to 8")
+    program_args.add_argument('--fetches-per-host',
+                              type=int,
+                              default=4,
+                              help="Number of git and svn projects of the "
+                              "same host that are updated concurrently - "
+                              "defaults to 4")
+    program_args.add_argument('--timeout',
+                              type=int,
+                              default=None,
+                              help="Number of seconds after which cloning or "
+                              "updating a repository is aborted - defaults "
+                              "to no limit")
+    program_args.add_argument('--api-requests',
+                              type=int,
+                              default=4,
+                              help="Number of requests to web apis that are "
+                              "sent concurrently while the projects are "
+                              "acquired - defaults to 4")
+    program_args.add_argument('--resume',
+                              action='store_true',
+                              default=False,
+                              help="Skips the projects that were done by a "
+                              "previous run that crashed or was aborted - "
+                              "if their tasks didn't change")
     program_args.add_argument('-p', '--print',
                               action='store_true',
                               default=False,
@@ -174,6 +225,17 @@ def __setup_parser():
                              default=None,
                              help="Access token for github to work with a "
                              "higher query limit against their api")
+    global_args.add_argument('--http-cache-ttl',
+                             type=int,
+                             default=None,
+                             help="Number of seconds a cached api response is "
+                             "used without asking the server if it changed "
+                             "- defaults to asking every time")
+    global_args.add_argument('--offline',
+                             action='store_true',
+                             default=False,
+                             help="Answers the api requests of the tasks "
+                             "from the cache only")
     return parser
 
 
@@ -197,6 +259,73 @@ def __check_overwrite(parser, args):
                      '--force override'.format(args.output))
 
 
+def __check_store(parser, args):
+    """
+    Checks weather a --store was combined with an old --report
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.store and args.report:
+        parser.error('The report store already holds the old report - '
+                     '--report can not be combined with --store')
+
+
+def __check_acquisitions(parser, args):
+    """
+    Checks weather at least one project may be acquired at once
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.acquisitions < 1:
+        parser.error('--acquisitions has to be at least 1')
+
+
+def __check_fetches_per_host(parser, args):
+    """
+    Checks weather at least one project per host may be updated at once
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.fetches_per_host < 1:
+        parser.error('--fetches-per-host has to be at least 1')
+
+
+def __check_timeout(parser, args):
+    """
+    Checks weather the timeout leaves the commands any time
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.timeout is not None and args.timeout < 1:
+        parser.error('--timeout has to be at least 1')
+
+
+def __check_api_requests(parser, args):
+    """
+    Checks weather at least one api request may be sent at once
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.api_requests < 1:
+        parser.error('--api-requests has to be at least 1')
+
+
+def __check_http_cache_ttl(parser, args):
+    """
+    Checks weather the TTL of the http cache isn't negative
+
+    :param    parser:  The parser used to raise an error message
+    :param    args:    The arguments that were passed to the program
+    """
+    if args.http_cache_ttl is not None and args.http_cache_ttl < 0:
+        parser.error('--http-cache-ttl must not be negative')
+
+
 def __check_tasks(parser, args):
     """
     Checks weather a --tasks file was provided
@@ -217,6 +346,12 @@ def __check_arguments(parser, args):
     :param  args:    The arguments
     """
     __check_overwrite(parser, args)
+    __check_store(parser, args)
+    __check_acquisitions(parser, args)
+    __check_fetches_per_host(parser, args)
+    __check_timeout(parser, args)
+    __check_api_requests(parser, args)
+    __check_http_cache_ttl(parser, args)
     __check_tasks(parser, args)
 
 
@@ -0,0 +1,150 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+import json
+import os
+
+
+class CheckpointJournal():
+    """
+    Journal the subreports of the projects are appended to as soon as they are
+    done - if a run crashes the projects that were done already don't have to
+    be scrabbed again when the run is resumed.
+
+    Every entry is a single line of json that holds the project id, the
+    versions and parameters of the project tasks that generated the subreport
+    and the subreport itself. Every entry is written with a single write and
+    synced to disk, a partially written last line of a crashed run is ignored.
+
+    :param  path:    The path of the journal file
+    :param  resume:  Weather the entries of the journal of a previous run shall
+                     be reused - otherwise the journal is started anew
+    """
+
+    def __init__(self, path, resume=False):
+        self.__path = path
+        self.__resume = resume
+        self.__tasks = None
+        self.__entries = {}
+        self.__file = None
+
+    def __load(self, tasks):
+        """
+        Loads the entries of a previous run that were generated by the same
+        project tasks
+
+        :param    tasks:  The versions and parameters of the project tasks
+
+        :returns: Dictionary with the project id as key and the subreport as
+                  value
+        """
+        entries = {}
+        if not os.path.isfile(self.__path):
+            return entries
+
+        with open(self.__path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # the line was written partially by a crash
+
+                if entry['tasks'] == tasks:
+                    entries[entry['project']] = entry['report']
+        return entries
+
+    def __terminated(self):
+        """
+        :returns: True if the journal is empty or its last line is complete
+        """
+        if not os.path.isfile(self.__path):
+            return True
+
+        with open(self.__path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def begin(self, tasks):
+        """
+        Opens the journal for a run of the given project tasks
+
+        :param    tasks:  The versions and parameters of the project tasks as
+                          they are written to the report
+        """
+        self.__tasks = json.loads(json.dumps(tasks, default=str))
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+
+        if self.__resume:
+            self.__entries = self.__load(self.__tasks)
+            terminated = self.__terminated()
+            self.__file = open(self.__path, 'a')
+            if not terminated:
+                # the partial last line of a crash has to be terminated to keep
+                # the next entry readable
+                self.__file.write('\n')
+        else:
+            self.__file = open(self.__path, 'w')
+
+    def lookup(self, project_id):
+        """
+        Looks up the subreport of a project that was done in a previous run
+
+        :param    project_id:  The id of the project
+
+        :returns: The subreport of the project or None
+        """
+        return self.__entries.get(project_id)
+
+    def append(self, project_id, report):
+        """
+        Appends the subreport of a project to the journal
+
+        :param    project_id:  The id of the project
+        :param    report:      The subreport of the project
+        """
+        line = json.dumps({
+            'project': project_id,
+            'tasks': self.__tasks,
+            'report': report
+        }, default=str)
+
+        self.__file.write(line + '\n')
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def remove(self):
+        """
+        Closes and removes the journal - once the report is saved it is no
+        longer needed
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+        if os.path.isfile(self.__path):
+            os.remove(self.__path)
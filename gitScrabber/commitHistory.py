@@ -0,0 +1,315 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+import os
+import pickle
+import utils
+
+historyVersion = 2
+
+# One line per commit: hash, parents, mailmapped author name, committer
+# timestamp and ISO committer date
+_log_format = '%H%x00%P%x00%aN%x00%ct%x00%cI'
+
+
+class CommitHistory():
+    """
+    Index of the commit history of a git repository that is shared by the
+    GitTasks of a project. It is built on first use from a single streamed
+    'git log' pass over all refs instead of one history traversal per task.
+
+    The commits are listed in topological order - all children of a commit
+    are listed before the commit itself - so that the reachability from HEAD
+    and along the first parents of the refs is known as soon as a commit is
+    read and only the aggregates have to be kept, not the whole graph.
+
+    The aggregates are persisted together with the HEAD they were built for.
+    Later runs only stream the commits that are not reachable from that HEAD
+    - after a pull mostly the new ones - and add them to the aggregates. The
+    index is rebuilt from scratch if the old HEAD is no longer an ancestor of
+    HEAD (e.g. after a force-push), if a shallow clone was deepened or if the
+    .mailmap changed.
+
+    :param  location:    The location of the repository
+    :param  cache_path:  The file the aggregates are persisted in or None if
+                         they shouldn't be persisted
+    """
+
+    def __init__(self, location, cache_path=None):
+        self.__location = location
+        self.__cache_path = cache_path
+        self.__authors = None
+        self.__first_commit = None
+        self.__last_commit = None
+
+    def __head(self):
+        """
+        :returns: The hash of the HEAD commit or None if the repository has
+                  no commits
+        """
+        try:
+            return utils.run('git', ['rev-parse', '--verify', '--quiet',
+                                     'HEAD^{commit}'],
+                             self.__location).strip()
+        except Exception as e:
+            return None
+
+    def __tips(self):
+        """
+        :returns: Dictionary with the hashes of the commits the refs point to
+                  as key and a tuple of their committer timestamp and ISO
+                  committer date as value
+        """
+        tips = {}
+        for line in utils.run('git', ['log', '--all', '--no-walk',
+                                      '--format=%H %ct %cI'],
+                              self.__location).splitlines():
+            commit, timestamp, date = line.split()
+            tips[commit] = (int(timestamp), date)
+        return tips
+
+    def __is_shallow(self):
+        """
+        :returns: True if the repository is a shallow clone
+        """
+        return utils.run('git', ['rev-parse', '--is-shallow-repository'],
+                         self.__location).strip() == 'true'
+
+    def __mailmap(self):
+        """
+        :returns: The blob id of the .mailmap of HEAD or None if there is none
+                  - the author names of all commits depend on it
+        """
+        try:
+            return utils.run('git', ['rev-parse', '--verify', '--quiet',
+                                     'HEAD:.mailmap'],
+                             self.__location).strip()
+        except Exception as e:
+            return None
+
+    def __is_ancestor(self, ancestor, commit):
+        """
+        :param    ancestor:  The hash of the possible ancestor
+        :param    commit:    The hash of the commit
+
+        :returns: True if ancestor is an ancestor of commit - False if it
+                  isn't or doesn't exist anymore
+        """
+        try:
+            utils.run('git', ['merge-base', '--is-ancestor', ancestor,
+                              commit], self.__location)
+            return True
+        except Exception as e:
+            return False
+
+    def __commits(self, excluded):
+        """
+        Streams the commits of all refs in topological order
+
+        :param    excluded:  The hash of the commit whose ancestors (including
+                             itself) are left out or None
+
+        :returns: Generator of tuples of the hash, the list of parent hashes,
+                  the author, the committer timestamp and the ISO committer
+                  date of the commits
+        """
+        args = ['log', '--all', '--topo-order', '--format=' + _log_format]
+        if excluded is not None:
+            args.append('^' + excluded)
+
+        for line in utils.stream('git', args, self.__location):
+            commit, parents, author, timestamp, date = line.split('\0')
+            yield (commit, parents.split(), author, int(timestamp), date)
+
+    def __first_parent_roots(self, commits):
+        """
+        :param    commits:  The hashes of the commits to start from
+
+        :returns: List of tuples of the committer timestamp and the ISO
+                  committer date of the root commits that are reached by
+                  following the first parents of the commits
+        """
+        roots = []
+        for line in utils.run('git', ['log', '--first-parent',
+                                      '--max-parents=0', '--format=%ct %cI']
+                              + sorted(commits),
+                              self.__location).splitlines():
+            timestamp, date = line.split()
+            roots.append((int(timestamp), date))
+        return roots
+
+    def __add_commits(self, head, tips, excluded, known_tips=()):
+        """
+        Adds the commits that are not reachable from excluded to the
+        aggregates:
+        - the number of commits per author that are no merges and reachable
+          from HEAD (like 'git shortlog -s --no-merges')
+        - the root commit reached by following the first parents of the refs
+          that was committed first
+
+        :param    head:        The hash of the HEAD commit
+        :param    tips:        The hashes of the commits the refs point to
+        :param    excluded:    The hash of the commit whose ancestors were
+                               already added or None
+        :param    known_tips:  The hashes of the commits the refs pointed to
+                               when the commits reachable from excluded were
+                               added
+        """
+        from_head = {head}
+        first_parents = set(tips)
+
+        for commit, parents, author, timestamp, date in self.__commits(
+                excluded):
+            if commit in from_head:
+                from_head.remove(commit)
+                from_head.update(parents)
+                if len(parents) < 2:
+                    self.__authors[author] = self.__authors.get(author, 0) + 1
+
+            if commit in first_parents:
+                first_parents.remove(commit)
+                if parents:
+                    first_parents.add(parents[0])
+                elif (self.__first_commit is None
+                      or timestamp < self.__first_commit[0]):
+                    self.__first_commit = (timestamp, date)
+
+        # first parents that lead into the commits that were added before -
+        # unless a ref pointed to them back then, e.g. a new branch of a
+        # merged side branch, the roots they lead to weren't followed yet
+        unknown = first_parents - set(known_tips)
+        if excluded is not None and unknown:
+            roots = self.__first_parent_roots(unknown)
+            if self.__first_commit is not None:
+                roots.append(self.__first_commit)
+            if roots:
+                self.__first_commit = min(roots)
+
+    def __load(self):
+        """
+        :returns: The persisted aggregates or None if there are none or they
+                  were persisted by another version
+        """
+        if self.__cache_path is None:
+            return None
+        try:
+            with open(self.__cache_path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            return None  # no or unreadable index - it is rebuilt
+
+        if state.get('historyVersion') != historyVersion:
+            return None
+        return state
+
+    def __save(self, head, tips, shallow, mailmap):
+        """
+        Persists the aggregates
+
+        :param    head:     The hash of the HEAD commit they were built for
+        :param    tips:     The hashes of the commits the refs point to
+        :param    shallow:  Weather the repository is a shallow clone
+        :param    mailmap:  The blob id of the .mailmap they were built with
+        """
+        if self.__cache_path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.__cache_path), exist_ok=True)
+        tmp_path = self.__cache_path + '.tmp'
+
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'historyVersion': historyVersion,
+                'head': head,
+                'tips': set(tips),
+                'shallow': shallow,
+                'mailmap': mailmap,
+                'authors': self.__authors,
+                'first_commit': self.__first_commit
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.__cache_path)
+
+    def __build(self):
+        """
+        Builds the index on first use - from the persisted aggregates if
+        possible
+        """
+        if self.__authors is not None:
+            return
+
+        self.__authors = {}
+        head = self.__head()
+        if head is None:
+            return  # no commits - e.g. an empty repository
+
+        tips = self.__tips()
+        self.__last_commit = max(tips.values())
+        shallow = self.__is_shallow()
+        mailmap = self.__mailmap()
+        state = self.__load()
+
+        if (state is not None and state['shallow'] == shallow
+                and state['mailmap'] == mailmap
+                and (state['head'] == head
+                     or self.__is_ancestor(state['head'], head))):
+            self.__authors = state['authors']
+            self.__first_commit = state['first_commit']
+
+            if state['head'] == head and state['tips'] == set(tips):
+                return  # nothing changed since the last run
+            self.__add_commits(head, tips, state['head'], state['tips'])
+        else:
+            self.__add_commits(head, tips, None)
+        self.__save(head, tips, shallow, mailmap)
+
+    def author_commits(self):
+        """
+        :returns: List of tuples of the number of commits and the name of the
+                  authors of the commits reachable from HEAD that are no
+                  merges, ordered by the number of commits like the output of
+                  'git shortlog -s -n --no-merges'
+        """
+        self.__build()
+        return sorted(((count, author)
+                       for author, count in self.__authors.items()),
+                      key=lambda entry: (-entry[0], entry[1]))
+
+    def first_commit_date(self):
+        """
+        :returns: The ISO committer date of the first root commit that is
+                  reached by following the first parents of the refs
+                  (2005-04-16T15:20:36-07:00) or None if there are no commits
+        """
+        self.__build()
+        return None if self.__first_commit is None else self.__first_commit[1]
+
+    def last_commit_date(self):
+        """
+        :returns: The ISO committer date of the commit of the refs that was
+                  committed last (2017-08-03T15:25:14-07:00) or None if there
+                  are no commits
+        """
+        self.__build()
+        return None if self.__last_commit is None else self.__last_commit[1]
@@ -0,0 +1,183 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+import hashlib
+import os
+import pickle
+
+cacheVersion = 2
+
+
+class FileCache():
+    """
+    Persistent cache of the results the FileTasks returned for the single files
+    of a project. Files that didn't change since the last run don't have to be
+    scrabbed again - their cached results are added to the tasks instead.
+
+    A file is identified by its git blob id, as provided by the file source,
+    if the project is a git (or git svn) repository and by its size,
+    modification time and md5 sum otherwise.
+    The results are only valid for the same version and parameter of a task.
+
+    :param  project:     The project the files belong to
+    :param  signatures:  Dictionary with the task name as key and a tuple of
+                         the task version and the md5 sum of the task
+                         parameter as value
+    """
+
+    def __init__(self, project, signatures):
+        self.__signatures = signatures
+        self.__path = os.path.join(project.cache_location, 'files.pickle')
+        self.__cached = None
+        self.__entries = {}
+
+    def __ensure_loaded(self):
+        """
+        Loads the cached results on first use - a cache that only merges and
+        saves entries of other caches never needs them
+        """
+        if self.__cached is None:
+            self.__cached = self.__load()
+
+    def __load(self):
+        """
+        Loads the cached results and drops the results of tasks whose version
+        or parameter changed
+
+        :returns: Dictionary with the relative file path as key and a tuple of
+                  the file id and the results as value
+        """
+        try:
+            with open(self.__path, 'rb') as f:
+                cache = pickle.load(f)
+        except Exception as e:
+            return {}  # no or unreadable cache - everything is scrabbed
+
+        if cache.get('cacheVersion') != cacheVersion:
+            return {}
+
+        valid = set(task for task in cache['tasks']
+                    if cache['tasks'][task] == self.__signatures.get(task))
+        files = {}
+        for path, (file_id, results) in cache['files'].items():
+            files[path] = (file_id, {task: results[task] for task in results
+                                     if task in valid})
+        return files
+
+    def __md5(self, filepath):
+        """
+        Calculates the md5 sum of the file contents
+
+        :param    filepath:  The file path of the file
+
+        :returns: The md5 sum of the file contents
+        """
+        md5 = hashlib.md5()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(chunk)
+        return md5.hexdigest()
+
+    def lookup(self, relative_path, filepath, blob_id=None):
+        """
+        Looks up the cached results of a file
+
+        :param    relative_path:  The file path relative to the project
+        :param    filepath:       The file path of the file
+        :param    blob_id:        The git blob id of the file or None if the
+                                  file isn't tracked by git
+
+        :returns: Tuple of the current file id and a dictionary with the task
+                  name as key and the cached result as value
+        """
+        self.__ensure_loaded()
+        cached_id, results = self.__cached.get(relative_path, (None, {}))
+
+        if blob_id is not None:
+            if blob_id == cached_id:
+                return (blob_id, results)
+            return (blob_id, {})
+
+        stat = os.stat(filepath)
+        file_stat = (stat.st_size, stat.st_mtime_ns)
+
+        if isinstance(cached_id, tuple) and cached_id[0] == file_stat:
+            return (cached_id, results)
+
+        file_id = (file_stat, self.__md5(filepath))
+        if (isinstance(cached_id, tuple)
+                and cached_id[1] == file_id[1]):
+            return (file_id, results)
+        return (file_id, {})
+
+    def store(self, relative_path, file_id, results):
+        """
+        Stores the results of a file - results of tasks that were not run this
+        time are kept if they are still valid
+
+        :param    relative_path:  The file path relative to the project
+        :param    file_id:        The file id returned by lookup
+        :param    results:        Dictionary with the task name as key and the
+                                  result of the task as value
+        """
+        self.__ensure_loaded()
+        cached_id, cached = self.__cached.get(relative_path, (None, {}))
+
+        if cached_id == file_id or (isinstance(cached_id, tuple)
+                                    and isinstance(file_id, tuple)
+                                    and cached_id[1] == file_id[1]):
+            results = {**cached, **results}
+        self.__entries[relative_path] = (file_id, results)
+
+    def entries(self):
+        """
+        :returns: The entries stored since this cache was created - these can
+                  be merged into the cache of another runner with update
+        """
+        return self.__entries
+
+    def update(self, entries):
+        """
+        Adds the entries that were stored by the cache of another runner
+
+        :param    entries:  The entries returned by entries
+        """
+        self.__entries.update(entries)
+
+    def save(self):
+        """
+        Writes the stored entries to disk - files that were not stored since
+        this cache was created are dropped from the cache
+        """
+        os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+        tmp_path = self.__path + '.tmp'
+
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'cacheVersion': cacheVersion,
+                'tasks': self.__signatures,
+                'files': self.__entries
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.__path)
@@ -0,0 +1,418 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+import io
+import os
+import subprocess
+import utils
+
+# Like the file system, more symlinks in a path are considered a loop
+max_symlinks = 40
+
+
+class WalkFileSource():
+    """
+    Provides the files of a project by walking its directory - hidden files
+    and directories are ignored. Used for projects that are no git
+    repositories like archives.
+
+    :param  location:  The location of the project
+    """
+
+    def __init__(self, location):
+        self.__location = location
+
+    def files(self):
+        """
+        :returns: Generator of the paths of the files relative to the location
+                  of the project
+        """
+        for dirpath, dirs, filenames in os.walk(self.__location,
+                                                topdown=True):
+            # ignore hidden / git directories
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+
+            for file in filenames:
+                if file[0] == '.':
+                    continue  # ignore hidden / git files
+                path = os.path.join(dirpath, file)
+                if os.path.isfile(path):
+                    yield path[len(self.__location)+1:]
+
+    def blob_id(self, relative_path):
+        """
+        :param    relative_path:  The path of the file relative to the project
+
+        :returns: None as the files have no blob ids
+        """
+        return None
+
+    def size(self, relative_path):
+        """
+        :param    relative_path:  The path of the file relative to the project
+
+        :returns: The size of the file in bytes
+        """
+        return os.path.getsize(os.path.join(self.__location, relative_path))
+
+    def open(self, relative_path):
+        """
+        :param    relative_path:  The path of the file relative to the project
+
+        :returns: The file opened for reading bytes
+        """
+        return open(os.path.join(self.__location, relative_path), 'rb')
+
+    def close(self):
+        """
+        Releases the resources of the source
+        """
+        pass
+
+
+class BlobReader(io.RawIOBase):
+    """
+    Reads the contents of a single blob from the output of a
+    'git cat-file --batch' process - only as much as is read is taken from
+    the process. The rest of the blob is skipped once the reader is closed,
+    so that the process can answer the next request.
+
+    :param  stream:  The stdout of the 'git cat-file --batch' process
+    :param  size:    The size of the blob in bytes
+    """
+
+    def __init__(self, stream, size):
+        super(BlobReader, self).__init__()
+        self.__stream = stream
+        self.__remaining = size
+
+    def readable(self):
+        """
+        :returns: True as the reader can be read
+        """
+        return True
+
+    def readinto(self, buffer):
+        """
+        Reads the next bytes of the blob into the buffer
+
+        :param    buffer:  The buffer to read into
+
+        :returns: The number of bytes read - 0 at the end of the blob
+        """
+        size = min(len(buffer), self.__remaining)
+        if size == 0:
+            return 0
+        data = self.__stream.read(size)
+        buffer[:len(data)] = data
+        self.__remaining -= len(data)
+        return len(data)
+
+    def readall(self):
+        """
+        :returns: The remaining bytes of the blob
+        """
+        data = self.__stream.read(self.__remaining)
+        self.__remaining -= len(data)
+        return data
+
+    def close(self):
+        """
+        Skips the rest of the blob and the line break after it
+        """
+        if not self.closed:
+            while self.__remaining > 0:
+                skipped = self.__stream.read(
+                    min(self.__remaining, 1024 * 1024))
+                if not skipped:
+                    break
+                self.__remaining -= len(skipped)
+            self.__stream.read(1)
+        super(BlobReader, self).close()
+
+
+class GitFileSource():
+    """
+    Provides the files of a git repository straight from its object database
+    - no checkout is needed, so that bare and blobless repositories work as
+    well. The tracked files and their sizes are listed with 'git ls-tree' and
+    their contents are streamed through a single long-lived
+    'git cat-file --batch' process.
+
+    The files are the ones WalkFileSource finds in a checkout of the
+    revision: hidden files and directories and submodules are ignored,
+    symlinks to files of the repository are followed and provide the
+    contents of their target, symlinks to directories, to missing files and
+    to files outside of the repository are ignored. The paths are decoded
+    like the file system paths of os.walk.
+
+    :param  location:  The location of the repository
+    :param  revision:  The revision whose files are provided
+    """
+
+    def __init__(self, location, revision='HEAD'):
+        self.__location = location
+        self.__revision = revision
+        self.__blobs = {}
+        self.__sizes = {}
+        self.__process = None
+        self.__checker = None
+        self.__reader = None
+
+    def __has_revision(self):
+        """
+        :returns: True if the revision exists - it doesn't in a repository
+                  without commits
+        """
+        try:
+            utils.run('git', ['rev-parse', '--verify', '--quiet',
+                              self.__revision + '^{tree}'], self.__location)
+            return True
+        except Exception as e:
+            return False
+
+    def __is_partial(self):
+        """
+        :returns: True if the repository is a partial (e.g. blobless) clone
+                  that fetches missing blobs on demand
+        """
+        try:
+            utils.run('git', ['config', '--get', 'extensions.partialClone'],
+                      self.__location)
+            return True
+        except Exception as e:
+            return False
+
+    def __list_tree(self):
+        """
+        Lists the blobs of the revision - with their sizes unless the
+        repository is a partial clone, which would have to fetch every blob
+        for its size
+
+        :returns: Dictionary with the path as key and a tuple of the mode and
+                  the blob id as value
+        """
+        listing = ['-r', '-z']
+        if not self.__is_partial():
+            listing.append('-l')
+
+        tree = utils.run('git', ['ls-tree'] + listing + [self.__revision],
+                         self.__location, errors='surrogateescape')
+        entries = {}
+        for entry in tree.split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            meta = meta.split()
+            if meta[1] != 'blob':
+                continue  # submodules
+
+            entries[path] = (meta[0], meta[2])
+            if len(meta) == 4:
+                self.__sizes[meta[2]] = int(meta[3])
+        return entries
+
+    def __resolve(self, path, entries):
+        """
+        Resolves a symlink of the revision like the file system resolves it
+        in a checkout - symlinks in the target are resolved as well
+
+        :param    path:     The path of the symlink
+        :param    entries:  The blobs of the revision as listed by
+                            __list_tree
+
+        :returns: The blob id of the file the symlink points to or None if it
+                  points to a directory, a missing file or outside of the
+                  repository
+        """
+        parts = path.split('/')
+        resolved = []
+        links = 0
+        while parts:
+            part = parts.pop(0)
+            if part in ('', '.'):
+                continue
+            if part == '..':
+                if not resolved:
+                    return None  # outside of the repository
+                resolved.pop()
+                continue
+
+            mode, blob_id = entries.get('/'.join(resolved + [part]),
+                                        (None, None))
+            if mode != '120000':
+                resolved.append(part)
+                continue
+
+            links += 1
+            target = os.fsdecode(self.__read_blob(blob_id))
+            if links > max_symlinks or target.startswith('/'):
+                return None  # a loop or outside of the repository
+            parts = target.split('/') + parts
+
+        mode, blob_id = entries.get('/'.join(resolved), (None, None))
+        if mode is None or not mode.startswith('100'):
+            return None  # a directory or missing
+        return blob_id
+
+    def files(self):
+        """
+        Lists the files tracked in the revision
+
+        :returns: List of the paths of the files relative to the location of
+                  the repository
+        """
+        self.__blobs = {}
+        if not self.__has_revision():
+            return []
+
+        entries = self.__list_tree()
+        for path, (mode, blob_id) in entries.items():
+            if any(part.startswith('.') for part in path.split('/')):
+                continue  # hidden files and directories
+            if mode == '120000':
+                blob_id = self.__resolve(path, entries)
+                if blob_id is None:
+                    continue
+            self.__blobs[path] = blob_id
+        return list(self.__blobs)
+
+    def blob_id(self, relative_path):
+        """
+        :param    relative_path:  The path of the file relative to the
+                                  repository
+
+        :returns: The id of the blob of the file
+        """
+        return self.__blobs[relative_path]
+
+    def size(self, relative_path):
+        """
+        The sizes are listed with the files - unless the repository is a
+        partial clone, then they are asked from a single long-lived
+        'git cat-file --batch-check' process
+
+        :param    relative_path:  The path of the file relative to the
+                                  repository
+
+        :returns: The size of the file in bytes
+        """
+        blob_id = self.blob_id(relative_path)
+        if blob_id not in self.__sizes:
+            if self.__checker is None:
+                self.__checker = self.__start('--batch-check')
+            self.__sizes[blob_id] = self.__request(
+                self.__checker, blob_id, relative_path)
+        return self.__sizes[blob_id]
+
+    def __start(self, mode):
+        """
+        :param    mode:  The mode of git cat-file, '--batch' or
+                         '--batch-check'
+
+        :returns: The started 'git cat-file' process
+        """
+        return subprocess.Popen(
+            ['git', 'cat-file', mode], cwd=self.__location,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def __request(self, process, blob_id, description):
+        """
+        Requests a blob from a 'git cat-file' process
+
+        :param    process:      The 'git cat-file' process
+        :param    blob_id:      The id of the blob
+        :param    description:  What the blob is, for the error message
+
+        :returns: The size of the blob in bytes
+        """
+        process.stdin.write(blob_id.encode() + b'\n')
+        process.stdin.flush()
+
+        header = process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b'blob':
+            raise Exception(
+                "Can't read the blob '{}' of '{}' in '{}'".format(
+                    blob_id, description, self.__location))
+        return int(header[2])
+
+    def __open_blob(self, blob_id, description):
+        """
+        Opens a blob - the contents are read from the 'git cat-file --batch'
+        process as they are needed. Opening the next blob closes the previous
+        one.
+
+        :param    blob_id:      The id of the blob
+        :param    description:  What the blob is, for the error message
+
+        :returns: The contents of the blob as file object for reading bytes
+        """
+        if self.__reader is not None:
+            self.__reader.close()
+        if self.__process is None:
+            self.__process = self.__start('--batch')
+
+        self.__sizes[blob_id] = self.__request(self.__process, blob_id,
+                                               description)
+        self.__reader = BlobReader(self.__process.stdout,
+                                   self.__sizes[blob_id])
+        return self.__reader
+
+    def __read_blob(self, blob_id):
+        """
+        :param    blob_id:  The id of the blob
+
+        :returns: The contents of the blob as bytes
+        """
+        with self.__open_blob(blob_id, blob_id) as blob:
+            return blob.read()
+
+    def open(self, relative_path):
+        """
+        Opens a file from the object database - the contents are read from the
+        'git cat-file --batch' process as they are needed. Opening the next
+        file closes the previous one.
+
+        :param    relative_path:  The path of the file relative to the
+                                  repository
+
+        :returns: The contents of the file as file object for reading bytes
+        """
+        return self.__open_blob(self.blob_id(relative_path), relative_path)
+
+    def close(self):
+        """
+        Stops the 'git cat-file' processes
+        """
+        if self.__reader is not None:
+            self.__reader.close()
+            self.__reader = None
+        for process in (self.__process, self.__checker):
+            if process is not None:
+                process.stdin.close()
+                process.wait()
+                process.stdout.close()
+        self.__process = None
+        self.__checker = None
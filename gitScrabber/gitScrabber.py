@@ -25,18 +25,32 @@ THE SOFTWARE.
 
 from taskExecutionManager import TaskExecutionManager
 from scrabTaskManager import ScrabTaskManager
+from reportStore import YamlReportStore, DirectoryReportStore
+from checkpointJournal import CheckpointJournal
 import argHandler
 
 import ruamel.yaml
+import os
 
 
 class GlobalArgs():
     """
     Helper class that holds the global arguments.
+
+    :param  github_token:    Access token for the github api or None
+    :param  http_cache:      Directory the responses of web apis are cached in
+                             or None
+    :param  http_cache_ttl:  Number of seconds a cached response is used
+                             without revalidating it or None
+    :param  offline:         Weather only cached responses are used
     """
 
-    def __init__(self, github_token):
+    def __init__(self, github_token, http_cache=None, http_cache_ttl=None,
+                 offline=False):
         self.github_token = github_token
+        self.http_cache = http_cache
+        self.http_cache_ttl = http_cache_ttl
+        self.offline = offline
 
 
 class GitScrabber:
@@ -51,11 +65,33 @@ class GitScrabber:
     :param  data_dir:     directory path where the repositories will be cloned
                           to
     :param  printing      If the report should be printed to stdout
+    :param  update:       Weather the projects should be updated
     :param  global_args:  Arguments that will be passed to all tasks. They
                           _might_ contain something that is useful for the task,
                           but the task has to check if it is _there_ as these
                           are user provided. If they are needed to work that
                           check should happen in the argHandler.
+    :param  store_dir:    directory path of a report store that holds the
+                          results of a previous execution and where the
+                          results of this execution will be saved to
+    :param  export_yaml:  file path where the results of the execution will be
+                          exported to as yaml report
+    :param  resume:       Weather the projects that were done by a previous
+                          execution that crashed or was aborted shall be
+                          skipped
+    :param  clone:        How the git repositories are cloned - either 'full',
+                          'blobless', 'shallow' or 'auto' to choose by the
+                          needs of the tasks
+    :param  acquisitions: The number of projects that are cloned, updated or
+                          downloaded concurrently
+    :param  fetches_per_host:
+                          The number of git and svn projects of the same host
+                          that are updated concurrently
+    :param  timeout:      The number of seconds after which cloning or
+                          updating a repository is aborted or None to wait
+                          forever
+    :param  api_requests: The number of requests to web apis that are sent
+                          concurrently
     """
 
     def __init__(self,
@@ -65,36 +101,58 @@ class GitScrabber:
                  data_dir=".",
                  printing=False,
                  update=False,
-                 global_args={}):
+                 global_args={},
+                 store_dir=None,
+                 export_yaml=None,
+                 resume=False,
+                 clone='auto',
+                 acquisitions=8,
+                 fetches_per_host=4,
+                 timeout=None,
+                 api_requests=4):
         self.__scrabTaskManager = ScrabTaskManager()
-        self.__output_file = output_file
         self.__data_dir = data_dir
         self.__print = printing
         self.__update = update
         self.__global_args = global_args
+        self.__clone = clone
+        self.__acquisitions = acquisitions
+        self.__fetches_per_host = fetches_per_host
+        self.__timeout = timeout
+        self.__api_requests = api_requests
+        self.__journal = CheckpointJournal(
+            os.path.join(data_dir, '.gitScrabber', 'report.part.jsonl'),
+            resume)
         self.__tasks = ruamel.yaml.load(
             open(task_file, 'r').read(), Loader=ruamel.yaml.SafeLoader)
 
-        if(report_file):
-            self.__old_report = ruamel.yaml.load(
-                open(report_file, 'r').read(),
-                ruamel.yaml.RoundTripLoader)
+        self.__stores = []
+        if store_dir:
+            store = DirectoryReportStore(store_dir)
+            self.__old_report = store.load()
+            self.__stores.append(store)
+        elif report_file:
+            self.__old_report = YamlReportStore(report_file).load()
         else:
             self.__old_report = None
 
+        if output_file:
+            self.__stores.append(YamlReportStore(output_file))
+        if export_yaml:
+            self.__stores.append(YamlReportStore(export_yaml))
+
     def __handele_results(self, report):
         """
-        Writes the results of the scrab tasks to file and or to stdout
+        Writes the results of the scrab tasks to the report stores and or to
+        stdout
 
         :param  report:  report to write
         """
-        ruamel.yaml.scalarstring.walk_tree(report)
-        if self.__output_file:
-            with open(self.__output_file, 'w') as outfile:
-                ruamel.yaml.dump(
-                    report, outfile, Dumper=ruamel.yaml.RoundTripDumper)
+        for store in self.__stores:
+            store.save(report)
 
         if self.__print:
+            ruamel.yaml.scalarstring.walk_tree(report)
             print(ruamel.yaml.dump(report, Dumper=ruamel.yaml.RoundTripDumper))
 
     def scrab(self):
@@ -111,10 +169,17 @@ class GitScrabber:
             old_report=self.__old_report,
             update=self.__update,
             global_args=self.__global_args,
-            scrabTaskManager=self.__scrabTaskManager)
+            scrabTaskManager=self.__scrabTaskManager,
+            journal=self.__journal,
+            clone=self.__clone,
+            acquisitions=self.__acquisitions,
+            timeout=self.__timeout,
+            api_requests=self.__api_requests,
+            fetches_per_host=self.__fetches_per_host)
         report = executionManager.create_report()
 
         self.__handele_results(report)
+        self.__journal.remove()
 
         return report
 
@@ -135,7 +200,19 @@ def main(args=None):
         data_dir=args.data,
         printing=args.print,
         update=args.update,
-        global_args=GlobalArgs(args.github_token)
+        global_args=GlobalArgs(
+            args.github_token,
+            os.path.join(args.data, '.gitScrabber', 'http'),
+            args.http_cache_ttl,
+            args.offline),
+        store_dir=args.store,
+        export_yaml=args.export_yaml,
+        resume=args.resume,
+        clone=args.clone,
+        acquisitions=args.acquisitions,
+        fetches_per_host=args.fetches_per_host,
+        timeout=args.timeout,
+        api_requests=args.api_requests
     ).scrab()
 
 
@@ -0,0 +1,212 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from utils import md5
+
+import json
+import os
+import requests
+import time
+
+httpCacheVersion = 1
+
+__session = None
+__session_pid = None
+
+
+def session():
+    """
+    Provides the requests.Session of this process - its connections are kept
+    alive and reused by all requests of the process. Every worker process
+    gets a session of its own as connections can't be shared between
+    processes.
+
+    :returns: The session of this process
+    """
+    global __session, __session_pid
+    if __session is None or __session_pid != os.getpid():
+        __session = requests.Session()
+        __session_pid = os.getpid()
+    return __session
+
+
+class CachedResponse():
+    """
+    Response of a HttpCache - either answered by the server or from the cache
+
+    :param  status_code:  The HTTP status code
+    :param  headers:      The headers of the response
+    :param  text:         The body of the response
+    :param  from_cache:   Weather the body was taken from the cache
+    """
+
+    def __init__(self, status_code, headers, text, from_cache):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.from_cache = from_cache
+
+    def json(self):
+        """
+        :returns: The body parsed as json
+        """
+        return json.loads(self.text)
+
+
+class HttpCache():
+    """
+    Persistent cache of the responses of GET requests, keyed by their url.
+    Cached responses are revalidated with a conditional request using their
+    ETag and Last-Modified headers - a '304 Not Modified' answer transfers no
+    body and doesn't count against the rate limit of the GitHub api.
+    Responses that are younger than the TTL are used without any request and
+    in the offline mode only cached responses are used.
+
+    The requests are sent through the session of the process so that the
+    connections are reused - by the ApiScheduler if one is given, so that
+    they respect the rate limits.
+
+    :param  directory:  The directory the responses are cached in or None to
+                        cache nothing
+    :param  ttl:        The number of seconds a response is used without
+                        revalidating it or None to revalidate it every time
+    :param  offline:    Weather no requests are sent at all
+    :param  scheduler:  The ApiScheduler that sends the requests or None
+    """
+
+    def __init__(self, directory, ttl=None, offline=False, scheduler=None):
+        self.__directory = directory
+        self.__ttl = ttl
+        self.__offline = offline
+        self.__scheduler = scheduler
+
+    def __path(self, url):
+        """
+        :param    url:  The url of the request
+
+        :returns: The path of the file the response to the url is cached in
+        """
+        return os.path.join(self.__directory, md5(url) + '.json')
+
+    def __load(self, url):
+        """
+        :param    url:  The url of the request
+
+        :returns: The cached entry of the url or None if there is none
+        """
+        if self.__directory is None:
+            return None
+        try:
+            with open(self.__path(url), 'r') as f:
+                entry = json.load(f)
+        except Exception as e:
+            return None  # not or unreadable cached
+
+        if (entry.get('httpCacheVersion') != httpCacheVersion
+                or entry.get('url') != url):
+            return None
+        return entry
+
+    def __store(self, url, entry):
+        """
+        Writes the entry of the url to disk
+
+        :param    url:    The url of the request
+        :param    entry:  The entry to cache
+        """
+        if self.__directory is None:
+            return
+
+        os.makedirs(self.__directory, exist_ok=True)
+        path = self.__path(url)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def __cached(self, entry, headers=None):
+        """
+        :param    entry:    The cached entry
+        :param    headers:  The headers of the response that confirmed the
+                            entry or None
+
+        :returns: The response of the cached entry
+        """
+        return CachedResponse(entry['status_code'],
+                              headers if headers is not None else {},
+                              entry['text'], True)
+
+    def get(self, url, headers=None):
+        """
+        Sends a GET request - or answers it from the cache
+
+        :param    url:      The url of the request - it is the key of the
+                            cache so it must not contain credentials
+        :param    headers:  Additional headers of the request or None
+
+        :returns: The CachedResponse
+        """
+        entry = self.__load(url)
+        now = time.time()
+
+        if entry is not None and (
+                self.__offline
+                or (self.__ttl is not None
+                    and now - entry['validated'] < self.__ttl)):
+            return self.__cached(entry)
+        if self.__offline:
+            raise Exception("The response of '{}' isn't cached and can't be "
+                            "requested in the offline mode".format(url))
+
+        request_headers = dict(headers or {})
+        if entry is not None and entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+        if entry is not None and entry['last_modified']:
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+        if self.__scheduler is not None:
+            response = self.__scheduler.request('GET', url,
+                                                headers=request_headers)
+        else:
+            response = session().get(url, headers=request_headers)
+
+        if response.status_code == 304 and entry is not None:
+            entry['validated'] = now
+            self.__store(url, entry)
+            return self.__cached(entry, dict(response.headers))
+
+        if 200 <= response.status_code < 300:
+            self.__store(url, {
+                'httpCacheVersion': httpCacheVersion,
+                'url': url,
+                'status_code': response.status_code,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'validated': now,
+                'text': response.text
+            })
+        return CachedResponse(response.status_code, dict(response.headers),
+                              response.text, False)
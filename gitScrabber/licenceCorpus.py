@@ -0,0 +1,367 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from collections import Counter
+from pkg_resources import resource_filename
+
+import json
+import math
+import numpy
+import os
+import regex
+import utils
+
+corpusVersion = 1
+
+_word_regex = regex.compile(r'\w+')
+# the corpora that were loaded by this process
+_corpora = {}
+
+
+def text_to_vector(text):
+    """
+    Converts text to a list of words and the number of occurrences
+
+    :param    text:  The lowercased text to be converted to a list of words and
+                     their number of occurrences
+
+    :returns: List of words and their occurrences in the given text
+    """
+    return Counter(_word_regex.findall(text, concurrent=True))
+
+
+class LicenceCorpus():
+
+    """
+    The licence texts of the SPDX licence list [1] as word count vectors over
+    one vocabulary. The texts and the standard headers of the licences are
+    entries of their own.
+
+    The vectors are stored as sparse matrix in the compressed sparse row
+    format: the words of the entry i are vocabulary[indices[indptr[i]:
+    indptr[i+1]]] and their counts are counts[indptr[i]:indptr[i+1]].
+
+    The similarity of a text to the entries is calculated by a single sparse
+    matrix vector product - the norms of the entries are calculated once.
+    Entries that can't reach a similarity threshold are pruned beforehand by
+    an inverted index of their rarest words (see candidates).
+
+    [1] https://github.com/spdx/license-list-data
+
+    :param  names:       The names of the entries
+    :param  shorts:      The short names of the licences of the entries
+    :param  lengths:     The lengths of the texts of the entries
+    :param  vocabulary:  The words of all entries
+    :param  indptr:      The start of the words of every entry in indices and
+                         counts followed by the total number of words
+    :param  indices:     The index of the words in the vocabulary
+    :param  counts:      The number of occurrences of the words
+    """
+
+    def __init__(self, names, shorts, lengths, vocabulary, indptr, indices,
+                 counts):
+        self.names = names
+        self.shorts = shorts
+        self.lengths = lengths
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.indices = indices
+        self.counts = counts
+        self.__word_index = None
+        self.__weights = None
+        self.__norms = None
+        self.__postings = {}
+
+    def __setup(self):
+        """
+        Sets up the look up table of the vocabulary, the word counts as floats
+        and the norms of the entries - this is done on first use
+        """
+        if self.__norms is not None:
+            return
+
+        self.__word_index = {word: i for i, word in enumerate(
+            self.vocabulary.tolist())}
+        self.__weights = self.counts.astype(numpy.float64)
+        rows = numpy.repeat(numpy.arange(len(self.names)),
+                            numpy.diff(self.indptr))
+        self.__norms = numpy.sqrt(numpy.bincount(
+            rows, weights=self.__weights**2, minlength=len(self.names)))
+
+    def __build_postings(self, threshold):
+        """
+        Builds the inverted index for a similarity threshold.
+
+        The cosine similarity of a text to an entry is at most the norm of the
+        entry restricted to the words of the text divided by the norm of the
+        entry. If the text contains none of the words D of the entry, whose
+        squared counts sum up to more than (1 - threshold^2) of the squared
+        norm, the similarity is below the threshold. The words that satisfy
+        this with the shortest postings - rare words with high counts first -
+        are indexed for every entry.
+
+        :param    threshold:  The similarity threshold
+
+        :returns: Dictionary with the vocabulary index of a word as key and the
+                  entries that indexed the word as value
+        """
+        self.__setup()
+        # the margin keeps rounding errors from lifting the bound above the
+        # threshold
+        share = (1 - threshold**2) * (1 + 1e-6)
+        frequency = numpy.bincount(self.indices,
+                                   minlength=len(self.vocabulary))
+        postings = {}
+
+        for row in range(len(self.names)):
+            start, end = self.indptr[row], self.indptr[row + 1]
+            if start == end:
+                continue  # empty entries are never similar
+
+            words = self.indices[start:end]
+            squares = self.__weights[start:end]**2
+            order = numpy.argsort(frequency[words] / squares, kind='stable')
+            mass = numpy.cumsum(squares[order])
+            needed = numpy.searchsorted(mass, share * mass[-1]) + 1
+
+            for word in words[order[:needed]].tolist():
+                postings.setdefault(word, []).append(row)
+        return postings
+
+    def candidates(self, vector, threshold):
+        """
+        Looks up the entries that may be more similar to a word count vector
+        than the given threshold - all other entries are certainly not
+
+        :param    vector:     The word count vector as returned by
+                              text_to_vector
+        :param    threshold:  The similarity threshold
+
+        :returns: Boolean array that is True for the candidate entries
+        """
+        if threshold not in self.__postings:
+            self.__postings[threshold] = self.__build_postings(threshold)
+        postings = self.__postings[threshold]
+
+        candidates = numpy.zeros(len(self.names), dtype=bool)
+        for word in vector:
+            i = self.__word_index.get(word)
+            if i in postings:
+                candidates[postings[i]] = True
+        return candidates
+
+    def similarities(self, vector, rows):
+        """
+        Calculates the cosine similarity of a word count vector to entries
+
+        :param    vector:  The word count vector as returned by text_to_vector
+        :param    rows:    Array of the indices of the entries
+
+        :returns: Array of the cosine similarities in the order of the rows
+        """
+        self.__setup()
+
+        dense = numpy.zeros(len(self.vocabulary))
+        for word, count in vector.items():
+            i = self.__word_index.get(word)
+            if i is not None:
+                dense[i] = count
+
+        # the positions of the words of the rows in indices and counts
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        offsets = numpy.repeat(starts - numpy.cumsum(lengths) + lengths,
+                               lengths)
+        positions = offsets + numpy.arange(offsets.size)
+
+        numerator = numpy.bincount(
+            numpy.repeat(numpy.arange(len(rows)), lengths),
+            weights=self.__weights[positions] * dense[self.indices[positions]],
+            minlength=len(rows))
+        denominator = (math.sqrt(sum(count**2 for count in vector.values()))
+                       * self.__norms[rows])
+
+        return numpy.divide(numerator, denominator,
+                            out=numpy.zeros(len(rows)),
+                            where=denominator != 0)
+
+
+def _read_licence(filepath):
+    """
+    Reads the licence text and header from the given path
+
+    :param    filepath:  The filepath to read the licence from
+
+    :returns: A list of tuples of the name, short name and text of the entries
+    """
+    entries = []
+    with open(filepath, 'r') as fh:
+        licence = json.load(fh)
+        name = licence['name']
+        short = licence['licenseId']
+
+        text = None
+        if 'licenseText' in licence:
+            text = licence['licenseText']
+        elif 'standardLicenseTemplate' in licence:
+            text = licence['standardLicenseTemplate']
+
+        if text is not None:
+            entries.append((name, short, text))
+
+        if 'standardLicenseHeader' in licence:
+            entries.append((name + ' Header', short,
+                            licence['standardLicenseHeader']))
+    return entries
+
+
+def _compile(details_dir):
+    """
+    Compiles the licences of the SPDX licence list to a LicenceCorpus
+
+    :param    details_dir:  The directory with the json files of the licences
+
+    :returns: The LicenceCorpus
+    """
+    entries = []
+    for file in sorted(os.listdir(details_dir)):
+        if file.endswith(".json"):
+            entries.extend(_read_licence(os.path.join(details_dir, file)))
+
+    vectors = [text_to_vector(text.lower()) for _, _, text in entries]
+    vocabulary = sorted(set(word for vector in vectors for word in vector))
+    word_index = {word: i for i, word in enumerate(vocabulary)}
+
+    indptr = [0]
+    indices = []
+    counts = []
+    for vector in vectors:
+        for word in sorted(vector, key=word_index.get):
+            indices.append(word_index[word])
+            counts.append(vector[word])
+        indptr.append(len(indices))
+
+    return LicenceCorpus(
+        names=numpy.array([name for name, _, _ in entries], dtype=str),
+        shorts=numpy.array([short for _, short, _ in entries], dtype=str),
+        lengths=numpy.array([len(text) for _, _, text in entries],
+                            dtype=numpy.int64),
+        vocabulary=numpy.array(vocabulary, dtype=str),
+        indptr=numpy.array(indptr, dtype=numpy.int64),
+        indices=numpy.array(indices, dtype=numpy.int32),
+        counts=numpy.array(counts, dtype=numpy.int32))
+
+
+def _save(corpus, path):
+    """
+    Saves the corpus atomically to the given path
+
+    :param    corpus:  The LicenceCorpus to save
+    :param    path:    The path of the corpus file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+
+    with open(tmp_path, 'wb') as f:
+        numpy.savez(f,
+                    names=corpus.names,
+                    shorts=corpus.shorts,
+                    lengths=corpus.lengths,
+                    vocabulary=corpus.vocabulary,
+                    indptr=corpus.indptr,
+                    indices=corpus.indices,
+                    counts=corpus.counts)
+    os.replace(tmp_path, path)
+
+
+def _load(path):
+    """
+    Loads the corpus from the given path
+
+    :param    path:  The path of the corpus file
+
+    :returns: The LicenceCorpus
+    """
+    with numpy.load(path, allow_pickle=False) as data:
+        return LicenceCorpus(**{key: data[key] for key in data.files})
+
+
+def _licence_list_version(data_dir):
+    """
+    Looks up the version of the licence list
+
+    :param    data_dir:  The directory of the licence list
+
+    :returns: The version of the licence list or, if it isn't recorded, a hash
+              of the names and sizes of the licence files
+    """
+    try:
+        with open(os.path.join(data_dir, 'json', 'licenses.json'), 'r') as f:
+            return str(json.load(f)['licenseListVersion'])
+    except Exception as e:
+        details_dir = os.path.join(data_dir, 'json', 'details')
+        return utils.md5(str(sorted(
+            (file, os.path.getsize(os.path.join(details_dir, file)))
+            for file in os.listdir(details_dir))))
+
+
+def _corpus_path(version):
+    """
+    :param    version:  The version of the licence list
+
+    :returns: The path of the compiled corpus of the given licence list
+              version in the cache directory of the user
+    """
+    cache_dir = os.environ.get('XDG_CACHE_HOME',
+                               os.path.join(os.path.expanduser('~'), '.cache'))
+    version = regex.sub(r'[^\w.-]', '_', version)
+    return os.path.join(cache_dir, 'gitScrabber',
+                        'licences-{}-{}.npz'.format(corpusVersion, version))
+
+
+def load_corpus():
+    """
+    Loads the compiled corpus of the SPDX licence list - it is compiled if it
+    doesn't exist for the current version of the licence list yet and loaded
+    only once per process
+
+    :returns: The LicenceCorpus
+    """
+    data_dir = os.path.abspath(
+        resource_filename('gitScrabber', 'license-list-data'))
+
+    if data_dir not in _corpora:
+        path = _corpus_path(_licence_list_version(data_dir))
+
+        try:
+            corpus = _load(path)
+        except Exception as e:
+            corpus = _compile(os.path.join(data_dir, 'json', 'details'))
+            try:
+                _save(corpus, path)
+            except OSError as e:
+                pass  # without cache the corpus is compiled by every process
+        _corpora[data_dir] = corpus
+    return _corpora[data_dir]
@@ -32,6 +32,17 @@ import shutil
 import tempfile
 import utils
 
+# The arguments of git clone for the supported clone modes:
+# - full:     the complete repository
+# - blobless: all commits and trees but only the file contents of the checked
+#             out revision, older contents are fetched on demand
+# - shallow:  only the checked out revision
+clone_arguments = {
+    'full': [],
+    'blobless': ['--filter=blob:none'],
+    'shallow': ['--depth', '1']
+}
+
 
 class ProjectManager:
     """
@@ -66,11 +77,14 @@ class GitProjectManager(ProjectManager):
     initialise and update a git project.
 
     :param  project:           The project the scrab tasks run for
+    :param  timeout:           The number of seconds after which cloning or
+                               updating the repository is aborted or None
     """
 
-    def __init__(self, project):
+    def __init__(self, project, timeout=None):
         super(GitProjectManager, self).__init__()
         self.__project = project
+        self.__timeout = timeout
 
     def __check_repo_folder(self):
         """
@@ -103,30 +117,110 @@ class GitProjectManager(ProjectManager):
 
     def __init_repo(self):
         """
-        Initialises the repository by cloning into it
+        Initialises the repository by cloning into it - how much of the
+        repository is cloned depends on the clone mode of the project
         """
         utils.run(
             program='git',
-            args=[
-                'clone',
-                self.__project.url,
-                self.__project.location
-            ])
+            args=['clone']
+            + clone_arguments[self.__project.clone]
+            + [self.__project.url, self.__project.location],
+            timeout=self.__timeout)
+
+    def __ensure_history(self):
+        """
+        Fetches the complete history of a shallow clone if the clone mode of
+        the project changed, because the tasks need more history than before
+        """
+        if self.__project.clone == 'shallow':
+            return
+
+        shallow = utils.run(
+            program='git',
+            args=['rev-parse', '--is-shallow-repository'],
+            cwd=self.__project.location)
+        if shallow.strip() == 'true':
+            utils.run(
+                program='git',
+                args=['fetch', '--unshallow'],
+                cwd=self.__project.location,
+                timeout=self.__timeout)
+
+    def __rev_parse(self, *args):
+        """
+        Resolves a revision or ref of the repo
+
+        :param    args:  The arguments for git rev-parse
+
+        :returns: The output of git rev-parse or None if it can't be resolved
+        """
+        try:
+            return utils.run(
+                program='git',
+                args=['rev-parse'] + list(args),
+                cwd=self.__project.location).strip()
+        except Exception as e:
+            return None
+
+    def __remote_moved(self):
+        """
+        Asks the remote with git ls-remote weather the upstream branch moved
+        since it was fetched last - this is far cheaper than a fetch
+
+        :returns: False if the upstream branch of the remote still points to
+                  the commit that was fetched last, True if it moved or if
+                  this can't be determined
+        """
+        branch = self.__rev_parse('--symbolic-full-name', 'HEAD')
+        tracking = self.__rev_parse('--symbolic-full-name', '@{upstream}')
+        if not branch or not tracking or not branch.startswith('refs/heads/'):
+            return True
+
+        branch = branch[len('refs/heads/'):]
+        try:
+            remote = utils.run(
+                program='git',
+                args=['config', 'branch.{}.remote'.format(branch)],
+                cwd=self.__project.location).strip()
+            merge = utils.run(
+                program='git',
+                args=['config', 'branch.{}.merge'.format(branch)],
+                cwd=self.__project.location).strip()
+            refs = utils.run(
+                program='git',
+                args=['ls-remote', remote, merge],
+                cwd=self.__project.location,
+                timeout=self.__timeout)
+        except Exception as e:
+            return True
+
+        remote_refs = {}
+        for line in refs.splitlines():
+            sha, _, ref = line.partition('\t')
+            remote_refs[ref] = sha
+        return remote_refs.get(merge) != self.__rev_parse(tracking)
 
     def __update_repo(self):
         """
-        Updates the git repo
+        Updates the git repo - nothing is fetched if the upstream branch didn't
+        move on the remote. Weather anything changed is decided by comparing
+        HEAD before and after the update.
 
         :returns: True if anything changed False if nothing changed
         """
-        result = utils.run(
+        before = self.__rev_parse('HEAD')
+
+        if (not self.__remote_moved()
+                and before == self.__rev_parse('@{upstream}')):
+            return False
+
+        utils.run(
             program='git',
             args=['pull'],
-            cwd=self.__project.location
+            cwd=self.__project.location,
+            timeout=self.__timeout
         )
-        if 'Already up-to-date.' in result:
-            return False
-        return True
+        return before is None or before != self.__rev_parse('HEAD')
 
     def update(self):
         """
@@ -137,6 +231,7 @@ class GitProjectManager(ProjectManager):
                   otherwise False
         """
         if self.__check_repo_folder():
+            self.__ensure_history()
             return self.__update_repo()
         else:
             self.__init_repo()
@@ -152,6 +247,7 @@ class GitProjectManager(ProjectManager):
         if not self.__check_repo_folder():
             self.__init_repo()
             return True
+        self.__ensure_history()
         return False
 
 
@@ -163,11 +259,14 @@ class SvnProjectManager(ProjectManager):
     means the later scrab tasks will not work on a svn repository but a git one.
 
     :param  project:           The project the scrab tasks run for
+    :param  timeout:           The number of seconds after which cloning or
+                               updating the repository is aborted or None
     """
 
-    def __init__(self, project):
+    def __init__(self, project, timeout=None):
         super(SvnProjectManager, self).__init__()
         self.__project = project
+        self.__timeout = timeout
 
     def __check_repo_folder(self):
         """
@@ -209,7 +308,8 @@ class SvnProjectManager(ProjectManager):
                 'clone',
                 self.__project.url,
                 self.__project.location
-            ])
+            ],
+            timeout=self.__timeout)
 
     def __update_repo(self):
         """
@@ -221,7 +321,8 @@ class SvnProjectManager(ProjectManager):
         result = utils.run(
             program='git',
             args=['svn', 'rebase'],
-            cwd=self.__project.location
+            cwd=self.__project.location,
+            timeout=self.__timeout
         )
         if regex.search(r"Current branch .* is up to date.", result):
             return False
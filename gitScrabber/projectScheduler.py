@@ -0,0 +1,169 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from utils import containedStructure
+
+import math
+import os
+
+# Average size of a source line - used to convert the LOC of an old report to
+# bytes which is the unit of the cost estimation
+bytes_per_line = 32
+# Projects are not split in shards that are smaller than this
+min_shard_cost = 32 * 1024 * 1024
+
+
+class ProjectScheduler:
+    """
+    The ProjectScheduler decides in which order the projects are queued and in
+    how many shards their files are analysed.
+
+    The projects are queued by their estimated cost - the biggest first. As
+    every idle worker of the pool takes the next queued job this balances the
+    work between the workers and prevents that a giant project that was queued
+    last becomes the long tail of the whole run. Projects that would still take
+    longer than the total work divided by the workers are split in shards.
+
+    The cost of a project is estimated by the LOC reported by ProjectMetrics in
+    the old report or by the size of the project files on disk. Projects
+    without any estimate are treated like the biggest known project as they
+    have to be downloaded first.
+
+    :param  projects:    The projects to schedule
+    :param  old_report:  The report of a previous run or None
+    :param  workers:     The number of workers that analyse the projects
+    :param  file_tasks:  Weather FileTasks will be run - only those can be run
+                         in shards
+    """
+
+    def __init__(self, projects, old_report, workers, file_tasks):
+        self.__projects = [p for p in projects if p.kind != 'meta']
+        self.__old_report = old_report
+        self.__workers = workers
+        self.__file_tasks = file_tasks
+
+    def __old_cost(self, project):
+        """
+        Estimates the cost of the project by the LOC of the old report
+
+        :param    project:  The project to estimate the cost for
+
+        :returns: The estimated cost in bytes or None if the old report has no
+                  data about the project
+        """
+        required = {'projects': {project.id: {
+            'ProjectMetrics': {'loc': {'source': 0}}}}}
+
+        if (self.__old_report is None
+                or not containedStructure(required, self.__old_report)):
+            return None
+
+        metrics = self.__old_report['projects'][project.id]['ProjectMetrics']
+        return metrics['loc']['source'] * bytes_per_line
+
+    def __disk_cost(self, project):
+        """
+        Estimates the cost of the project by the size of the files that will
+        be analysed - hidden files and directories are ignored like the
+        FileTaskRunner does
+
+        :param    project:  The project to estimate the cost for
+
+        :returns: The estimated cost in bytes or None if the project doesn't
+                  exist on disk
+        """
+        if not os.path.isdir(project.location):
+            return None
+
+        size = 0
+        for dirpath, dirs, filenames in os.walk(project.location,
+                                                topdown=True):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+
+            for file in filenames:
+                if file[0] == '.':
+                    continue
+                try:
+                    size += os.path.getsize(os.path.join(dirpath, file))
+                except OSError:
+                    pass  # broken symlinks and the like
+        return size
+
+    def __estimate_costs(self):
+        """
+        Estimates the costs of all projects
+
+        :returns: Dictionary with the project id as key and the estimated cost
+                  in bytes as value
+        """
+        costs = {}
+        unknown = []
+
+        for project in self.__projects:
+            cost = self.__old_cost(project)
+            if cost is None:
+                cost = self.__disk_cost(project)
+
+            if cost is None:
+                unknown.append(project)
+            else:
+                costs[project.id] = cost
+
+        biggest = max(costs.values(), default=0)
+        for project in unknown:
+            costs[project.id] = biggest
+        return costs
+
+    def __calc_shards(self, cost, total):
+        """
+        Calculates in how many shards a project should be split
+
+        :param    cost:   The estimated cost of the project
+        :param    total:  The estimated cost of all projects
+
+        :returns: The number of shards
+        """
+        if not self.__file_tasks:
+            return 1
+
+        target = max(total / self.__workers, min_shard_cost)
+        return max(1, min(self.__workers, math.ceil(cost / target)))
+
+    def schedule(self):
+        """
+        Orders the projects by their estimated cost and sets the number of
+        shards of the projects that didn't specify them in the task file
+
+        :returns: The projects in the order they should be queued
+        """
+        costs = self.__estimate_costs()
+        total = sum(costs.values())
+
+        for project in self.__projects:
+            if project.shards is None:
+                project.shards = self.__calc_shards(costs[project.id], total)
+
+        return sorted(self.__projects, key=lambda p: costs[p.id],
+                      reverse=True)
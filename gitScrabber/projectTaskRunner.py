@@ -23,12 +23,96 @@ THE SOFTWARE.
 """
 
 
+from commitHistory import CommitHistory
+from fileCache import FileCache
+from fileSource import GitFileSource, WalkFileSource
 from utils import md5
 
 from packaging import version
 
+import codecs
+import io
+import mmap
 import os
-import regex
+import zlib
+
+# Like git, a file is considered binary if its beginning contains a NUL byte
+binary_probe_size = 8000
+# Files of at least this size are mapped into memory instead of being read
+mmap_file_size = 16 * 1024 * 1024
+
+
+class ProjectFile():
+    """
+    Lazy view of a project file that is shared by all FileTasks that analyse
+    the file. The contents and the values derived from them are computed at
+    most once - on first request - so that large files are neither read nor
+    copied if no task needs them and only once if many tasks need them.
+
+    If the tasks only need the beginning of the file the contents are limited
+    to the longest prefix they declared - the values derived from the contents
+    are derived from this prefix as well.
+
+    :param  filepath:  The file path of the file
+    :param  reader:    Function that takes the file path and the limit and
+                       returns the file contents as string
+    :param  limit:     The minimal number of characters to read or None to
+                       read the whole file
+    :param  sizer:     Function that takes the file path and returns the size
+                       of the file in bytes
+    """
+
+    def __init__(self, filepath, reader, limit=None, sizer=os.path.getsize):
+        self.path = filepath
+        self.__reader = reader
+        self.__limit = limit
+        self.__sizer = sizer
+        self.__text = None
+        self.__lower = None
+        self.__size = None
+        self.__lines = None
+        self.__extension = None
+
+    def text(self):
+        """
+        :returns: The file contents as string
+        """
+        if self.__text is None:
+            self.__text = self.__reader(self.path, self.__limit)
+        return self.__text
+
+    def lower(self):
+        """
+        :returns: The lowercased file contents as string
+        """
+        if self.__lower is None:
+            self.__lower = self.text().lower()
+        return self.__lower
+
+    def size(self):
+        """
+        :returns: The size of the file in bytes
+        """
+        if self.__size is None:
+            self.__size = self.__sizer(self.path)
+        return self.__size
+
+    def lines(self):
+        """
+        :returns: The number of line breaks in the file, trailing whitespace
+                  is not considered
+        """
+        if self.__lines is None:
+            self.__lines = self.text().rstrip().count('\n')
+        return self.__lines
+
+    def extension(self):
+        """
+        :returns: The file extension including the leading dot e.g. '.py'
+        """
+        if self.__extension is None:
+            self.__extension = os.path.splitext(self.path)[1]
+        return self.__extension
 
 
 class FileTaskRunner():
@@ -40,6 +124,14 @@ class FileTaskRunner():
     The Tasks are executed in parallel (but single threaded) to prevent
     unnecessary reads.
 
+    The files of a project may be split in shards - each runner of a shard only
+    analyses the files of its shard and the partial results of all shards are
+    merged by a runner without a shard afterwards.
+
+    The results of the single files are cached - files that didn't change since
+    the last run are not scrabbed again, their cached results are added to the
+    tasks instead.
+
     :param  project:           The project the scrab tasks run for
     :param  tasks:             The tasks that will run for the project
     :param  old_tasks:         The old tasks that were used to generate old_data
@@ -51,17 +143,26 @@ class FileTaskRunner():
                                as these are user provided. If they are needed to
                                work that check should happen in the argHandler.
     :param  scrabTaskManager:  The ScrabTaskManager
+    :param  shard:             Tuple of the shard index and the number of
+                               shards or None if all files shall be analysed
     """
 
     def __init__(self, project, tasks, old_data,  old_tasks, global_args,
-                 scrabTaskManager):
+                 scrabTaskManager, shard=None):
         self.__project = project
+        self.__shard = shard
         self.__old_data = old_data
         self.__old_tasks = old_tasks
         self.__global_args = global_args
         self.__scrabTaskManager = scrabTaskManager
         self.__report = {}
+        self.__signatures = {}
+        self.__source = None
+        # files that aren't UTF-8 and binary files whose contents are skipped
+        self.__statistics = {'fallbacks': 0, 'binaries': 0}
         self.__tasks = self.__make_meta_tasks(tasks)
+        self.__inputs = [task.file_input() for task in self.__tasks.values()]
+        self.__cache = FileCache(project, self.__signatures)
 
     def __make_meta_tasks(self, tasks):
         """
@@ -80,6 +181,9 @@ class FileTaskRunner():
             if task_wrapper.kind != 'file':
                 continue
 
+            self.__signatures[meta_task.name] = (
+                task_wrapper.version, md5(str(meta_task.parameter)))
+
             if (self.__project.updated
                 or not self.__old_data
                     or self.__changed_task(task_wrapper, meta_task)):
@@ -92,51 +196,144 @@ class FileTaskRunner():
                 self.__report[meta_task.name] = self.__old_data[meta_task.name]
         return tasks_
 
-    def __is_binary(self, filepath):
+    def __is_binary(self, data):
         """
-        Checks if the given file is probable a binary file
+        Checks if the file contents are probable binary - like git does it by
+        looking for a NUL byte at their beginning
 
-        :param    filepath:  The file path of the file to check
+        :param    data:  The file contents as bytes-like object
 
         :returns: True if the file is probable a binary file, otherwise False
         """
-        header = open(filepath, 'rb').read(512)  # read 512 bytes
-        if not header:
-            return True  # Empty is considered a binary file
-        # Count 'human' text characters
-        text = regex.findall(rb"[\w\t \(\)\.=!'\+\-\*\\]", header)
+        return data.find(b'\0', 0, binary_probe_size) != -1
 
-        if float(len(text)) / float(len(header)) < 0.80:
-            return True
-        return False
+    def __decode(self, data, final=True):
+        """
+        Decodes the file contents as UTF-8 if they are valid UTF-8 and as
+        iso-8859-15, which can decode anything, otherwise. Line breaks are
+        translated to '\\n' like by a file opened in text mode.
 
-    def __read_file(self, filepath):
+        :param    data:   The file contents as bytes-like object
+        :param    final:  Weather data holds the end of the file - if not, a
+                          character that is cut off at the end is dropped
+
+        :returns: Tuple of the text and weather the fallback encoding was used
         """
-        Reads a file by trying multiple encoding if necessary
+        try:
+            text = codecs.utf_8_decode(data, 'strict', final)[0]
+            fallback = False
+        except UnicodeDecodeError:
+            text = str(data, 'iso-8859-15')
+            fallback = True
 
-        :param    filepath:  The file path to load the file from
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return (text, fallback)
 
-        :returns: String containing the file contents
+    def __valid_utf_8(self, fd, data):
         """
+        Checks weather the whole file is valid UTF-8 - the rest of the file is
+        streamed through the decoder without keeping it
+
+        :param    fd:    The file the data was read from
+        :param    data:  The beginning of the file that was read so far
+
+        :returns: True if the file is valid UTF-8, otherwise False
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
         try:
-            with open(filepath, mode='r') as fd:
-                return fd.read()
-        except Exception as e:
-            pass
+            decoder.decode(data)
+            chunk = fd.read(io.DEFAULT_BUFFER_SIZE)
+            while chunk:
+                decoder.decode(chunk)
+                chunk = fd.read(io.DEFAULT_BUFFER_SIZE)
+            decoder.decode(b'', True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def __decode_prefix(self, fd, data, limit):
+        """
+        Decodes the beginning of a file that holds at least limit characters -
+        as a character may take more than one byte, more bytes are read until
+        the characters are complete. The encoding is chosen on the whole file
+        like for a full read, so that the text is a prefix of the text of a
+        full read.
+
+        :param    fd:     The file the first limit bytes were read from
+        :param    data:   The first limit bytes of the file
+        :param    limit:  The number of characters to decode
+
+        :returns: Tuple of the text and weather the fallback encoding was used
+        """
+        final = len(data) < limit
+        text, fallback = self.__decode(data, final)
+
+        while not final and len(text) < limit:
+            size = limit - len(text) + 3  # completes a cut off character
+            chunk = fd.read(size)
+            final = len(chunk) < size
+            data += chunk
+            text, fallback = self.__decode(data, final)
+
+        if not final and not fallback and not self.__valid_utf_8(fd, data):
+            # a later byte isn't UTF-8 - the full read falls back as well
+            text = str(data, 'iso-8859-15')
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            fallback = True
+        return (text, fallback)
+
+    def __read_all(self, fd):
+        """
+        Reads the whole file - large files are mapped into memory instead
+
+        :param    fd:  The file opened for reading bytes
+
+        :returns: The file contents as bytes-like object
+        """
         try:
-            with open(filepath, mode='r', encoding="iso-8859-15") as fd:
-                return fd.read()
-        except Exception as e:
-            pass
+            if os.fstat(fd.fileno()).st_size >= mmap_file_size:
+                return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except io.UnsupportedOperation:
+            pass  # in-memory files can't be mapped
+        return fd.read()
 
-        if self.__is_binary(filepath):
-            with open(filepath, mode='rb') as fd:
-                return fd.read().decode(encoding='ascii', errors='ignore')
-        else:
-            raise Exception(
-                "Can't open file - tried encoding 'UTF-8' and 'iso-8859-15' "
-                "on file {}".format(filepath)
-            )
+    def __read_file(self, filepath, limit=None):
+        """
+        Reads a file with a single read into a buffer - large files are mapped
+        into memory instead. Binary files are detected and the encoding is
+        chosen on this buffer.
+
+        :param    filepath:  The file path to load the file from
+        :param    limit:     The minimal number of characters to read or None
+                             to read the whole file
+
+        :returns: String containing the file contents - binary files are
+                  skipped and empty
+        """
+        relative_path = self.__relative_path(filepath)
+        with self.__source.open(relative_path) as fd:
+            if limit is None:
+                data = self.__read_all(fd)
+            else:
+                data = fd.read(limit)
+
+            try:
+                if self.__is_binary(data):
+                    self.__statistics['binaries'] += 1
+                    return ''
+                if limit is None:
+                    text, fallback = self.__decode(data)
+                else:
+                    text, fallback = self.__decode_prefix(fd, data, limit)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+        if fallback:
+            self.__statistics['fallbacks'] += 1
+        return text
 
     def __get_feature_result(self, path, future):
         """
@@ -175,13 +372,37 @@ class FileTaskRunner():
             != md5(str(meta_task.parameter))
         )
 
-    def __execute_tasks_on_file(self, filepath):
+    def __content_limit(self, filepath):
+        """
+        Determines how much of the file the tasks need
+
+        :param    filepath:  The file path of the file
+
+        :returns: Tuple of weather any task needs the contents of the file and
+                  the number of characters they need or None if they need the
+                  whole contents
         """
-        Wrapper function that executes all tasks for the given file
+        limits = [file_input.limit for file_input in self.__inputs
+                  if file_input.needs(filepath)]
+
+        if not limits:
+            return (False, None)
+        if None in limits:
+            return (True, None)
+        return (True, max(limits))
+
+    def __execute_tasks_on_path(self, filepath):
+        """
+        Executes all tasks for a file whose contents no task needs - the file
+        is neither read nor looked up in the cache as the tasks only look at
+        its path
 
         :param    filepath:  The file path of the file that shall be analysed
+
+        :returns: Dictionary with the task name as key and the result of the
+                  task for this file as value
         """
-        file = self.__read_file(filepath)
+        file = ProjectFile(filepath, self.__read_file, sizer=self.__file_size)
         reports = {}
 
         for task_name in self.__tasks:
@@ -189,31 +410,112 @@ class FileTaskRunner():
                 self.__project, filepath, file)
         return reports
 
+    def __execute_tasks_on_file(self, filepath):
+        """
+        Wrapper function that executes all tasks for the given file - tasks
+        that have a cached result for the file get the cached result instead
+
+        :param    filepath:  The file path of the file that shall be analysed
+
+        :returns: Dictionary with the task name as key and the result of the
+                  task for this file as value
+        """
+        needed, limit = self.__content_limit(filepath)
+        if not needed:
+            return self.__execute_tasks_on_path(filepath)
+
+        relative_path = self.__relative_path(filepath)
+        file_id, cached = self.__cache.lookup(
+            relative_path, filepath, self.__source.blob_id(relative_path))
+        file = ProjectFile(filepath, self.__read_file, limit, self.__file_size)
+        reports = {}
+
+        for task_name in self.__tasks:
+            task = self.__tasks[task_name]
+
+            if task_name in cached:
+                reports[task_name] = cached[task_name]
+                task.add(self.__project, filepath, cached[task_name])
+            else:
+                reports[task_name] = task.scrab(self.__project, filepath, file)
+
+        self.__cache.store(relative_path, file_id, reports)
+        return reports
+
+    def __in_shard(self, relative_path):
+        """
+        Checks weather the given file belongs to the shard of this runner. The
+        files are assigned by the checksum of their relative path so that every
+        runner can decide this on its own.
+
+        :param    relative_path:  The file path relative to the project
+
+        :returns: True if the file has to be analysed by this runner, otherwise
+                  False
+        """
+        if self.__shard is None:
+            return True
+
+        index, count = self.__shard
+        return zlib.crc32(os.fsencode(relative_path)) % count == index
+
+    def __relative_path(self, filepath):
+        """
+        :param    filepath:  The file path of a file of the project
+
+        :returns: The file path relative to the project
+        """
+        return filepath[len(self.__project.location)+1:]
+
+    def __file_size(self, filepath):
+        """
+        :param    filepath:  The file path of a file of the project
+
+        :returns: The size of the file in bytes
+        """
+        return self.__source.size(self.__relative_path(filepath))
+
+    def __create_source(self):
+        """
+        Creates the source of the project files - the files of git (and git
+        svn) repositories are read straight from the object database, the
+        files of other projects from their directory
+
+        :returns: The file source of the project
+        """
+        if self.__project.kind in ('git', 'svn'):
+            return GitFileSource(self.__project.location)
+        return WalkFileSource(self.__project.location)
+
     def __analyse_files(self):
         """
         Analyses the files with all file scrap tasks
         """
-        for dirpath, dirs, filenames in os.walk(self.__project.location,
-                                                topdown=True):
-            # ignore hidden / git directories
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
+        if not self.__tasks:
+            return  # the old data is used for all tasks
 
-            for file in filenames:
-                if file[0] == '.':
-                    continue  # ignore hidden / git files
-                path = os.path.join(dirpath, file)
-                if os.path.isfile(path):
-                    self.__execute_tasks_on_file(path)
+        self.__source = self.__create_source()
+        try:
+            for relative_path in self.__source.files():
+                if self.__in_shard(relative_path):
+                    self.__execute_tasks_on_file(
+                        os.path.join(self.__project.location, relative_path))
+        finally:
+            self.__source.close()
+            self.__source = None
 
     def __collect_tasks_results(self):
         """
-        Collects the feature results
+        Collects the feature results and the statistics of the file reads
         """
         for task_name in self.__tasks:
             report = self.__tasks[task_name].report()
             if len(report) > 0:
                 self.__report[task_name] = report
 
+        if self.__tasks:
+            self.__report['.files'] = self.__statistics
+
     def run_tasks(self):
         """
         Executes the FileTasks in a parallel fashion on all project files
@@ -223,6 +525,47 @@ class FileTaskRunner():
         """
         self.__analyse_files()
         self.__collect_tasks_results()
+        if self.__tasks:
+            self.__cache.save()
+
+        return self.__report
+
+    def run_shard(self):
+        """
+        Executes the FileTasks on the files of the shard of this runner without
+        creating their reports - these are created by merge_shards
+
+        :returns: Tuple of a dictionary with the task name as key and the
+                  partial results of the task as value, the cache entries of
+                  the files of the shard and the statistics of the file reads
+        """
+        self.__analyse_files()
+
+        partials = {task_name: self.__tasks[task_name].partial()
+                    for task_name in self.__tasks}
+        return (partials, self.__cache.entries(), self.__statistics)
+
+    def merge_shards(self, shards):
+        """
+        Merges the partial results of the shards into the FileTasks of this
+        runner, which are created anew, and creates the report from the merged
+        results
+
+        :param    shards:  List of the results of run_shard of the runners of
+                           the shards
+
+        :returns: The report containing all task sub-reports of the project
+                  information that were scrabbed together
+        """
+        for partials, entries, statistics in shards:
+            for task_name in partials:
+                self.__tasks[task_name].merge(partials[task_name])
+            self.__cache.update(entries)
+            for key in statistics:
+                self.__statistics[key] += statistics[key]
+        self.__collect_tasks_results()
+        if self.__tasks:
+            self.__cache.save()
 
         return self.__report
 
@@ -286,13 +629,18 @@ class ProjectTaskRunner:
                   project obtaind by the GitTasks
         """
         report = {}
+        # shared by the GitTasks - built once when the first task queries it
+        self.__project.history = CommitHistory(
+            self.__project.location,
+            os.path.join(self.__project.cache_location, 'history.pickle'))
 
         for meta_task in self.__tasks:
             task_wrapper = self.__scrabTaskManager.get_task(meta_task.name)
 
             if ((self.__project.kind != 'git'
                  and self.__project.kind != 'svn')
-                    or task_wrapper.kind != 'git'):
+                    or task_wrapper.kind != 'git'
+                    or meta_task.name in self.__project.prefetching):
                 continue
 
             if (self.__project.updated
@@ -301,8 +649,8 @@ class ProjectTaskRunner:
                 scrab_task = task_wrapper.construct(
                     parameter=meta_task.parameter,
                     global_args=self.__global_args)
-
                 sub_report = scrab_task.scrab(self.__project)
+
                 if sub_report and len(sub_report) > 0:
                     report[meta_task.name] = sub_report
             elif self.__old_data and meta_task.name in self.__old_data:
@@ -321,6 +669,16 @@ class ProjectTaskRunner:
                            self.__global_args, self.__scrabTaskManager)
         return f.run_tasks()
 
+    def run_git_tasks(self):
+        """
+        Runs only the GitTasks for the given project - the FileTasks have to be
+        run separately, e.g. in shards by the FileTaskRunner
+
+        :returns: The sub-report containing all scrabbed information of this
+                  project obtaind by the GitTasks
+        """
+        return self.__run_git_tasks()
+
     def run_tasks(self):
         """
         Runs GitTasks and FileTasks for the given project
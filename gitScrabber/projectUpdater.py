@@ -0,0 +1,240 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from collections import deque
+from projectManager import GitProjectManager, SvnProjectManager
+from multiprocessing.pool import ThreadPool
+from urllib.parse import urlsplit
+
+import glob
+import os
+import queue
+import regex
+import time
+import utils
+
+
+class ProjectUpdater:
+    """
+    The ProjectUpdater updates the git and svn projects before any of them is
+    analysed - this way the projects that didn't change are known in advance
+    and don't have to be analysed again.
+
+    The projects are fetched concurrently, but only a few of them from the
+    same host at once so that a run over hundreds of repositories of one host
+    doesn't exhaust its connections. The projects wait in a queue per host
+    and a project is only handed to the pool once its host has a free slot,
+    so that no thread of the pool waits for a host while projects of other
+    hosts could be updated. For every project the time the update took and
+    the number of bytes it added to the object store of the repository are
+    reported.
+
+    :param  projects:          The projects to update - only git and svn
+                               projects are updated
+    :param  fetches:           The number of projects that are updated
+                               concurrently
+    :param  fetches_per_host:  The number of projects of the same host that
+                               are updated concurrently
+    :param  timeout:           The number of seconds after which updating a
+                               repository is aborted or None
+    """
+
+    def __init__(self, projects, fetches, fetches_per_host, timeout=None):
+        self.__projects = [p for p in projects if p.kind in ('git', 'svn')]
+        self.__fetches = fetches
+        self.__fetches_per_host = fetches_per_host
+        self.__timeout = timeout
+
+    def __host(self, url):
+        """
+        Determines the host of a repository url - scp like urls as
+        'git@github.com:owner/name' are supported as well
+
+        :param    url:  The url of the repository
+
+        :returns: The host of the repository or an empty string for local
+                  repositories
+        """
+        scp = regex.match(r'^(?:[^@/]+@)?([^:/]+):(?!//)', url)
+        if scp:
+            return scp.group(1).lower()
+        return (urlsplit(url).hostname or '').lower()
+
+    def __object_size(self, project):
+        """
+        Measures the object store of the repository of the project - the size
+        of its packs and the size of its loose objects as counted by git
+        count-objects, so that the objects don't have to be walked
+
+        :param    project:  The project whose repository is measured
+
+        :returns: The size of the object store in bytes - 0 if the repository
+                  doesn't exist yet
+        """
+        objects = os.path.join(project.location, '.git', 'objects')
+        if not os.path.isdir(objects):
+            return 0
+
+        size = 0
+        for pack in glob.glob(os.path.join(objects, 'pack', '*.pack')):
+            try:
+                size += os.path.getsize(pack)
+            except OSError:
+                pass  # removed by a concurrent gc or the like
+
+        try:
+            counts = utils.run(
+                program='git',
+                args=['count-objects', '-v'],
+                cwd=project.location)
+        except Exception as e:
+            return size
+
+        for line in counts.splitlines():
+            key, _, value = line.partition(':')
+            if key == 'size':
+                size += int(value) * 1024  # KiB of the loose objects
+        return size
+
+    def __update(self, project):
+        """
+        Updates a single project
+
+        :param    project:  The project to update
+
+        :returns: Tuple of the project and a dictionary with weather the
+                  project 'changed', the 'seconds' and 'bytes' the update took
+                  and the 'error' it raised or None
+        """
+        size = self.__object_size(project)
+        start = time.monotonic()
+        changed = None
+        error = None
+        try:
+            if project.kind == 'git':
+                manager = GitProjectManager(project, self.__timeout)
+            else:
+                manager = SvnProjectManager(project, self.__timeout)
+            changed = manager.update()
+        except Exception as e:
+            error = e
+        seconds = time.monotonic() - start
+
+        return (project, {
+            'changed': changed,
+            'seconds': seconds,
+            'bytes': max(0, self.__object_size(project) - size),
+            'error': error
+        })
+
+    def __dispatch(self, pool, pending, running, results):
+        """
+        Hands the next projects to the pool - one project per host in turn,
+        as long as the pool has an idle thread and the host a free slot
+
+        :param    pool:     The pool that updates the projects
+        :param    pending:  Dictionary with the host as key and the deque of
+                            its projects that weren't updated yet as value
+        :param    running:  Dictionary with the host as key and the number of
+                            its projects that are being updated as value
+        :param    results:  The queue the results of the updates are put in
+        """
+        started = True
+        while started:
+            started = False
+            for host, projects in pending.items():
+                if sum(running.values()) >= self.__fetches:
+                    return
+                if not projects or running[host] >= self.__fetches_per_host:
+                    continue
+
+                running[host] += 1
+                started = True
+                pool.apply_async(self.__update, (projects.popleft(),),
+                                 callback=results.put,
+                                 error_callback=results.put)
+
+    def __print_update(self, project, update):
+        """
+        Prints the outcome of the update of a project
+
+        :param    project:  The updated project
+        :param    update:   The dictionary returned for the project
+        """
+        if update['error'] is not None:
+            state = 'failed'
+        elif update['changed']:
+            state = 'changed'
+        else:
+            state = 'unchanged'
+
+        # TODO replace by logger or process indication
+        print("~~ Updated '{}' in {:.2f}s - {} bytes fetched - {} ~~".format(
+            project.name, update['seconds'], update['bytes'], state))
+
+    def run(self):
+        """
+        Updates all git and svn projects
+
+        :returns: Dictionary with the project id as key and a dictionary with
+                  weather the project 'changed', the 'seconds' and 'bytes' the
+                  update took and the 'error' it raised or None as value
+        """
+        updates = {}
+        if not self.__projects:
+            return updates
+
+        pending = {}
+        for project in self.__projects:
+            pending.setdefault(self.__host(project.url), deque()).append(
+                project)
+        running = {host: 0 for host in pending}
+        results = queue.Queue()
+
+        pool = ThreadPool(processes=min(self.__fetches, len(self.__projects)))
+        try:
+            self.__dispatch(pool, pending, running, results)
+            while len(updates) < len(self.__projects):
+                result = results.get()
+                if isinstance(result, Exception):
+                    raise result
+
+                project, update = result
+                running[self.__host(project.url)] -= 1
+                self.__dispatch(pool, pending, running, results)
+
+                self.__print_update(project, update)
+                updates[project.id] = update
+        finally:
+            pool.close()
+            pool.join()
+
+        changed = sum(1 for u in updates.values() if u['changed'])
+        failed = sum(1 for u in updates.values() if u['error'] is not None)
+        # TODO replace by logger or process indication
+        print("~~ Updated {} projects - {} changed, {} unchanged, {} failed"
+              " ~~".format(len(updates), changed,
+                           len(updates) - changed - failed, failed))
+        return updates
@@ -0,0 +1,188 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+import ruamel.yaml
+import json
+import os
+
+
+class ReportStore:
+    """
+    Interface of the backends that load and save the report
+    """
+
+    def load(self):
+        """
+        Loads the report of a previous run
+
+        :returns: The report or None if there is no report yet
+        """
+        assert False, "This method has to be implemented"
+
+    def save(self, report):
+        """
+        Saves the report
+
+        :param    report:  The report to save
+        """
+        assert False, "This method has to be implemented"
+
+
+class YamlReportStore(ReportStore):
+    """
+    Stores the whole report in a single yaml file - this is the format that is
+    read by -r/--report and written by -o/--output and --export-yaml
+
+    :param  path:  The path of the yaml file
+    """
+
+    def __init__(self, path):
+        self.__path = path
+
+    def load(self):
+        """
+        Loads the report from the yaml file
+
+        :returns: The report or None if the file doesn't exist
+        """
+        if not os.path.isfile(self.__path):
+            return None
+
+        with open(self.__path, 'r') as f:
+            return ruamel.yaml.load(f.read(), ruamel.yaml.RoundTripLoader)
+
+    def save(self, report):
+        """
+        Writes the report to the yaml file
+
+        :param    report:  The report to save
+        """
+        ruamel.yaml.scalarstring.walk_tree(report)
+        with open(self.__path, 'w') as outfile:
+            ruamel.yaml.dump(
+                report, outfile, Dumper=ruamel.yaml.RoundTripDumper)
+
+
+class DirectoryReportStore(ReportStore):
+    """
+    Stores the report in a directory - the sub-report of every project is kept
+    in its own json file named after the project id and everything else e.g.
+    the report version, the executed tasks and the results of the ReportTasks
+    is kept in 'report.json'.
+
+    The projects are loaded and saved individually. Only the files of projects
+    whose sub-report changed since it was loaded are written, so a run that
+    only updated a few projects only touches those on disk.
+
+    :param  directory:  The directory of the store - it is created if needed
+    """
+
+    def __init__(self, directory):
+        self.__directory = directory
+        self.__projects_dir = os.path.join(directory, 'projects')
+        self.__meta_path = os.path.join(directory, 'report.json')
+        self.__stored = {}
+
+    def __project_path(self, project_id):
+        """
+        :param    project_id:  The id of the project
+
+        :returns: The path of the file the project sub-report is stored in
+        """
+        return os.path.join(self.__projects_dir, project_id + '.json')
+
+    def __serialize(self, data):
+        """
+        Serializes data deterministically to make the stored and the new
+        sub-reports comparable
+
+        :param    data:  The data to serialize
+
+        :returns: The json string
+        """
+        return json.dumps(data, indent=2, sort_keys=True, default=str)
+
+    def __write(self, path, text):
+        """
+        Writes the text atomically to the given path
+
+        :param    path:  The path of the file
+        :param    text:  The text to write
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def load(self):
+        """
+        Loads the report from the directory
+
+        :returns: The report or None if the directory holds no report
+        """
+        if not os.path.isfile(self.__meta_path):
+            return None
+
+        with open(self.__meta_path, 'r') as f:
+            report = json.load(f)
+
+        report['projects'] = {}
+        for project_id in report.pop('project_ids', []):
+            path = self.__project_path(project_id)
+            if not os.path.isfile(path):
+                continue
+
+            with open(path, 'r') as f:
+                text = f.read()
+            self.__stored[project_id] = text
+            report['projects'][project_id] = json.loads(text)
+        return report
+
+    def save(self, report):
+        """
+        Writes the sub-reports of the projects that changed since they were
+        loaded and the remaining report - files of projects that are no longer
+        part of the report are removed
+
+        :param    report:  The report to save
+        """
+        os.makedirs(self.__projects_dir, exist_ok=True)
+        projects = report.get('projects', {})
+
+        for project_id, project_report in projects.items():
+            text = self.__serialize(project_report)
+            if self.__stored.get(project_id) != text:
+                self.__write(self.__project_path(project_id), text)
+                self.__stored[project_id] = text
+
+        meta = {key: report[key] for key in report if key != 'projects'}
+        meta['project_ids'] = list(projects)
+        self.__write(self.__meta_path, self.__serialize(meta))
+
+        for project_id in set(self.__stored) - set(projects):
+            del self.__stored[project_id]
+            path = self.__project_path(project_id)
+            if os.path.isfile(path):
+                os.remove(path)
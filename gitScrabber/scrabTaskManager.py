@@ -30,6 +30,12 @@ import scrabTasks.git
 import scrabTasks.report
 import scrabTasks.file
 
+# The history a scrab task needs from a git repository:
+# - none:    only the checked out files
+# - commits: all commits and trees but not the contents of old files
+# - full:    everything
+histories = ('none', 'commits', 'full')
+
 
 class ScrabTask():
 
@@ -46,6 +52,8 @@ class ScrabTask():
         self.version = self.__obtain_version(module, self.name)
         self.construct = self.__obtain_function(module, self.name)
         self.kind = kind
+        self.history = self.__obtain_history(module, self.name, kind)
+        self.prefetch = self.__obtain_prefetch(module, kind)
 
     def __obtain_name(self, module):
         """
@@ -80,6 +88,48 @@ class ScrabTask():
             raise Exception("You have to specify the version of your "
                             "ScrabTask: '{}'".format(name)) from e
 
+    def __obtain_history(self, module, name, kind):
+        """
+        Obtains the history of the git repository the scrab task needs - it
+        is used to decide how the repositories are cloned. GitTasks that don't
+        specify it are assumed to need the full history.
+
+        :param    module:  The module the scrab task is defined in
+        :param    name:    The name of the scrab task
+        :param    kind:    The kind of the scrab task
+
+        :returns: The history the scrab task needs, one of histories
+        """
+        history = getattr(module, 'history', 'full' if kind == 'git'
+                          else 'none')
+
+        if history not in histories:
+            raise Exception("The history of the ScrabTask '{}' has to be one "
+                            "of {}".format(name, ', '.join(histories)))
+        return history
+
+    def __obtain_prefetch(self, module, kind):
+        """
+        Obtains the optional prefetch function of a GitTask. It is called once
+        before the projects are acquired with the git projects whose report of
+        the task has to be recomputed, the parameter of the task, the global
+        arguments and the ApiScheduler and returns a dictionary with the
+        project id as key and the concurrent.futures.Future of the report of
+        the task as value - e.g. to query a web api for many projects at once
+        in the threads of the ApiScheduler. The task isn't run for these
+        projects - the prefetched report is added to the report of a project
+        once it is analysed and the future is done. A failed future fails the
+        project like a failing task would.
+
+        :param    module:  The module the scrab task is defined in
+        :param    kind:    The kind of the scrab task
+
+        :returns: The prefetch function or None if the task has none
+        """
+        if kind != 'git':
+            return None
+        return getattr(module, 'prefetch', None)
+
     def __obtain_function(self, module, name,):
         """
         Obtains the function that represents the scrab task
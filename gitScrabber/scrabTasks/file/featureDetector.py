@@ -25,10 +25,16 @@ THE SOFTWARE.
 
 
 from ..scrabTask import FileTask
+
+from collections import deque
+
 import regex
 
 name = "FeatureDetector"
-version = "2.0.1"
+version = "2.1.0"
+
+_regex_syntax = regex.compile(r"[.^$*+?{}\[\]\\|()]")
+_alphanumeric = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
 
 
 class Feature():
@@ -49,7 +55,8 @@ class Feature():
 
         queries = self.__generate_queries(queries)
         self.simple_queries = queries[0]
-        self.regex_queries = queries[1]
+        self.bounded_queries = queries[1]
+        self.regex_queries = queries[2]
 
     def __generate_queries(self, queries):
         """
@@ -57,35 +64,173 @@ class Feature():
         file
 
         As abbreviation are prone to be ambiguous it is important to guarantee
-        that they are not part of another word for that Regex is necessary which
-        is slower than a normal search. This function decides weather a query is
-        unique enough to be used in a normal search
+        that they are not part of another word. This function decides weather a
+        query is unique enough to be used in a normal search or has to be
+        bounded by non alphanumeric characters. Short queries that contain
+        regex syntax (e.g. the '.' in 'X.509') keep their regex semantics and
+        are searched with a compiled regex as these can't be expressed as plain
+        strings.
+
+        :param    queries:  The queries to search for
 
-        :param    queries:  The queries to search for, that will probable be
-                            converted to regex queries
+        :returns: Tuple of the simple queries, bounded queries and the regex
+                  queries
         """
         simple_queries = []
+        bounded_queries = []
         regex_queries = []
 
         for query in queries:
             if len(query) > 5:
                 simple_queries.append(query.lower())
+            elif query and not _regex_syntax.search(query):
+                bounded_queries.append(query.lower())
             else:
                 regex_queries.append(
                     #         not before    search        not after
                     regex.compile(r"[^a-z0-9]"+query.lower()+r"[^a-z0-9]"))
-        return (simple_queries, regex_queries)
+        return (simple_queries, bounded_queries, regex_queries)
+
+
+class QueryAutomaton():
+
+    """
+    Aho-Corasick automaton that counts the occurrences of many queries in a
+    single pass over a text.
+
+    The counts are the same as the ones of str.count for simple queries and
+    regex.findall with r"[^a-z0-9]query[^a-z0-9]" for bounded queries - that
+    means the matches of a query do not overlap and bounded matches consume
+    their surrounding characters. Matches of different queries may overlap.
+    Like the regex, only lowercase letters and digits count as alphanumeric -
+    the queries are lowercased but the text is searched as it is.
+
+    :param    queries:  List of tuples (query, bounded) to search for
+    """
+
+    def __init__(self, queries):
+        self.__lengths = [len(query) for query, _ in queries]
+        self.__bounded = [bounded for _, bounded in queries]
+        self.__goto = [{}]
+        self.__fail = [0]
+        self.__outputs = [()]
+
+        for index, (query, _) in enumerate(queries):
+            self.__add_query(index, query)
+        self.__link_states()
+
+        # transitions are extended lazily with the followed failure links
+        self.__transitions = [dict(goto) for goto in self.__goto]
+
+    def __add_query(self, index, query):
+        """
+        Adds a query to the trie of the automaton
+
+        :param    index:  The index of the query
+        :param    query:  The query to add
+        """
+        state = 0
+        for char in query:
+            if char not in self.__goto[state]:
+                self.__goto[state][char] = len(self.__goto)
+                self.__goto.append({})
+                self.__fail.append(0)
+                self.__outputs.append(())
+            state = self.__goto[state][char]
+        self.__outputs[state] += (index,)
+
+    def __link_states(self):
+        """
+        Calculates the failure links of the trie in breadth first order and
+        merges the outputs of the states they point to
+        """
+        queue = deque(self.__goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, child in self.__goto[state].items():
+                queue.append(child)
+
+                fail = self.__fail[state]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(char, 0)
+
+                self.__fail[child] = fail if fail != child else 0
+                self.__outputs[child] += self.__outputs[self.__fail[child]]
+
+    def __transition(self, state, char):
+        """
+        Follows the failure links of a state until the char can be consumed and
+        remembers the result for the next time
+
+        :param    state:  The state to leave
+        :param    char:   The char to consume
+
+        :returns: The next state
+        """
+        next_state = state
+        while next_state and char not in self.__goto[next_state]:
+            next_state = self.__fail[next_state]
+        next_state = self.__goto[next_state].get(char, 0)
+
+        self.__transitions[state][char] = next_state
+        return next_state
+
+    def count(self, text):
+        """
+        Counts the queries in the given text
+
+        :param    text:  The text to search in
+
+        :returns: List of the counts - in the order of the queries
+        """
+        counts = [0] * len(self.__lengths)
+        ends = [0] * len(self.__lengths)
+        lengths = self.__lengths
+        bounded = self.__bounded
+        outputs = self.__outputs
+        transitions = self.__transitions
+        text_length = len(text)
+        state = 0
+
+        for position, char in enumerate(text):
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                next_state = self.__transition(state, char)
+            state = next_state
+
+            for index in outputs[state]:
+                start = position + 1 - lengths[index]
+
+                if bounded[index]:
+                    if (start < 1
+                            or position + 1 >= text_length
+                            or start - 1 < ends[index]
+                            or text[start - 1] in _alphanumeric
+                            or text[position + 1] in _alphanumeric):
+                        continue
+                    ends[index] = position + 2
+                else:
+                    if start < ends[index]:
+                        continue
+                    ends[index] = position + 1
+                counts[index] += 1
+        return counts
 
 
 class FeatureDetector(FileTask):
     """
     Detects features in the project files based on search queries. The files and
-    queries are handled caseINSENSITIVE and ambiguous queries will be wrapped in
-    a regex expression to improve accuracy.
+    queries are handled caseINSENSITIVE and ambiguous queries have to be bounded
+    by non alphanumeric characters to improve accuracy. All queries are counted
+    in a single pass over the file.
 
     All files are considered - except files that that are hidden (unix way -
     leading .) as documentation and readme files might also contain hints
-    towards features
+    towards features - and binary files (a NUL byte in their first 8000
+    bytes, like git decides it) whose contents are skipped since 2.1.0
 
     Example:
         FeatureDetector:
@@ -127,6 +272,7 @@ class FeatureDetector(FileTask):
                         "{category: {feature: [query, query]}}")
 
         self.__features = self.__make_feature_list(parameter)
+        self.__automaton, self.__feature_queries = self.__make_automaton()
 
     def __make_feature_list(self, featue_queries):
         """
@@ -146,21 +292,77 @@ class FeatureDetector(FileTask):
                         queries=featue_queries[category][feature]))
         return features
 
+    def __make_automaton(self):
+        """
+        Creates the automaton that searches for the simple and bounded queries
+        of all features at once. Queries that are shared between features are
+        only searched once.
+
+        :returns: Tuple of the automaton and a list with the indices of the
+                  automaton queries for each feature
+        """
+        queries = {}
+        feature_queries = []
+
+        for feature in self.__features:
+            keys = ([(query, False) for query in feature.simple_queries]
+                    + [(query, True) for query in feature.bounded_queries])
+            feature_queries.append(
+                [queries.setdefault(key, len(queries)) for key in keys])
+
+        return (QueryAutomaton(sorted(queries, key=queries.get)),
+                feature_queries)
+
     def scrab(self, project, filepath, file):
         """
         Finds features in a file
 
         :param    project:   The project that the scrab task shall analyse
         :param    filepath:  The filepath to the file that can be analysed
-        :param    file:      The file as string that can be analysed
+        :param    file:      The ProjectFile that can be analysed
 
-        :returns: Dictionary containing the numbers of queries from the features
+        :returns: Dictionary containing the index of the found features as key
+                  and the number of found queries as value
         """
-        for feature in self.__features:
-            for query in feature.simple_queries:
-                feature.count += file.count(query)
+        text = file.text()
+        counts = self.__automaton.count(text)
+        result = {}
+
+        for i, feature in enumerate(self.__features):
+            count = sum(counts[index] for index in self.__feature_queries[i])
             for query in feature.regex_queries:
-                feature.count += len(query.findall(file, concurrent=True))
+                count += len(query.findall(text, concurrent=True))
+
+            if count > 0:
+                result[i] = count
+        self.add(project, filepath, result)
+        return result
+
+    def add(self, project, filepath, result):
+        """
+        Adds the found features of a file
+
+        :param    project:   The project that the scrab task shall analyse
+        :param    filepath:  The filepath to the file that was analysed
+        :param    result:    The result scrab returned for the file
+        """
+        for index in result:
+            self.__features[index].count += result[index]
+
+    def partial(self):
+        """
+        :returns: The list of the feature counts
+        """
+        return [feature.count for feature in self.__features]
+
+    def merge(self, partial):
+        """
+        Merges the feature counts of another FeatureDetector
+
+        :param    partial:  The feature counts of the other FeatureDetector
+        """
+        for feature, count in zip(self.__features, partial):
+            feature.count += count
 
     def report(self):
         """
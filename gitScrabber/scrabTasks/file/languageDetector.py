@@ -24,9 +24,7 @@ THE SOFTWARE.
 """
 
 
-from ..scrabTask import FileTask
-
-import os
+from ..scrabTask import FileTask, FileInput
 
 name = "LanguageDetector"
 version = "1.1.1"
@@ -213,22 +211,54 @@ class LanguageDetector(FileTask):
 
         return sorted(languages, key=languages.get, reverse=True)
 
+    def file_input(self):
+        """
+        :returns: The FileInput of this task - only the paths of the files are
+                  needed
+        """
+        return FileInput('path')
+
     def scrab(self, project, filepath, file):
         """
         Counts the files that have an extension of one of the languages
 
         :param    project:   The project that the scrab task shall analyse
         :param    filepath:  The filepath to the file that can be analysed
-        :param    file:      The file as string that can be analysed
+        :param    file:      The ProjectFile that can be analysed
 
-        :returns: Report that contains the scrabbed information of *this* file
-                  - the extensions have either a count of 0 or 1
+        :returns: The extension of the file
         """
-        filename, file_extension = os.path.splitext(filepath)
+        file_extension = file.extension()
+        self.add(project, filepath, file_extension)
+        return file_extension
 
+    def add(self, project, filepath, result):
+        """
+        Counts the extension of a file
+
+        :param    project:   The project that the scrab task shall analyse
+        :param    filepath:  The filepath to the file that was analysed
+        :param    result:    The result scrab returned for the file
+        """
         for language in self.__language_extensions:
-            if file_extension in self.__language_extensions[language]:
-                self.__report[language][file_extension] += 1
+            if result in self.__language_extensions[language]:
+                self.__report[language][result] += 1
+
+    def partial(self):
+        """
+        :returns: The extension counts of the languages
+        """
+        return self.__report
+
+    def merge(self, partial):
+        """
+        Merges the extension counts of another LanguageDetector
+
+        :param    partial:  The extension counts of the other LanguageDetector
+        """
+        for language in partial:
+            for extension, count in partial[language].items():
+                self.__report[language][extension] += count
 
     def report(self):
         """
@@ -23,37 +23,15 @@ THE SOFTWARE.
 """
 
 
-from ..scrabTask import FileTask
+from ..scrabTask import FileTask, FileInput
 
-from collections import Counter
-from pkg_resources import resource_filename
+from licenceCorpus import load_corpus, text_to_vector
 
-import json
-import math
-import os
-import regex
+import numpy
 
 
 name = "LicenceDetector"
-version = "1.0.3"
-
-
-class MetaLicence():
-
-    """
-    Convenience object that contains the needed data for the licence matching
-
-    :param  name:    The name of the licence
-    :param  short:   The short name of the licence
-    :param  length:  The length of the licence text
-    :param  vector:  The vector of word counts of the licence text
-    """
-
-    def __init__(self, name, short, length, vector):
-        self.name = name
-        self.short = short
-        self.length = length
-        self.vector = vector
+version = "1.1.0"
 
 
 def mean(list):
@@ -83,6 +61,14 @@ class LicenceDetector(FileTask):
         - licence: JSON License
           confidence: 98.84
           short: JSON
+        .candidates:
+          scored: 12
+          pruned: 4788
+
+    The files are only compared with the candidate licences the corpus finds
+    for them - '.candidates' holds how many comparisons were scored and how
+    many were pruned. Hidden files are never analysed so the key can't clash
+    with a file.
 
     [1] https://github.com/spdx/license-list-data
 
@@ -98,108 +84,47 @@ class LicenceDetector(FileTask):
     def __init__(self, parameter, global_args):
         super(LicenceDetector, self).__init__(name, version, parameter,
                                               global_args)
-        self.__word_regex = regex.compile(r'\w+')
-        self.__licences = self.__generate_licences()
-
-        self.__med_length = mean([node.length for node in self.__licences])
-        self.__max_length = max(node.length for node in self.__licences)
+        self.__corpus = load_corpus()
+        self.__names = self.__corpus.names.tolist()
+        self.__shorts = self.__corpus.shorts.tolist()
+
+        lengths = self.__corpus.lengths.tolist()
+        self.__med_length = mean(lengths)
+        self.__max_length = max(lengths)
+        # short licences are compared against the beginning of the files only
+        self.__short_licences = self.__corpus.lengths < self.__med_length
+        self.__threshold = .95
         self.__report = {}
-
-        self.__files = [
-            '.h', '.hpp', '.hxx', '.rs', '.java', '.go', '.js', '.m', '.mm',
-            '.C', '.swift', '.cs', '.php', '.phtml', '.php3', '.php4', '.php5',
-            '.php7', '.phps', '.py', '.rb']
-
-    def __read_licence(self, filepath):
-        """
-        Reads licence from the given path and creates the MetaLicence objects
-        with word vectors that are later used to calculate the similarities
-
-        :param    filepath:  The filepath to read the licences from
-
-        :returns: A list of licence objects
-        """
-        licences = []
-        with open(filepath, 'r') as fh:
-            licence = json.load(fh)
-            name = licence['name']
-            short = licence['licenseId']
-
-            if 'licenseText' in licence:
-                licences.append(
-                    MetaLicence(name,
-                                short,
-                                len(licence['licenseText']),
-                                self.__text_to_vector(licence['licenseText'])))
-            elif 'standardLicenseTemplate' in licence:
-                licences.append(
-                    MetaLicence(name,
-                                short,
-                                len(licence['standardLicenseTemplate']),
-                                self.__text_to_vector(
-                                    licence['standardLicenseTemplate'])))
-
-            if 'standardLicenseHeader' in licence:
-                licences.append(
-                    MetaLicence(name+' Header',
-                                short,
-                                len(licence['standardLicenseHeader']),
-                                self.__text_to_vector(
-                                    licence['standardLicenseHeader'])))
-        return licences
-
-    def __generate_licences(self):
-        """
-        Generates the MetaLicence objects from the licence data
-
-        :returns: List of licence objects
-        """
-        json_licence_dir = os.path.abspath(
-            resource_filename('gitScrabber', 'license-list-data/json/details'))
-        licences = []
-
-        for file in os.listdir(json_licence_dir):
-            if file.endswith(".json"):
-                filepath = os.path.join(json_licence_dir, file)
-                licences.extend(self.__read_licence(filepath))
-        return licences
-
-    def __calc_cosine(self, vec1, vec2):
-        """
-        Calculates the cosine similarity of two text vectors - taken from [1].
-        This is the main slowdown of this task as the vector calculation is
-        quite fast compared to the calculations that take place here.
-
-        [1] https://stackoverflow.com/a/15174569/1935553
-
-        :param    vec1:  The first vector that will be compared to the second
-        :param    vec2:  The second vector that will be compared to the first
-
-        :returns: The cosine similarity between the two vectors
-        """
-        intersection = set(vec1.keys()) & set(vec2.keys())
-        numerator = sum([vec1[x] * vec2[x] for x in intersection])
-
-        sum1 = sum([vec1[x]**2 for x in vec1.keys()])
-        sum2 = sum([vec2[x]**2 for x in vec2.keys()])
-        denominator = math.sqrt(sum1) * math.sqrt(sum2)
-
-        if not denominator:
-            return 0.0
-        else:
-            return float(numerator) / denominator
+        self.__scored = 0
+        self.__pruned = 0
+
+        # only the beginning of the files is compared against the licences
+        self.__file_input = FileInput(
+            'prefix', limit=int(self.__max_length * 1.3),
+            extensions=[
+                '.h', '.hpp', '.hxx', '.rs', '.java', '.go', '.js', '.m',
+                '.mm', '.C', '.swift', '.cs', '.php', '.phtml', '.php3',
+                '.php4', '.php5', '.php7', '.phps', '.py', '.rb'],
+            names=['copying', 'licence', 'license', 'acknowledgement',
+                   'readme'])
 
     def __text_to_vector(self, text):
         """
         Converts text to a list of words and the number of occurrences
 
-        :param    text:  The text to be converted to a list of words and their
-                         number of occurrences
+        :param    text:  The lowercased text to be converted to a list of words
+                         and their number of occurrences
 
         :returns: List of words and their occurrences in the given text
         """
-        words = self.__word_regex.findall(text.lower(), concurrent=True)
-        return Counter(words)
+        return text_to_vector(text)
+
+    def file_input(self):
+        """
+        :returns: The FileInput of this task - the beginning of the licence
+                  candidates is needed
+        """
+        return self.__file_input
 
     def scrab(self, project, filepath, file):
         """
@@ -207,52 +132,85 @@ class LicenceDetector(FileTask):
 
         :param    project:   The project that the scrab task shall analyse
         :param    filepath:  The filepath to the file that can be analysed
-        :param    file:      The file as string that can be analysed
+        :param    file:      The ProjectFile that can be analysed
 
-        :returns: Report that contains the scrabbed info
+        :returns: None if the file is no licence candidate, otherwise a tuple
+                  of the list of the best matching licences or None, the
+                  number of scored and the number of pruned licences
         """
-
-        filename, file_extension = os.path.splitext(filepath)
-        filename = os.path.basename(filename)
-
-        relative_path = filepath[len(project.location)+1:]
-
-        if (file_extension not in self.__files
-                and 'copying' not in filename.lower()
-                and 'licence' not in filename.lower()
-                and 'license' not in filename.lower()
-                and 'acknowledgements' not in filename.lower()
-                and 'acknowledgement' not in filename.lower()
-                and 'readme' not in filename.lower()):
-            return
+        if not self.__file_input.needs(filepath):
+            return None
 
         file_vec_med = self.__text_to_vector(
-            file[:int(self.__med_length * 1.3)])
+            file.lower()[:int(self.__med_length * 1.3)])
         file_vec_max = self.__text_to_vector(
-            file[:int(self.__max_length * 1.3)])
+            file.lower()[:int(self.__max_length * 1.3)])
+        matches = []
+
+        candidates = numpy.where(
+            self.__short_licences,
+            self.__corpus.candidates(file_vec_med, self.__threshold),
+            self.__corpus.candidates(file_vec_max, self.__threshold))
+        rows = numpy.flatnonzero(candidates)
+        short_rows = rows[self.__short_licences[rows]]
+        long_rows = rows[~self.__short_licences[rows]]
+
+        cosines = numpy.zeros(len(self.__names))
+        cosines[short_rows] = self.__corpus.similarities(file_vec_med,
+                                                         short_rows)
+        cosines[long_rows] = self.__corpus.similarities(file_vec_max,
+                                                        long_rows)
+
+        for i in numpy.flatnonzero(cosines > self.__threshold).tolist():
+            matches.append({
+                'licence': self.__names[i],
+                'confidence': float("{0:.2f}".format(cosines[i]*100)),
+                'short': self.__shorts[i]
+            })
+
+        best = None
+        if matches:
+            best = sorted(matches, key=lambda k: k['confidence'],
+                          reverse=True)[:3]
+        result = (best, len(rows), len(self.__names) - len(rows))
+        self.add(project, filepath, result)
+        return result
+
+    def add(self, project, filepath, result):
+        """
+        Adds the matched licences of a file
 
-        for licence in self.__licences:
-            cosine = 0
+        :param    project:   The project that the scrab task shall analyse
+        :param    filepath:  The filepath to the file that was analysed
+        :param    result:    The result scrab returned for the file
+        """
+        if result is None:
+            return
 
-            if licence.length < self.__med_length:
-                cosine = self.__calc_cosine(file_vec_med, licence.vector)
-            else:
-                cosine = self.__calc_cosine(file_vec_max, licence.vector)
+        best, scored, pruned = result
+        if best is not None:
+            self.__report[filepath[len(project.location)+1:]] = best
+        self.__scored += scored
+        self.__pruned += pruned
 
-            if cosine > .95:
-                if relative_path not in self.__report:
-                    self.__report[relative_path] = []
+    def partial(self):
+        """
+        :returns: Tuple of the matched licences of the files and the number of
+                  scored and pruned licences - the corpus is left out
+        """
+        return (self.__report, self.__scored, self.__pruned)
 
-                self.__report[relative_path].append({
-                    'licence': licence.name,
-                    'confidence': float("{0:.2f}".format(cosine*100)),
-                    'short': licence.short
-                })
+    def merge(self, partial):
+        """
+        Merges the matched licences of another LicenceDetector - as the files
+        of both are distinct the matches don't have to be combined
 
-        if relative_path in self.__report:
-            self.__report[relative_path] = sorted(
-                self.__report[relative_path],
-                key=lambda k: k['confidence'], reverse=True)[:3]
+        :param    partial:  The partial results of the other LicenceDetector
+        """
+        report, scored, pruned = partial
+        self.__report.update(report)
+        self.__scored += scored
+        self.__pruned += pruned
 
     def report(self):
         """
@@ -266,6 +224,13 @@ class LicenceDetector(FileTask):
                       - licence: JSON License
                         confidence: 98.84
                         short: JSON
-
+                      .candidates:
+                        scored: 12
+                        pruned: 4788
         """
+        if self.__scored or self.__pruned:
+            self.__report['.candidates'] = {
+                'scored': self.__scored,
+                'pruned': self.__pruned
+            }
         return self.__report
@@ -23,19 +23,394 @@ THE SOFTWARE.
 """
 
 
-from ..scrabTask import FileTask
+from ..scrabTask import FileTask, FileInput
+import re
 import regex
-import os
 
 name = "ProjectMetrics"
-version = "1.0.1"
+version = "1.1.0"
+
+_indentation = regex.compile(r'[\t\f\v ]*')
+# re is used on purpose - its \S matches the same characters str.rstrip keeps
+_non_space = re.compile(r'\S')
+# strings that end with the first unescaped quote - possessive to fail in
+# linear time if the string isn't terminated
+_strings = {
+    quote: regex.compile(r'{0}(?:[^{0}\\]++|\\.)*+{0}'.format(quote),
+                         regex.DOTALL)
+    for quote in ('"', "'")
+}
+
+
+class CommentTokenizer():
+    """
+    Tokenizes source code in code and comments to count the lines of code
+    without comments in a single pass and without building the text without
+    comments.
+
+    The tokenizer is a state machine that jumps from token to token and
+    reproduces the tokens the former comment removing regexes matched - a
+    comment that is the only content of its line is removed with its newline,
+    strings are kept and can't contain comments.
+
+    The regexes were a modified / improved version of the code found at [1].
+
+    [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
+
+    :param  style:  The comment style of the language - 'c', 'php', 'python'
+                    or 'ruby'
+    """
+
+    def __init__(self, style):
+        self.__text = None
+        self.__length = 0
+        self.__found = {}
+        self.__string_specials = {}
+
+        # the token functions are chosen in count_lines as bound methods
+        # can't be pickled and the tokenizers are passed between processes
+        self.__style = style
+        if style == 'c':
+            self.__hash_comments = False
+            self.__code_end = re.compile(r'[/"\'\\]')
+            self.__line_starters = None
+        elif style == 'php':
+            self.__hash_comments = True
+            self.__code_end = re.compile(r'[/"\'\\]')
+            self.__line_starters = None
+        elif style == 'python':
+            self.__code_end = re.compile(r'[\n"\'#]')
+            self.__line_starters = '"\'#'
+        elif style == 'ruby':
+            self.__code_end = re.compile(r'[\n"\'#%]')
+            self.__line_starters = '"\'#%='
+        else:
+            raise Exception("Unknown comment style '{}'".format(style))
+
+    def __find(self, sub, start):
+        """
+        Finds the first occurrence of sub at or after start - the result is
+        remembered to not search the rest of the text again for every
+        unterminated comment or string
+
+        :param    sub:    The string to find
+        :param    start:  The position to start the search at
+
+        :returns: The position of sub or -1
+        """
+        if sub in self.__found:
+            begin, found = self.__found[sub]
+            if begin <= start and (found == -1 or found >= start):
+                return found
+
+        found = self.__text.find(sub, start)
+        self.__found[sub] = (start, found)
+        return found
+
+    def __line_end(self, pos):
+        """
+        :param    pos:  The position in the text
+
+        :returns: The position of the next newline at or after pos or the end
+                  of the text
+        """
+        end = self.__find('\n', pos)
+        return self.__length if end == -1 else end
+
+    def __string_end(self, pos, quote, stop):
+        """
+        Finds the end of a string that starts at pos - backslashes escape the
+        next character
+
+        :param    pos:    The position of the opening quote
+        :param    quote:  The character that closes the string
+        :param    stop:   The character that can't be part of the string - the
+                          last closing quote before it ends the string, if it
+                          differs from quote and doesn't directly follow the
+                          opening quote or an escaped character
+
+        :returns: The position after the closing quote or None if the string
+                  isn't terminated
+        """
+        text = self.__text
+        if quote == stop:
+            match = _strings[quote].match(text, pos)
+            return None if match is None else match.end()
+
+        if (quote, stop) not in self.__string_specials:
+            self.__string_specials[(quote, stop)] = regex.compile(
+                '[{}\\\\]'.format(regex.escape(quote + stop)))
+        special = self.__string_specials[(quote, stop)]
+        end = None
+        # the quote follows the opening quote or an escaped character
+        follows_escape = True
+        pos += 1
+
+        while True:
+            match = special.search(text, pos)
+            if match is None:
+                return end
+
+            follows_escape = follows_escape and match.start() == pos
+            pos = match.start()
+            char = text[pos]
+            if char == '\\':
+                if pos + 1 >= self.__length:
+                    return end
+                pos += 2
+                follows_escape = True
+            elif char == quote:
+                end = pos + 1
+                if follows_escape:
+                    return end
+                follows_escape = False
+                pos += 1
+            else:
+                return end
+
+    def __next_code(self, pos):
+        """
+        :param    pos:  The position of code
+
+        :returns: The position after the code that starts at pos - code of
+                  python and ruby continues on the next line unless the line
+                  could start with a comment, a docstring or a string
+        """
+        text = self.__text
+        if not self.__line_starters:
+            match = self.__code_end.search(text, pos + 1)
+            return self.__length if match is None else match.start()
+
+        search = pos + 1
+        newline = pos if text[pos] == '\n' else None
+
+        while True:
+            if newline is None:
+                match = self.__code_end.search(text, search)
+                if match is None:
+                    return self.__length
+                if text[match.start()] != '\n':
+                    return match.start()
+                newline = match.start()
+
+            line = newline + 1
+            if line >= self.__length:
+                return line
+            indented = _indentation.match(text, line).end()
+            if indented == self.__length:
+                return self.__length
+            if text[indented] == '\n':
+                newline = indented
+            elif text[indented] in self.__line_starters:
+                return line
+            else:
+                newline = None
+                search = indented
+
+    def __next_c_token(self, pos):
+        """
+        Finds the token that starts at pos in c style source code
+
+        :param    pos:  The position of the token
+
+        :returns: Tuple of the position after the token and weather it is code
+        """
+        text = self.__text
+
+        if pos == 0 or text[pos - 1] == '\n':
+            indented = _indentation.match(text, pos).end()
+            if text.startswith('/*', indented):
+                end = self.__find('*/', indented + 2)
+                if end != -1 and text.startswith('\n', end + 2):
+                    return (end + 3, False)
+            elif text.startswith('//', indented) or (
+                    self.__hash_comments and text.startswith('#', indented)):
+                end = self.__find('\n', indented + 1)
+                if end != -1:
+                    return (end + 1, False)
+
+        char = text[pos]
+        if char == '/':
+            if text.startswith('*', pos + 1):
+                end = self.__find('*/', pos + 2)
+                if end != -1:
+                    return (end + 2, False)
+            elif text.startswith('/', pos + 1):
+                return (self.__line_end(pos), False)
+        elif char == '#' and self.__hash_comments:
+            return (self.__line_end(pos), False)
+        elif char == '"' or char == "'":
+            end = self.__string_end(pos, char, char)
+            if end is not None:
+                return (end, True)
+
+        return (self.__next_code(pos), True)
+
+    def __next_python_token(self, pos):
+        """
+        Finds the token that starts at pos in python source code
+
+        :param    pos:  The position of the token
+
+        :returns: Tuple of the position after the token and weather it is code
+        """
+        text = self.__text
+
+        if pos == 0 or text[pos - 1] == '\n':
+            indented = _indentation.match(text, pos).end()
+            for quotes in ('"""', "'''"):
+                if text.startswith(quotes, indented):
+                    end = self.__find(quotes + '\n', indented + 3)
+                    if end != -1:
+                        return (end + 4, False)
+            if text.startswith('#', indented):
+                end = self.__find('\n', indented + 1)
+                if end != -1:
+                    return (end + 1, False)
+
+        char = text[pos]
+        if char == '#':
+            return (self.__line_end(pos), False)
+        elif char == '"' or char == "'":
+            if text.startswith(char * 3, pos):
+                end = self.__find(char * 3, pos + 3)
+                if end != -1:
+                    return (end + 3, True)
+            end = self.__string_end(pos, char, char)
+            if end is not None:
+                return (end, True)
+
+        return (self.__next_code(pos), True)
+
+    def __ruby_special_string_end(self, pos):
+        """
+        Finds the end of a %, %q or %Q string that starts at pos
+
+        :param    pos:  The position of the %
+
+        :returns: The position after the string or None if there is none
+        """
+        text = self.__text
+        brackets = {'(': ')', '{': '}', '[': ']', '<': '>'}
+
+        # the delimiter either follows q / Q or the % itself
+        for start in (pos + 2, pos + 1):
+            if start == pos + 2 and not text.startswith(('q', 'Q'), pos + 1):
+                continue
+            if start >= self.__length:
+                continue
+
+            opening = text[start]
+            if opening not in brackets:
+                end = self.__find(opening, start + 1)
+                if end != -1:
+                    return end + 1
+
+        for start in (pos + 2, pos + 1):
+            if start == pos + 2 and not text.startswith(('q', 'Q'), pos + 1):
+                continue
+            if start >= self.__length:
+                continue
+
+            opening = text[start]
+            if opening in brackets:
+                end = self.__find(brackets[opening], start + 1)
+                if end != -1:
+                    return end + 1
+        return None
+
+    def __next_ruby_token(self, pos):
+        """
+        Finds the token that starts at pos in ruby source code
+
+        :param    pos:  The position of the token
+
+        :returns: Tuple of the position after the token and weather it is code
+        """
+        text = self.__text
+
+        if pos == 0 or text[pos - 1] == '\n':
+            indented = _indentation.match(text, pos).end()
+            if text.startswith('=begin', indented):
+                end = self.__find('=end\n', indented + 6)
+                if end != -1:
+                    return (end + 5, False)
+            if text.startswith('#', indented):
+                end = self.__find('\n', indented + 1)
+                if end != -1:
+                    return (end + 1, False)
+
+        char = text[pos]
+        end = None
+        if char == '#':
+            return (self.__line_end(pos), False)
+        elif char == '"':
+            end = self.__string_end(pos, '"', '"')
+        elif char == "'":
+            end = self.__string_end(pos, "'", '"')
+        elif char == '%':
+            end = self.__ruby_special_string_end(pos)
+
+        if end is not None:
+            return (end, True)
+        return (self.__next_code(pos), True)
+
+    def count_lines(self, text):
+        """
+        Counts the lines of code without comments - the same way as
+        text.rstrip().count('\\n') would do on the text without comments
+
+        :param    text:  The source code
+
+        :returns: The number of lines of code without comments
+        """
+        self.__text = text
+        self.__length = len(text)
+        self.__found = {}
+
+        if self.__style == 'python':
+            next_token = self.__next_python_token
+        elif self.__style == 'ruby':
+            next_token = self.__next_ruby_token
+        else:
+            next_token = self.__next_c_token
+
+        newlines = 0
+        # the code after the last non whitespace code doesn't count
+        last_code = None
+        trailing = 0
+        pos = 0
+
+        while pos < self.__length:
+            end, code = next_token(pos)
+
+            if code:
+                count = text.count('\n', pos, end)
+                newlines += count
+                if _non_space.search(text, pos, end):
+                    last_code = (pos, end)
+                    trailing = 0
+                else:
+                    trailing += count
+            pos = end
+
+        self.__text = None
+        if last_code is None:
+            return 0
+
+        start, end = last_code
+        code = text[start:end]
+        trailing += code[len(code.rstrip()):].count('\n')
+        return newlines - trailing
 
 
 class ProjectMetrics(FileTask):
     """
     The task counts the LOC with and without comments as well as the number of
     source files and total files to provide an indication of the size of the
-    given project
+    given project. Since 1.1.0 the contents of binary files (a NUL byte in
+    their first 8000 bytes, like git decides it) are skipped - this includes
+    sources encoded in UTF-16, which count as files but not as LOC.
 
     Example:
         ProjectMetrics:
@@ -59,371 +434,42 @@ class ProjectMetrics(FileTask):
 
         super(ProjectMetrics, self).__init__(name, version, parameter,
                                              global_args)
-        self.__queries = self.__generate_queries()
+        self.__tokenizers = self.__generate_tokenizers()
         self.__total_files = 0
         self.__source_files = 0
         self.__source_loc = 0
         self.__cleaned_loc = 0
 
-    def __c_style_comment_query(self):
-        """
-        Regex to remove c style comments from a string. This is a modified /
-        improved version of the code found at [1]. Mainly the newlines from
-        comments are also removed if this line was only used by a comment.
-
-        [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
-
-        :returns: Regex with match group 1 that contains all code that is not a
-                  comment
-        """
-        pattern = r"""
-                             ## ---- SOLITARY MULTI LINE COMMENT ----
-            ^[\t\f\v ]*      ##  Start with only spaces on line
-            /\*              ##  Start of /* ... */ comment
-            [^*]*\*+         ##  Non-* followed by 1-or-more *'s
-            (?:              ##
-              [^/*][^*]*\*+  ##
-            )*               ##  0-or-more things which don't start with /
-                             ##     but do end with '*'
-            /                ##  End of /* ... */ comment
-            \n               ##  match trailing new line as this line was only
-                             ##     used for a comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- MULTI LINE COMMENT ----
-            /\*              ##  Start of /* ... */ comment
-            [^*]*\*+         ##  Non-* followed by 1-or-more *'s
-            (?:              ##
-              [^/*][^*]*\*+  ##
-            )*               ##  0-or-more things which don't start with /
-                             ##     but do end with '*'
-            /                ##  End of /* ... */ comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- SOLITARY SINGLE LINE COMMENT ----
-             ^[\t\f\v ]*     ##  Start with only spaces on line
-             //              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-             \n              ##  match trailing new line as this line was only
-                             ##     used for a comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- SINGLE LINE COMMENT ----
-             //              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-          |                  ## ---------------- OR ----------------
-            (                ## ---- " ... " STRING ----
-              "              ##  Start of " ... " string
-              (?:            ##
-                (?:          ##
-                  \\.        ##  Escaped char
-                )*           ##
-              |              ## ---------------- OR ----------------
-                [^"\\]*      ##  Non "\ characters
-              )*             ##
-              "              ##  End of " ... " string
-            |                ## ---------------- OR ----------------
-                             ## ---- ' ... ' STRING ----
-              '              ##  Start of ' ... ' string
-              (?:            ##
-                (?:          ##
-                  \\.        ##  Escaped char
-                )*           ##
-              |              ## ---------------- OR ----------------
-                [^'\\]*      ##  Non '\ characters
-              )*             ##
-              '              ##  End of ' ... ' string
-            |                ## ---------------- OR ----------------
-                             ## ---- ANYTHING ELSE ----
-              .              ##  Anything other char
-              [^/"'\\]*      ##  Chars which doesn't start a comment, string
-            )                ##    or escape
-        """
-        flags = regex.VERBOSE | regex.MULTILINE | regex.DOTALL
-        return regex.compile(pattern, flags)
-
-    def __php_style_comment_query(self):
-        """
-        Regex to remove php style comments from a string. This is a modified /
-        improved version of the code found at [1]. Mainly the newlines from
-        comments are also removed if this line was only used by a comment.
-
-        [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
-
-        :returns: Regex with match group 1 that contains all code that is not a
-                  comment
-        """
-        pattern = r"""
-                             ## ---- SOLITARY MULTI LINE COMMENT ----
-            ^[\t\f\v ]*      ##  Start with only spaces on line
-            /\*              ##  Start of /* ... */ comment
-            [^*]*\*+         ##  Non-* followed by 1-or-more *'s
-            (?:              ##
-              [^/*][^*]*\*+  ##
-            )*               ##  0-or-more things which don't start with /
-                             ##     but do end with '*'
-            /                ##  End of /* ... */ comment
-            \n               ##  match trailing new line as this line was only
-                             ##     used for a comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- MULTI LINE COMMENT ----
-            /\*              ##  Start of /* ... */ comment
-            [^*]*\*+         ##  Non-* followed by 1-or-more *'s
-            (?:              ##
-              [^/*][^*]*\*+  ##
-            )*               ##  0-or-more things which don't start with /
-                             ##     but do end with '*'
-            /                ##  End of /* ... */ comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- SOLITARY SINGLE LINE COMMENT ----
-             ^[\t\f\v ]*     ##  Start with only spaces on line
-             //              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-             \n              ##  match trailing new line as this line was only
-                             ##     used for a comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- SINGLE LINE COMMENT ----
-             //              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-          |                  ## ---------------- OR ----------------
-                             ## ---- SOLITARY SINGLE LINE COMMENT ----
-             ^[\t\f\v ]*     ##  Start with only spaces on line
-             \#              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-             \n              ##  match trailing new line as this line was only
-                             ##     used for a comment
-          |                  ## ---------------- OR ----------------
-                             ## ---- SINGLE LINE COMMENT ----
-             \#              ##  Single line comment
-             [^\n]*          ##  match anything but new line
-          |                  ## ---------------- OR ----------------
-            (                ## ---- " ... " STRING ----
-              "              ##  Start of " ... " string
-              (?:            ##
-                 (?:         ##
-                   \\.       ##  Escaped char
-                 )*          ##
-              |              ## ---------------- OR ----------------
-                [^"\\]*      ##  Non "\ characters
-              )*             ##
-              "              ##  End of " ... " string
-            |                ## ---------------- OR ----------------
-                             ## ---- ' ... ' STRING ----
-              '              ##  Start of ' ... ' string
-              (?:            ##
-                 (?:         ##
-                   \\.       ##  Escaped char
-                 )*          ##
-              |              ## ---------------- OR ----------------
-                [^'\\]*      ##  Non '\ characters
-              )*             ##
-              '              ##  End of ' ... ' string
-            |                ## ---------------- OR ----------------
-                             ## ---- ANYTHING ELSE ----
-              .              ##  Anything other char
-              [^/"'\\]*      ##  Chars which doesn't start a comment, string
-            )                ##    or escape
-        """
-        flags = regex.VERBOSE | regex.MULTILINE | regex.DOTALL
-        return regex.compile(pattern, flags)
-
-    def __python_style_comment_query(self):
-        """
-        Regex to remove python style comments from a string. This is a modified
-        / improved version of the code found at [1]. Mainly the newlines from
-        comments are also removed if this line was only used by a comment.
-
-        [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
-
-        :returns: Regex with match group 1 that contains all code that is not a
-                  comment
-        """
-        pattern = r"""
-                              ## ---- ""DocString"" ----
-            ^[\t\f\v ]*       ##  Start with only spaces on line
-            \"\"\"            ##  Start of DocString comment
-            .*?               ##  Anything
-            \"\"\"            ##  End of DocString comment
-            \n                ##  match trailing new line as this line was
-                              ##    only used for a comment
-          |                   ## ---------------- OR ----------------
-                              ## ---- ''DocString'' ----
-            ^[\t\f\v ]*       ##  Start with only spaces on line
-            \'\'\'            ##  Start of DocString comment
-            .*?               ##  Anything
-            \'\'\'            ##  End of DocString comment
-            \n                ##  match trailing new line as this line was
-                              ##    only used for a comment
-          |                   ## ---------------- OR ----------------
-                              ## ---- SOLITARY SINGLE LINE COMMENT ----
-             ^[\t\f\v ]*      ##  Start with only spaces on line
-             \#               ##  Single line comment
-             [^\n]*           ##  match anything but new line
-             \n               ##  match trailing new line as this line was
-                              ##    only used for a comment
-          |                   ## ---------------- OR ----------------
-                              ## ---- SINGLE LINE COMMENT ----
-             \#               ##  Single line comment
-             [^\n]*           ##  match anything but new line
-          |                   ## ---------------- OR ----------------
-            (                 ## ---- ""Multiline String"" ----
-                \"\"\"        ##  Start of Multiline String comment
-                .*?           ##  Anything
-                \"\"\"        ##  End of /* ... */ comment
-              |               ## ---------------- OR ----------------
-                              ## ---- ''Multiline String'' ----
-                \'\'\'        ##  Start of Multiline String comment
-                .*?           ##  Anything
-                \'\'\'        ##  End of /* ... */ comment
-              |               ## ---------------- OR ----------------
-                \"            ## ---- " ... " STRING ----
-                  (?:         ##
-                    (?:       ##
-                      \\.     ##  Escaped char
-                    )*        ##
-                  |           ## ---------------- OR ----------------
-                    [^"\\]*   ##  Non "\ characters
-                  )*          ##
-                \"            ##  End of " ... " string
-              |               ## ---------------- OR ----------------
-                \'            ## ---- ' ... ' STRING ----
-                  (?:         ##
-                    (?:       ##
-                      \\.     ##  Escaped char
-                    )*        ##
-                  |           ## ---------------- OR ----------------
-                    [^'\\]*   ##  Non "\ characters
-                  )*          ##
-                \'            ##  End of ' ... ' string
-              |               ## ---------------- OR ----------------
-                              ## ---- ANYTHING ELSE ----
-                .             ##  Anything other char
-            )                 ##
-        """
-        return regex.compile(pattern, regex.VERBOSE | regex.MULTILINE
-                             | regex.DOTALL)
-
-    def __ruby_style_comment_query(self):
-        """
-        Regex to remove ruby style comments from a string. This is a modified
-        / improved version of the code found at [1]. Mainly the newlines from
-        comments are also removed if this line was only used by a comment.
-
-        this regex is not perfect, but probable good enough - string literals
-        are messed up in ruby, see [2]. As far as our usages this *should* be
-        fine tough.
-
-        [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
-        [2] http://docs.huihoo.com/ruby/ruby-man-1.4/syntax.html#string
-
-        :returns: Regex with match group 1 that contains all code that is not a
-                  comment
-        """
-        pattern = r"""
-                              ## ---- ""DocString"" ----
-            ^[\t\f\v ]*       ##  Start with only spaces on line
-            =begin            ##  Start of DocString comment
-            .*?               ##  Anything
-            =end              ##  End of DocString comment
-            \n                ##  match trailing new line as this line was only
-                              ##      used for a comment
-          |                   ## ---------------- OR ----------------
-                              ## ---- SOLITARY SINGLE LINE COMMENT ----
-             ^[\t\f\v ]*      ##  Start with only spaces on line
-             \#               ##  Single line comment
-             [^\n]*           ##  match anything but new line
-             \n               ##  match trailing new line as this line was only
-                              ##      used for a comment
-          |                   ## ---------------- OR ----------------
-                              ## ---- SINGLE LINE COMMENT ----
-             \#               ##  Single line comment
-             [^\n]*           ##  match anything but new line
-          |                   ## ---------------- OR ----------------
-            (                 ##
-                              ## ---- ""Multiline String"" ----
-                \"            ## ---- " ... " STRING ----
-                  (?:         ##
-                    (?:       ##
-                      \\.     ##  Escaped char
-                    )*        ##
-                  |           ## ---------------- OR ----------------
-                    [^"\\]*    ##  Non "\ characters
-                  )*          ##
-                \"            ##  End of " ... " string
-              |               ## ---------------- OR ----------------
-                \'            ## ---- ' ... ' STRING ----
-                  (?:         ##
-                    (?:       ##
-                      \\.     ##  Escaped char
-                    )*        ##r
-                  |           ## ---------------- OR ----------------
-                    [^"\\]*   ##  Non "\ characters
-                  )*          ##
-                \'            ##  End of ' ... ' string
-              |               ## ---------------- OR ----------------
-                \%[qQ]?       ## ---- Special Ruby String ----
-                ([^\(\{\<\[]) ##  String start character
-                .*?           ##  Anything
-                \2            ##  End start character
-              |               ## ---------------- OR ----------------
-                \%[qQ]?       ## ---- Special Ruby String ----
-                \(            ##  String start character
-                .*?           ##  Anything
-                \)            ##  End start character
-              |               ## ---------------- OR ----------------
-                \%[qQ]?       ## ---- Special Ruby String ----
-                \{            ##  String start character
-                .*?           ##  Anything
-                \}            ##  End start character
-              |               ## ---------------- OR ----------------
-                \%[qQ]?       ## ---- Special Ruby String ----
-                \[            ##  String start character
-                .*?           ##  Anything
-                \]            ##  End start character
-              |               ## ---------------- OR ----------------
-                \%[qQ]?       ## ---- Special Ruby String ----
-                \<            ##  String start character
-                .*?           ##  Anything
-                \>            ##  End start character
-              |               ## ---------------- OR ----------------
-                              ## ---- ANYTHING ELSE ----
-                .             ##  Anything other char
-            )                 ##
-        """
-        return regex.compile(pattern, regex.VERBOSE | regex.MULTILINE
-                             | regex.DOTALL)
-
-    def __generate_queries(self):
-        """
-        Generates the regex queries used for the removal of comments from source
-        code
-
-        :returns: Dictionary with the regex query as key and the file extension
-                  as list, that this query is intended to be used on, as value
-        """
-        queries = {}
-        queries[self.__c_style_comment_query()] = [
-            '.c', '.h', '.cpp', '.c++', '.cc', '.cxx', '.hpp', '.hxx', '.rs',
-            '.java', '.go', '.js', '.m', '.mm', '.C', '.swift', '.cs'
-        ]
-        queries[self.__php_style_comment_query()] = [
-            '.php', '.phtml', '.php3', '.php4', '.php5', '.php7', '.phps'
-        ]
-        queries[self.__python_style_comment_query()] = ['.py']
-        queries[self.__ruby_style_comment_query()] = ['.rb']
-        return queries
-
-    def __remove_comments(self, query, text):
-        """
-        Removes comments from the given text by applying the regex query
-
-        :param    query:  The query to use on the text
-        :param    text:   The text to remove the comments from
-
-        :returns: Text without comments
-        """
-        noncomments = [m.group(1)
-                       for m in query.finditer(text, concurrent=True)
-                       if m.group(1)]
-
-        return "".join(noncomments)
+    def __generate_tokenizers(self):
+        """
+        Generates the tokenizers used to count the lines of source code without
+        comments
+
+        :returns: Dictionary with the file extension as key and the tokenizer
+                  for its language as value
+        """
+        styles = {
+            'c': ['.c', '.h', '.cpp', '.c++', '.cc', '.cxx', '.hpp', '.hxx',
+                  '.rs', '.java', '.go', '.js', '.m', '.mm', '.C', '.swift',
+                  '.cs'],
+            'php': ['.php', '.phtml', '.php3', '.php4', '.php5', '.php7',
+                    '.phps'],
+            'python': ['.py'],
+            'ruby': ['.rb']
+        }
+        tokenizers = {}
+        for style, extensions in styles.items():
+            tokenizer = CommentTokenizer(style)
+            for extension in extensions:
+                tokenizers[extension] = tokenizer
+        return tokenizers
+
+    def file_input(self):
+        """
+        :returns: The FileInput of this task - the contents of the source
+                  files are needed, the other files are only counted
+        """
+        return FileInput('full', extensions=self.__tokenizers.keys())
 
     def scrab(self, project, filepath, file):
         """
@@ -432,19 +478,52 @@ class ProjectMetrics(FileTask):
 
         :param    project:   The project that the scrab task shall analyse
         :param    filepath:  The filepath to the file that can be analysed
-        :param    file:      The file as string that can be analysed
+        :param    file:      The ProjectFile that can be analysed
+
+        :returns: Tuple of the LOC with and without comments if the file is a
+                  source file, otherwise None
+        """
+        result = None
+        tokenizer = self.__tokenizers.get(file.extension())
+        if tokenizer is not None:
+            result = (file.lines(), tokenizer.count_lines(file.text()))
+
+        self.add(project, filepath, result)
+        return result
 
-        :returns: Report that contains the scrabbed information of *this* file
+    def add(self, project, filepath, result):
         """
-        filename, file_extension = os.path.splitext(filepath)
-        for query in self.__queries:
-            if file_extension in self.__queries[query]:
-                cleand = self.__remove_comments(query, file)
+        Counts the files and LOC of a file
 
-                self.__total_files += 1
-                self.__source_files += 1
-                self.__source_loc += file.rstrip().count('\n')
-                self.__cleaned_loc += cleand.rstrip().count('\n')
+        :param    project:   The project that the scrab task shall analyse
+        :param    filepath:  The filepath to the file that was analysed
+        :param    result:    The result scrab returned for the file
+        """
+        if result is not None:
+            self.__total_files += 1
+            self.__source_files += 1
+            self.__source_loc += result[0]
+            self.__cleaned_loc += result[1]
+
+    def partial(self):
+        """
+        :returns: Tuple of the number of files, source files, LOC and cleaned
+                  LOC
+        """
+        return (self.__total_files, self.__source_files, self.__source_loc,
+                self.__cleaned_loc)
+
+    def merge(self, partial):
+        """
+        Merges the file and LOC counts of another ProjectMetrics
+
+        :param    partial:  The partial results of the other ProjectMetrics
+        """
+        total_files, source_files, source_loc, cleaned_loc = partial
+        self.__total_files += total_files
+        self.__source_files += source_files
+        self.__source_loc += source_loc
+        self.__cleaned_loc += cleaned_loc
 
     def report(self):
         """
@@ -25,11 +25,9 @@ THE SOFTWARE.
 
 from ..scrabTask import GitTask
 
-import utils
-import re
-
 name = "AuthorContributorCounter"
 version = "1.1.0"
+history = "commits"
 
 
 class AuthorContributorCounter(GitTask):
@@ -56,24 +54,6 @@ class AuthorContributorCounter(GitTask):
         self.__project = None
         self.__mapped_shortlog = None
 
-    def __create_shortlog(self):
-        """
-        Creates a dict that represents the shortlog that git outputs
-
-        :returns: The shortlog dict
-        """
-        shortlog = utils.run(
-            'git', ['shortlog', '-s', '-n', '--no-merges'],
-            self.__project.location)
-        mapped_log = []
-
-        for line in shortlog.split('\n'):
-            if line:
-                match = re.search('\s*(\d*)\s*(.*)', line)
-                #                  (number of commits, author name)
-                mapped_log.append((int(match.group(1)), match.group(2)))
-        return mapped_log
-
     def __calc_cutof(self):
         """
         Calculates where the hard cut of for authors should be.
@@ -134,7 +114,7 @@ class AuthorContributorCounter(GitTask):
                         contributor#: 369
         """
         self.__project = project
-        self.__mapped_shortlog = self.__create_shortlog()
+        self.__mapped_shortlog = project.history.author_commits()
         classified = self.__calc_contributor_authors()
 
         report = {}
@@ -25,17 +25,207 @@ THE SOFTWARE.
 
 
 from ..scrabTask import GitTask
-
-import requests
+from apiScheduler import ApiScheduler
+from concurrent.futures import Future
+from httpCache import HttpCache
 
 name = "MetaDataCollector"
-version = "1.1.0"
+version = "1.2.0"
+history = "none"
+
+rest_url = 'https://api.github.com/repos/'
+graphql_url = 'https://api.github.com/graphql'
+# Number of repositories that are queried by one GraphQL request if the
+# parameter 'batch' of the task doesn't say otherwise
+default_batch = 50
+
+_repository_query = '''
+  r{0}: repository(owner: $owner{0}, name: $name{0}) {{
+    stargazerCount
+    forkCount
+    licenseInfo {{ name spdxId }}
+    languages(first: 100, orderBy: {{field: SIZE, direction: DESC}}) {{
+      nodes {{ name }}
+    }}
+  }}'''
 
 
 class ProjectNotFromGithubException(Exception):
     pass
 
 
+def _github_repository(url):
+    """
+    Extracts the owner and name of a github repository from its url
+
+    :param    url:  The url of the project
+
+    :returns: Tuple of the owner and name of the repository or None if the
+              url isn't a github url
+    """
+    for prefix in ('git@github.com:', 'https://github.com/',
+                   'http://github.com/'):
+        if url.startswith(prefix):
+            path = url[len(prefix):]
+            if path.endswith('.git'):
+                path = path[:-4]
+            parts = path.split('/')
+            if len(parts) == 2 and all(parts):
+                return tuple(parts)
+    return None
+
+
+def _licence(name, abb):
+    """
+    :param    name:  The name of the licence github detected or None
+    :param    abb:   The SPDX id of the licence github detected or None
+
+    :returns: The licence part of the report - github calls licences it
+              doesn't know 'Other'
+    """
+    if name is None or name == 'Other':
+        return {'name': None, 'abb': None}
+    return {'name': name, 'abb': abb}
+
+
+def __query_batch(repositories, token, scheduler):
+    """
+    Queries the github GraphQL api for a batch of repositories
+
+    :param    repositories:  List of tuples of the owner and name of the
+                             repositories
+    :param    token:         The github token - the GraphQL api can't be used
+                             without
+    :param    scheduler:     The ApiScheduler that sends the request
+
+    :returns: List of the reports of the repositories - None for repositories
+              that couldn't be queried
+    """
+    variables = {}
+    definitions = []
+    for i, (owner, repository) in enumerate(repositories):
+        variables['owner{}'.format(i)] = owner
+        variables['name{}'.format(i)] = repository
+        definitions.append('$owner{0}: String!, $name{0}: String!'.format(i))
+
+    query = 'query({}) {{{}\n}}'.format(
+        ', '.join(definitions),
+        ''.join(_repository_query.format(i)
+                for i in range(len(repositories))))
+
+    response = scheduler.request(
+        'POST', graphql_url, resource='graphql',
+        json={'query': query, 'variables': variables},
+        headers={'Authorization': 'bearer ' + token})
+    if response.status_code != 200:
+        raise Exception("The error '{}' occurred while accessing '{}'".format(
+            response.status_code, graphql_url))
+
+    data = response.json().get('data') or {}
+    reports = []
+    for i in range(len(repositories)):
+        repository = data.get('r{}'.format(i))
+        if repository is None:
+            reports.append(None)  # e.g. not found - left to the task
+            continue
+
+        languages = [n['name'] for n in repository['languages']['nodes']]
+        licence = repository['licenseInfo'] or {}
+        reports.append({
+            'stars': repository['stargazerCount'],
+            'languages': languages if languages else None,
+            'main_language': languages[0] if languages else None,
+            'forks': repository['forkCount'],
+            'licence': _licence(licence.get('name'), licence.get('spdxId'))
+        })
+    return reports
+
+
+def __fetch_rest(project, parameter, global_args, scheduler, future):
+    """
+    Queries the metadata of a project through the REST api
+
+    :param    project:      The project
+    :param    parameter:    The parameter of the task
+    :param    global_args:  The global arguments
+    :param    scheduler:    The ApiScheduler that sends the requests
+    :param    future:       The future the report or error is delivered to
+    """
+    try:
+        task = MetaDataCollector(parameter, global_args, scheduler)
+        future.set_result(task.scrab(project))
+    except Exception as e:
+        future.set_exception(e)
+
+
+def __fetch_batch(chunk, parameter, global_args, scheduler, futures):
+    """
+    Queries the metadata of a batch of projects through the GraphQL api -
+    the projects it can't resolve are queried through the REST api
+
+    :param    chunk:        List of tuples of the project and the owner and
+                            name of its repository
+    :param    parameter:    The parameter of the task
+    :param    global_args:  The global arguments
+    :param    scheduler:    The ApiScheduler that sends the requests
+    :param    futures:      Dictionary with the project id as key and the
+                            future its report is delivered to as value
+    """
+    try:
+        reports = __query_batch([r for _, r in chunk],
+                                global_args.github_token, scheduler)
+    except Exception as e:
+        reports = [None] * len(chunk)
+
+    for (project, _), report in zip(chunk, reports):
+        if report is None:
+            __fetch_rest(project, parameter, global_args, scheduler,
+                         futures[project.id])
+        else:
+            futures[project.id].set_result(report)
+
+
+def prefetch(projects, parameter, global_args, scheduler):
+    """
+    Queries the metadata of all github projects through the ApiScheduler,
+    while the projects are acquired, so that the task doesn't wait for the
+    api in the processes that analyse the projects. The GraphQL api is used
+    to query many repositories with one request instead of two REST requests
+    per project - but only with a github token, as it can't be used without,
+    and not in the offline mode, as only the REST responses are cached.
+
+    :param    projects:     The git projects that shall be scrabbed
+    :param    parameter:    The parameter of the task - 'batch' is the number
+                            of repositories per GraphQL request, 0 disables
+                            the GraphQL api
+    :param    global_args:  The global arguments
+    :param    scheduler:    The ApiScheduler that sends the requests
+
+    :returns: Dictionary with the project id as key and the future of the
+              report as value
+    """
+    batch = int(parameter.get('batch', default_batch))
+    graphql = (getattr(global_args, 'github_token', None) and batch > 0
+               and not getattr(global_args, 'offline', False))
+
+    repositories = []
+    for project in projects:
+        repository = _github_repository(project.url)
+        if repository is not None:
+            repositories.append((project, repository))
+    futures = {project.id: Future() for project, _ in repositories}
+
+    if graphql:
+        for start in range(0, len(repositories), batch):
+            scheduler.submit(__fetch_batch, repositories[start:start + batch],
+                             parameter, global_args, scheduler, futures)
+    else:
+        for project, _ in repositories:
+            scheduler.submit(__fetch_rest, project, parameter, global_args,
+                             scheduler, futures[project.id])
+    return futures
+
+
 class MetaDataCollector(GitTask):
     """
     Class to query the github api to obtain the forks, languages, licence and
@@ -54,19 +244,33 @@ class MetaDataCollector(GitTask):
             abb: AFL-3.0
 
     :param  parameter:    Parameter given explicitly for this task, for all
-                          projects, defined in the task.yaml
+                          projects, defined in the task.yaml - 'batch' is the
+                          number of repositories whose metadata is prefetched
+                          by one GraphQL request, 0 disables the GraphQL api
     :param  global_args:  This class makes use of the github-token to circumvent
                           the tight rate-limiting for the github api
 
                           https://github.com/settings/tokens
                           https://developer.github.com/v3/#authentication
+
+                          The responses are cached in the http-cache
+                          directory for http-cache-ttl seconds and
+                          revalidated afterwards - in the offline mode only
+                          cached responses are used
+    :param  scheduler:    The ApiScheduler that sends the requests or None to
+                          send them one after the other
     """
 
-    def __init__(self,  parameter, global_args):
+    def __init__(self,  parameter, global_args, scheduler=None):
         super(MetaDataCollector, self).__init__(name, version, parameter,
                                                 global_args)
         self.__project = None
         self.__queries = {}
+        self.__cache = HttpCache(
+            getattr(global_args, 'http_cache', None),
+            getattr(global_args, 'http_cache_ttl', None),
+            getattr(global_args, 'offline', False),
+            scheduler if scheduler is not None else ApiScheduler(1))
 
     def __check_for_error(self, response, url):
         """
@@ -96,38 +300,19 @@ class MetaDataCollector(GitTask):
         """
         Generates the github api query url.
 
-        If a acces token was provided via 'github-token' it will be used here
-
         :param    urlExtension:  The url extension for the specific api point
 
         :returns: The url to query the github api
         """
-        replaceStr = None
-        trailing = False
-        if self.__project.url.startswith('git@github.com:'):
-            replaceStr = 'git@github.com:'
-            trailing = True
-        elif self.__project.url.startswith('https://github.com/'):
-            replaceStr = 'https://github.com/'
-        elif self.__project.url.startswith('http://github.com/'):
-            replaceStr = 'http://github.com/'
-        else:
+        repository = _github_repository(self.__project.url)
+        if repository is None:
             raise ProjectNotFromGithubException(
                 "Unsupported project - it has to be a github project but "
                 "the url '{}' seems to be not from github.".format(
                     self.__project.url))
 
-        url = self.__project.url.replace(
-            replaceStr, 'https://api.github.com/repos/')
-
-        if trailing and url.endswith('.git'):
-            url = url[:-4]
-
-        url += urlExtension
-        if self._global_args.github_token:
-            url += "?access_token="+self._global_args.github_token
-
-        return url
+        return '{}{}/{}{}'.format(rest_url, repository[0], repository[1],
+                                  urlExtension)
 
     def __access_github_api(self, urlExtension):
         """
@@ -142,7 +327,13 @@ class MetaDataCollector(GitTask):
         """
         url = self.__generate_api_url(urlExtension)
 
-        response = requests.get(url)
+        # the token is sent as header to keep it out of the cache key
+        headers = {}
+        token = self._global_args.github_token
+        if token:
+            headers['Authorization'] = 'token ' + token
+
+        response = self.__cache.get(url, headers)
         self.__check_for_error(response, url)
 
         return response.json()
@@ -201,28 +392,13 @@ class MetaDataCollector(GitTask):
 
     def __get_licence(self):
         """
-        Queries the github api to obtain the number of stars of the project
+        Queries the github api to obtain the licence of the project
 
-        :returns: either 0 or the nr of stars of the project
+        :returns: the name and SPDX id of the licence github detected - both
+                  None if it detected none or one it doesn't know
         """
-        name = None
-        abb = None
-
-        query = self.__query('')
-        if 'licence' in query:
-            query = self.__query('/license')
-
-            if ('license' in query and 'name' in query['license']
-                    and 'Other' != query['license']['name']):
-                name = query['license']['name']
-
-                if 'spdx_id' in query['license']:
-                    abb = query['license']['spdx_id']
-
-        return {
-            'name': name,
-            'abb': abb
-        }
+        licence = self.__query('').get('license') or {}
+        return _licence(licence.get('name'), licence.get('spdx_id'))
 
     def scrab(self, project):
         """
@@ -25,10 +25,9 @@ THE SOFTWARE.
 
 from ..scrabTask import GitTask
 
-import utils
-
 name = "ProjectDates"
 version = "1.1.0"
+history = "commits"
 
 
 class ProjectDates(GitTask):
@@ -62,10 +61,7 @@ class ProjectDates(GitTask):
         :returns: The date of the first commit in the projects repository
                   (2005-04-16T15:20:36-07:00)
         """
-        return utils.run('git',
-                         ['log', '--all', '--format=%cI', '--first-parent',
-                             '--reverse', '--max-parents=0'],
-                         self.__project.location).splitlines()[0].rstrip()
+        return self.__project.history.first_commit_date()
 
     def __last_commit_date(self):
         """
@@ -75,8 +71,7 @@ class ProjectDates(GitTask):
         :returns: The date of the last commit in the projects repository
                   (2017-08-03T15:25:14-07:00)
         """
-        return utils.run('git', ['log', '--all', '-1', '--format=%cI'],
-                         self.__project.location).rstrip()
+        return self.__project.history.last_commit_date()
 
     def scrab(self, project):
         """
@@ -22,6 +22,66 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+import os
+
+
+class FileInput():
+
+    """
+    Declaration of the contents of the project files a FileTask needs. The
+    FileTaskRunner only opens a file if at least one task needs its contents
+    and only reads the longest prefix the tasks need - the other files are
+    only passed by their path.
+
+    The contents are needed of the files that have one of the extensions or
+    whose lowercased name (without extension) contains one of the names. If
+    neither extensions nor names are given the contents of all files are
+    needed.
+
+    :param    content:     'path' if only the path of the files is needed,
+                           'prefix' if only the first limit characters are
+                           needed and 'full' if the whole contents are needed
+    :param    limit:       The number of characters needed for 'prefix'
+    :param    extensions:  The extensions of the files (including the leading
+                           dot) whose contents are needed or None
+    :param    names:       The lowercased parts of the names of the files
+                           whose contents are needed or None
+    """
+
+    def __init__(self, content, limit=None, extensions=None, names=None):
+        if content not in ('path', 'prefix', 'full'):
+            raise Exception("Unknown content '{}'".format(content))
+        if content == 'prefix' and (limit is None or limit < 0):
+            raise Exception("A prefix needs a limit that isn't negative")
+
+        self.content = content
+        self.limit = limit if content == 'prefix' else None
+        self.__extensions = (None if extensions is None
+                             else frozenset(extensions))
+        self.__names = None if names is None else tuple(names)
+
+    def needs(self, filepath):
+        """
+        Checks weather the contents of the file are needed
+
+        :param    filepath:  The file path of the file
+
+        :returns: True if the contents of the file are needed, otherwise
+                  False
+        """
+        if self.content == 'path':
+            return False
+        if self.__extensions is None and self.__names is None:
+            return True
+
+        root, extension = os.path.splitext(filepath)
+        if self.__extensions is not None and extension in self.__extensions:
+            return True
+        if self.__names is not None:
+            filename = os.path.basename(root).lower()
+            return any(name in filename for name in self.__names)
+        return False
+
 
 class ScrabTask():
 
@@ -71,7 +131,11 @@ class GitTask(ScrabTask):
 
         __Override this method and do not call it!__
 
-        :param    project:  The project that the scrab task shall analyse
+        :param    project:  The project that the scrab task shall analyse -
+                            its commit history should be queried through
+                            project.history, the CommitHistory shared by
+                            all GitTasks of the project, instead of
+                            traversing it again
 
         :returns: Report that contains all scrabbed information
         """
@@ -84,8 +148,15 @@ class FileTask(ScrabTask):
     Base class of all scrab tasks that want to analyse a the files of a project.
     This task will be provided with the file to analyse which will happen in
     parallel to the other file tasks that are analysing the project (single
-    threaded). Thus there are two methods - one to crab the data and one to
-    obtain the final report.
+    threaded). Thus there are five methods - one to crab the data, one to add
+    the cached data of a file that didn't change since the last run, one to
+    obtain the partial results, one to merge the partial results of another
+    instance of the task and one to obtain the final report.
+
+    The files of big projects may be split in shards that are analysed by
+    different instances of the task in different processes. Only the partial
+    results of these instances are passed back - they are merged into a new
+    instance before report is called on it.
 
     :param    name:         The name of the scrab task
     :param    version:      The version of the scrab task
@@ -98,6 +169,19 @@ class FileTask(ScrabTask):
         super(FileTask, self).__init__(name, 'git', version, parameter,
                                        global_args)
 
+    def file_input(self):
+        """
+        Declares the contents of the files this task needs - the contents of
+        other files are only read if another task needs them. scrab is
+        called for all files, regardless of the declaration.
+
+        Override this method if the task doesn't need the whole contents of
+        all files.
+
+        :returns: The FileInput of this task
+        """
+        return FileInput('full')
+
     def scrab(self, project, filepath, file):
         """
         Function that will be called to analyse the given project file.
@@ -106,7 +190,57 @@ class FileTask(ScrabTask):
 
         :param    project:   The project that the scrab task shall analyse
         :param    filepath:  The filepath to the file that can be analysed
-        :param    file:      The file as string that can be analysed
+        :param    file:      The ProjectFile that provides the contents of the
+                             file as well as the lowercased contents, size,
+                             line count and extension of it. These are
+                             computed once and shared between the tasks.
+                             The contents may be limited to the longest
+                             prefix the tasks declared in file_input.
+
+        :returns: The result of this file - it has to be picklable as it is
+                  cached and passed to add in later runs if the file didn't
+                  change
+        """
+        assert False, "You have to implement this function"
+
+    def add(self, project, filepath, result):
+        """
+        Function that will be called instead of scrab for a file that didn't
+        change since a previous run. The result has to be added as if scrab
+        was called for the file.
+
+        __Override this method and do not call it!__
+
+        :param    project:   The project that the scrab task shall analyse
+        :param    filepath:  The filepath to the file that was analysed
+        :param    result:    The result scrab returned for the file
+        """
+        assert False, "You have to implement this function"
+
+    def partial(self):
+        """
+        Function that will be called to obtain the partial results of this
+        instance after it analysed the files of a shard. They are passed to
+        merge of another instance in another process - so they have to be
+        picklable and should hold nothing but the results.
+
+        __Override this method and do not call it!__
+
+        :returns: The partial results of this instance
+        """
+        assert False, "You have to implement this function"
+
+    def merge(self, partial):
+        """
+        Function that will be called to merge the partial results of another
+        instance of this task, that analysed a different set of files of the
+        same project, into this instance. report will be called after all
+        partial results were merged.
+
+        __Override this method and do not call it!__
+
+        :param    partial:  The partial results returned by partial of the
+                            other instance of this task
         """
         assert False, "You have to implement this function"
 
@@ -23,38 +23,47 @@ THE SOFTWARE.
 """
 
 
-from projectTaskRunner import ProjectTaskRunner
+from projectTaskRunner import ProjectTaskRunner, FileTaskRunner
+from projectScheduler import ProjectScheduler
+from projectUpdater import ProjectUpdater
 from reportTaskRunner import ReportTaskRunner
 from projectManager import (GitProjectManager, SvnProjectManager,
-                            ArchiveProjectManager)
+                            ArchiveProjectManager, clone_arguments)
 
+from apiScheduler import ApiScheduler
 from multiprocessing import cpu_count, Pool
-from utils import deep_merge, md5, to_dict
+from multiprocessing.pool import ThreadPool
+from packaging import version
+from utils import (command_statistics, deep_merge, md5,
+                   merge_command_statistics, to_dict)
 
 import os
+import queue
 import re
-import time
+import threading
 import traceback
 import unicodedata
 
 reportVersion = 2
 
 
-def ready_project(project, update):
+def ready_project(project, update, timeout=None):
     """
     Updates or initializes the project - by either cloning / pulling or
     re-/downloading it
 
     :param    project:  The project to initialize or update
     :param    update:   The weather to check for an update
+    :param    timeout:  The number of seconds after which cloning or updating
+                        a repository is aborted or None
 
     :returns: True if anything changed False if nothing changed
     """
     manager = None
     if project.kind == 'git':
-        manager = GitProjectManager(project)
+        manager = GitProjectManager(project, timeout)
     elif project.kind == 'svn':
-        manager = SvnProjectManager(project)
+        manager = SvnProjectManager(project, timeout)
     elif project.kind == 'archive':
         manager = ArchiveProjectManager(project)
     else:
@@ -68,20 +77,19 @@ def ready_project(project, update):
 
 
 def project_task_wrapper(project, project_tasks, old_tasks, old_data,
-                         update, global_args, scrabTaskManager):
+                         global_args, scrabTaskManager):
     """
     Wraps the ProjectTaskRunner in a function call to be used by the process
     pool
 
-    :param    project:           The project to run the scrab tasks for
+    :param    project:           The project to run the scrab tasks for - it
+                                 has to be readied already
     :param    project_tasks:     The scrab tasks to run on the given project
     :param    old_tasks:         The old tasks that were run in a previous run -
                                  used to decide if a task has to be rerun
     :param    old_data:          The old data that was generated with the
                                  old_tasks in a previous run - used if the task
                                  doesn't have to be rerun
-    :param    update:            Weather the project should be updated before
-                                 the analysis
     :param    global_args:       Arguments that will be passed to all tasks.
                                  They _might_ contain something that is useful
                                  for the task, but the task has to check if it
@@ -93,7 +101,6 @@ def project_task_wrapper(project, project_tasks, old_tasks, old_data,
     :returns: The subreport that contains all information generated by the scrab
               tasks for the given project
     """
-    project.updated = ready_project(project, update)
     runner = ProjectTaskRunner(project, project_tasks,
                                old_tasks, old_data,
                                global_args,
@@ -102,6 +109,92 @@ def project_task_wrapper(project, project_tasks, old_tasks, old_data,
     return res
 
 
+def project_git_task_wrapper(project, project_tasks, old_tasks, old_data,
+                             global_args, scrabTaskManager):
+    """
+    Wraps the ProjectTaskRunner in a function call to be used by the process
+    pool for projects whose files are analysed in shards - only the GitTasks
+    are run, the FileTasks are run by file_shard_task_wrapper afterwards
+
+    :param    project:           The project to run the scrab tasks for - it
+                                 has to be readied already
+    :param    project_tasks:     The scrab tasks to run on the given project
+    :param    old_tasks:         The old tasks that were run in a previous run -
+                                 used to decide if a task has to be rerun
+    :param    old_data:          The old data that was generated with the
+                                 old_tasks in a previous run - used if the task
+                                 doesn't have to be rerun
+    :param    global_args:       Arguments that will be passed to all tasks.
+                                 They _might_ contain something that is useful
+                                 for the task, but the task has to check if it
+                                 is _there_ as these are user provided. If they
+                                 are needed to work that check should happen in
+                                 the argHandler.
+    :param    scrabTaskManager:  The ScrabTaskManager
+
+    :returns: The subreport that contains all information generated by the
+              GitTasks for the given project
+    """
+    runner = ProjectTaskRunner(project, project_tasks,
+                               old_tasks, old_data,
+                               global_args,
+                               scrabTaskManager)
+    return runner.run_git_tasks()
+
+
+def file_shard_task_wrapper(project, shard, project_tasks, old_tasks,
+                            old_data, global_args, scrabTaskManager):
+    """
+    Wraps the FileTaskRunner in a function call to be used by the process pool
+    to analyse a shard of the files of a project
+
+    :param    project:           The project to run the scrab tasks for - it
+                                 has to be readied already
+    :param    shard:             Tuple of the shard index and the number of
+                                 shards
+    :param    project_tasks:     The scrab tasks to run on the given project
+    :param    old_tasks:         The old tasks that were run in a previous run -
+                                 used to decide if a task has to be rerun
+    :param    old_data:          The old data that was generated with the
+                                 old_tasks in a previous run - used if the task
+                                 doesn't have to be rerun
+    :param    global_args:       Arguments that will be passed to all tasks.
+                                 They _might_ contain something that is useful
+                                 for the task, but the task has to check if it
+                                 is _there_ as these are user provided. If they
+                                 are needed to work that check should happen in
+                                 the argHandler.
+    :param    scrabTaskManager:  The ScrabTaskManager
+
+    :returns: Tuple of the partial results of the FileTasks of the shard,
+              the cache entries of the files of the shard and the statistics
+              of the file reads
+    """
+    runner = FileTaskRunner(project, project_tasks, old_data, old_tasks,
+                            global_args, scrabTaskManager, shard)
+    return runner.run_shard()
+
+
+def command_statistics_wrapper(function, args):
+    """
+    Runs a function and passes the statistics of the external commands it ran
+    on - the statistics of a worker process would be lost otherwise. If the
+    function raises, the statistics are attached to the exception.
+
+    :param    function:  The function to run
+    :param    args:      The arguments of the function
+
+    :returns: Tuple of the result of the function and the statistics of the
+              external commands it ran
+    """
+    try:
+        result = function(*args)
+    except Exception as e:
+        e.command_statistics = command_statistics(reset=True)
+        raise
+    return (result, command_statistics(reset=True))
+
+
 class MetaProject():
 
     """
@@ -114,6 +207,13 @@ class MetaProject():
     def __init__(self, config, cache_dir):
         self.name = self.__project_name(config)
         self.updated = True
+        self.shards = None
+        self.clone = None
+        # the CommitHistory of a git project while its GitTasks run
+        self.history = None
+        # the names of the GitTasks whose reports are prefetched for many
+        # projects at once - they are added once the project is analysed
+        self.prefetching = set()
 
         self.kind = None
         self.manual_data = None
@@ -138,6 +238,19 @@ class MetaProject():
         if 'manual' in config:
             self.manual_data = config['manual']
 
+        if 'shards' in config:
+            self.shards = int(config['shards'])
+            if self.shards < 1:
+                raise Exception("The number of shards for the project '{}' "
+                                "has to be at least 1".format(self.name))
+
+        if 'clone' in config:
+            self.clone = config['clone']
+            if self.clone not in clone_arguments:
+                raise Exception("The clone mode for the project '{}' has to "
+                                "be one of {}".format(
+                                    self.name, ', '.join(clone_arguments)))
+
         if self.url and self.url.endswith('/'):
             self.url = self.url[:-1]
 
@@ -152,6 +265,9 @@ class MetaProject():
         else:
             self.location = config['location']
 
+        # directory for the caches of the project
+        self.cache_location = os.path.join(cache_dir, '.gitScrabber', self.id)
+
     def __texify_id(self):
         """
         The function is responsible for the conversion of a UTF-8 string to a
@@ -188,6 +304,83 @@ class MetaProject():
                             "'{}'".format(to_dict(project)))
 
 
+class ProjectShards():
+
+    """
+    Helper class that collects the results of a project whose files are
+    analysed in shards by multiple workers
+
+    :param    project:  The project that is analysed in shards
+    """
+
+    def __init__(self, project):
+        self.project = project
+        self.git_report = None
+        self.shards = []
+        self.failed = False
+
+    def complete(self):
+        """
+        :returns: True if the results of all shards were collected
+        """
+        return len(self.shards) == self.project.shards
+
+
+class ProjectAcquisition():
+
+    """
+    Helper class that marks the readying of a project - once it is done the
+    project is analysed
+
+    :param    key:  The key of the analysis of the project, either the project
+                    or its ProjectShards
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.project = key
+        if isinstance(key, ProjectShards):
+            self.project = key.project
+
+
+class ProjectPrefetch():
+
+    """
+    Helper class that waits for the prefetched reports of an analysed project -
+    once they are done it is put in the results queue and the reports are
+    added to the subreport of the project
+
+    :param    project:  The analysed project
+    :param    futures:  Dictionary with the task name as key and the future of
+                        the prefetched report as value
+    :param    results:  The queue it is put in
+    :param    report:   The subreport of the project
+    """
+
+    def __init__(self, project, futures, results, report):
+        self.project = project
+        self.futures = futures
+        self.report = report
+        self.__results = results
+        self.__pending = len(futures)
+        self.__lock = threading.Lock()
+
+        for future in futures.values():
+            future.add_done_callback(self.__done)
+
+    def __done(self, future):
+        """
+        Puts this in the results queue once all futures are done
+
+        :param    future:  The future that is done
+        """
+        with self.__lock:
+            self.__pending -= 1
+            if self.__pending > 0:
+                return
+        self.__results.put((self, None, None))
+
+
 class MetaTask():
 
     """
@@ -246,10 +439,30 @@ class TaskExecutionManager:
                                as these are user provided. If they are needed to
                                work that check should happen in the argHandler.
     :param  scrabTaskManager:  The ScrabTaskManager
+    :param  journal:           The CheckpointJournal the subreports of the
+                               projects are appended to as soon as they are
+                               done or None
+    :param  clone:             How the git repositories are cloned - 'auto'
+                               chooses the clone mode by the history the
+                               project tasks need
+    :param  acquisitions:      The number of projects that are cloned, updated
+                               or downloaded concurrently - this is done by
+                               threads besides the processes that analyse the
+                               projects
+    :param  fetches_per_host:  The number of git and svn projects of the same
+                               host that are updated concurrently
+    :param  timeout:           The number of seconds after which cloning or
+                               updating a repository is aborted or None to
+                               wait forever
+    :param  api_requests:      The number of requests to web apis that are
+                               sent concurrently while the projects are
+                               acquired
     """
 
     def __init__(self, cache_dir, project_tasks, report_tasks, projects,
-                 old_report, update, global_args, scrabTaskManager):
+                 old_report, update, global_args, scrabTaskManager,
+                 journal=None, clone='auto', acquisitions=8, timeout=None,
+                 api_requests=4, fetches_per_host=4):
         self.__cache_dir = cache_dir
         self.__project_tasks = self.__setup_tasks_configuration(project_tasks)
         self.__report_tasks = self.__setup_tasks_configuration(report_tasks)
@@ -258,6 +471,16 @@ class TaskExecutionManager:
         self.__update = update
         self.__global_args = global_args
         self.__scrabTaskManager = scrabTaskManager
+        self.__journal = journal
+        self.__processes = max(1, int(cpu_count()*0.75))
+        self.__acquisitions = acquisitions
+        self.__fetches_per_host = fetches_per_host
+        self.__timeout = timeout
+        self.__api_requests = api_requests
+        self.__prefetching = {}
+        self.__commands = {}
+        self.__commands_lock = threading.Lock()
+        self.__setup_clone_mode(clone)
 
         if not cache_dir.endswith('/'):
             self.__cache_dir += '/'
@@ -298,6 +521,29 @@ class TaskExecutionManager:
 
         return meta_tasks
 
+    def __setup_clone_mode(self, clone):
+        """
+        Sets the clone mode of the projects that didn't specify one - in auto
+        mode the least history that satisfies all project tasks is cloned
+
+        :param    clone:  The clone mode or 'auto'
+        """
+        if clone == 'auto':
+            histories = set(
+                self.__scrabTaskManager.get_task(task.name).history
+                for task in self.__project_tasks)
+
+            if 'full' in histories:
+                clone = 'full'
+            elif 'commits' in histories:
+                clone = 'blobless'
+            else:
+                clone = 'shallow'
+
+        for project in self.__projects:
+            if project.clone is None:
+                project.clone = clone
+
     def __setup_project_data(self, projects):
         """
         Sets up the project specific data
@@ -363,90 +609,480 @@ class TaskExecutionManager:
             return self.__old_report['projects'][project.id]
         return None
 
-    def __get_task_result(self, project, future):
+    def __get_task_result(self, project, result, error):
         """
-        Gets the task result form a future
+        Gets the task result of a finished job
 
         :param    project:  The project to get the results for
-        :param    future:   The future to get the results from
+        :param    result:   The result of the job
+        :param    error:    The exception the job raised or None
 
         :returns: The task result
         """
-        try:
-            return future.get()
-        except Exception as e:
+        if error is not None:
             raise Exception("While collecting the ScrabTask results for '{}'"
                             " something happened".format(project.name)
-                            ) from e
+                            ) from error
+        return result
+
+    def __add_command_statistics(self, statistics):
+        """
+        Adds the statistics of the external commands a job ran to the ones of
+        the whole run
 
-    def __queue_projects(self, executor):
+        :param    statistics:  The statistics returned by command_statistics
         """
-        Queues the projects of the given kind that shall be scrabbed for a given
-        kind of task
+        with self.__commands_lock:
+            merge_command_statistics(self.__commands, statistics)
+
+    def __apply(self, executor, results, key, function, args):
+        """
+        Queues a function in the executor - once it is done its result or error
+        is put in the results queue together with the given key. The statistics
+        of the external commands it ran are added to the ones of the run.
+
+        :param    executor:  The executor that will execute the function
+        :param    results:   The queue the results are put in
+        :param    key:       The key that identifies the job
+        :param    function:  The function to execute
+        :param    args:      The arguments of the function
+        """
+        def done(result):
+            self.__add_command_statistics(result[1])
+            results.put((key, result[0], None))
+
+        def failed(error):
+            self.__add_command_statistics(
+                getattr(error, 'command_statistics', {}))
+            results.put((key, None, error))
+
+        executor.apply_async(
+            command_statistics_wrapper,
+            (function, args),
+            callback=done,
+            error_callback=failed)
+
+    def __queue_acquisition(self, acquirer, results, project, updates):
+        """
+        Queues the readying of a project - cloning / pulling or downloading it.
+        Projects that were already updated by the ProjectUpdater are only
+        passed on.
+
+        :param    acquirer:  The executor that will ready the project
+        :param    results:   The queue the results are put in
+        :param    project:   The project to ready
+        :param    updates:   The updates done by the ProjectUpdater
+        """
+        key = project
+        if project.shards > 1:
+            key = ProjectShards(project)
+
+        if project.id in updates:
+            update = updates[project.id]
+            results.put((ProjectAcquisition(key), update['changed'],
+                         update['error']))
+            return
+
+        self.__apply(
+            acquirer,
+            results,
+            ProjectAcquisition(key),
+            ready_project,
+            [project, self.__update, self.__timeout]
+        )
+
+    def __queue_project(self, executor, results, key):
+        """
+        Queues a readied project that shall be scrabbed - either as a whole or,
+        if its files shall be analysed in shards, the GitTasks first
 
         :param    executor:  The executor that will execute the functions
-        :param    kind:      The kind of function that shall be run to scrab at
-                             the projects
+        :param    results:   The queue the results are put in
+        :param    key:       The project or its ProjectShards
+        """
+        wrapper = project_task_wrapper
+        project = key
+        if isinstance(key, ProjectShards):
+            wrapper = project_git_task_wrapper
+            project = key.project
+
+        self.__apply(
+            executor,
+            results,
+            key,
+            wrapper,
+            [project,
+             self.__project_tasks,
+             self.__extract_old_project_tasks(),
+             self.__extract_old_data(project),
+             self.__global_args,
+             self.__scrabTaskManager]
+        )
+
+    def __queue_shards(self, executor, results, sharded):
+        """
+        Queues the shards of the files of a project whose GitTasks are done
+
+        :param    executor:  The executor that will execute the functions
+        :param    results:   The queue the results are put in
+        :param    sharded:   The ProjectShards of the project
 
-        :returns: A dict of futures that will contain the results of the
-                  functions that where run for the projects
+        :returns: The number of queued jobs
         """
-        futures = {}
+        project = sharded.project
         old_tasks = self.__extract_old_project_tasks()
+        old_data = self.__extract_old_data(project)
+
+        for index in range(project.shards):
+            self.__apply(
+                executor,
+                results,
+                sharded,
+                file_shard_task_wrapper,
+                [project,
+                 (index, project.shards),
+                 self.__project_tasks,
+                 old_tasks,
+                 old_data,
+                 self.__global_args,
+                 self.__scrabTaskManager]
+            )
+        return project.shards
+
+    def __has_file_tasks(self):
+        """
+        :returns: True if any of the project tasks is a FileTask
+        """
+        return any(
+            self.__scrabTaskManager.get_task(task.name).kind == 'file'
+            for task in self.__project_tasks)
+
+    def __resume_projects(self, report):
+        """
+        Puts the subreports of the projects that were done in a previous run,
+        according to the checkpoint journal, in the report
+
+        :param    report:  The new report so far
+
+        :returns: The projects that still have to be scrabbed
+        """
+        if self.__journal is None:
+            return self.__projects
+
+        self.__journal.begin(report['project_tasks'])
+        projects = report.setdefault('projects', {})
+        pending = []
 
         for project in self.__projects:
-            if project.kind is not 'meta':
-                old_data = self.__extract_old_data(project)
-                future = executor.apply_async(
-                    project_task_wrapper,
-                    [project,
-                     self.__project_tasks,
-                     old_tasks,
-                     old_data,
-                     self.__update,
-                     self.__global_args,
-                     self.__scrabTaskManager]
-                )
-                futures[future] = project
-        return futures
-
-    def __collect_project_results(self, report, futures):
-        """
-        Collects the results from the futures and merges into a single dict
-
-        :param    report:   The new report so far
-        :param    futures:  The futures to collect the results from
+            result = self.__journal.lookup(project.id)
+            if result is None:
+                pending.append(project)
+                continue
+
+            projects[project.id] = result
+            # TODO replace by logger or process indication
+            print("~~ Resumed '{}' project tasks ~~".format(project.name))
+        return pending
+
+    def __recomputes(self, project, meta_task, updates):
+        """
+        Checks weather the report of a task will be recomputed for a project -
+        if it wasn't updated by the ProjectUpdater the project is updated if
+        it is cloned
+
+        :param    project:    The project to check
+        :param    meta_task:  The task to check
+        :param    updates:    The updates done by the ProjectUpdater
+
+        :returns: True if the report will be recomputed False if the old one
+                  will be used
+        """
+        update = updates.get(project.id)
+        if update is None:
+            updated = not os.path.isdir(os.path.join(project.location, '.git'))
+        elif update['error'] is not None:
+            return False  # the project fails anyway
+        else:
+            updated = update['changed']
+
+        return (updated or self.__extract_old_data(project) is None
+                or self.__changed_task(meta_task))
+
+    def __prefetch(self, projects, scheduler, updates):
+        """
+        Starts the prefetch functions of the GitTasks for the git projects
+        whose reports of the tasks will be recomputed - a failing prefetch
+        only leaves the projects to the GitTask itself
+
+        :param    projects:   The projects that shall be scrabbed
+        :param    scheduler:  The ApiScheduler that sends the requests
+        :param    updates:    The updates done by the ProjectUpdater
+
+        :returns: Dictionary with the project id as key and a dictionary with
+                  the task name as key and the future of the prefetched report
+                  as value
+        """
+        prefetching = {}
+
+        for meta_task in self.__project_tasks:
+            task_wrapper = self.__scrabTaskManager.get_task(meta_task.name)
+            if task_wrapper.prefetch is None:
+                continue
+
+            git_projects = [p for p in projects if p.kind == 'git'
+                            and self.__recomputes(p, meta_task, updates)]
+            if not git_projects:
+                continue
+
+            try:
+                futures = task_wrapper.prefetch(
+                    git_projects, meta_task.parameter, self.__global_args,
+                    scheduler)
+            except Exception as e:
+                # TODO replace by logger or process indication
+                print("~~ Prefetching '{}' failed: {} ~~".format(
+                    meta_task.name, e))
+                continue
+
+            for project_id, future in futures.items():
+                prefetching.setdefault(project_id, {})[meta_task.name] = future
+
+        for project in projects:
+            project.prefetching = set(prefetching.get(project.id, {}))
+        return prefetching
+
+    def __collect_prefetched(self, prefetch):
+        """
+        Adds the prefetched reports to the subreport of the project
+
+        :param    prefetch:  The ProjectPrefetch of the project
+
+        :returns: Tuple of the subreport and the error of the first failed
+                  future or None
+        """
+        report = prefetch.report
+        for task_name, future in prefetch.futures.items():
+            if future.exception() is not None:
+                return (None, future.exception())
+
+            sub_report = future.result()
+            if sub_report and len(sub_report) > 0:
+                report[task_name] = sub_report
+        return (report, None)
+
+    def __update_projects(self, projects):
+        """
+        Updates the git and svn projects before any project is analysed if the
+        projects shall be updated
+
+        :param    projects:  The projects that shall be scrabbed
+
+        :returns: The updates done by the ProjectUpdater by the project id
+        """
+        if not self.__update:
+            return {}
+
+        updater = ProjectUpdater(projects, self.__acquisitions,
+                                 self.__fetches_per_host, self.__timeout)
+        return updater.run()
+
+    def __changed_task(self, meta_task):
+        """
+        Checks weather a task has to be rerun based on the task versions and
+        parameter of the old report
+
+        :param    meta_task:  The task to check
+
+        :returns: True if the task has to be rerun False otherwise
+        """
+        old_tasks = self.__extract_old_project_tasks()
+        task_wrapper = self.__scrabTaskManager.get_task(meta_task.name)
+        return (
+            not old_tasks
+            or meta_task.name not in old_tasks
+            or version.parse(old_tasks[meta_task.name]['version'])
+            != version.parse(task_wrapper.version)
+            or old_tasks[meta_task.name]['parameter']
+            != md5(str(meta_task.parameter))
+        )
+
+    def __reusable(self, project):
+        """
+        Checks weather the subreport of the project in the old report can be
+        used as it is - the project has to be unchanged and the tasks have to
+        be the same as for the old report
+
+        :param    project:  The project to check
+
+        :returns: True if the old subreport can be used False otherwise
+        """
+        if project.updated or self.__extract_old_data(project) is None:
+            return False
+        return not any(self.__changed_task(meta_task)
+                       for meta_task in self.__project_tasks)
+
+    def __reuse_unchanged(self, results, projects, updates):
+        """
+        Puts the old subreports of the projects that didn't change in the
+        results queue - these projects are never dispatched to the processes
+
+        :param    results:   The queue the results are put in
+        :param    projects:  The projects that shall be scrabbed
+        :param    updates:   The updates done by the ProjectUpdater
+
+        :returns: The projects that still have to be analysed
+        """
+        pending = []
+        for project in projects:
+            update = updates.get(project.id)
+            if update is not None and update['error'] is None:
+                project.updated = update['changed']
+
+            if update is None or not self.__reusable(project):
+                pending.append(project)
+                continue
+
+            old_data = self.__extract_old_data(project)
+            results.put((project, {task.name: old_data[task.name]
+                                   for task in self.__project_tasks
+                                   if task.name in old_data}, None))
+        return pending
+
+    def __queue_projects(self, acquirer, results, projects, updates):
+        """
+        Queues the readying of the projects that shall be scrabbed - the order
+        and the shards of the projects are decided by the ProjectScheduler
+
+        :param    acquirer:  The executor that will ready the projects
+        :param    results:   The queue the results of the functions that where
+                             run for the projects are put in - together with
+                             either the ProjectAcquisition, the project or the
+                             ProjectShards of the project
+        :param    projects:  The projects to queue
+        :param    updates:   The updates done by the ProjectUpdater
+
+        :returns: The number of queued projects
+        """
+        scheduler = ProjectScheduler(projects, self.__old_report,
+                                     self.__processes, self.__has_file_tasks())
+        projects = scheduler.schedule()
+
+        for project in projects:
+            self.__queue_acquisition(acquirer, results, project, updates)
+        return len(projects)
+
+    def __merge_shards(self, sharded):
+        """
+        Merges the results of the shards of a project into its subreport
+
+        :param    sharded:  The ProjectShards of the project
+
+        :returns: The subreport that contains all information generated by the
+                  scrab tasks for the project
+        """
+        project = sharded.project
+        runner = FileTaskRunner(project, self.__project_tasks,
+                                self.__extract_old_data(project),
+                                self.__extract_old_project_tasks(),
+                                self.__global_args, self.__scrabTaskManager)
+        return {**sharded.git_report, **runner.merge_shards(sharded.shards)}
+
+    def __collect_sharded_result(self, executor, results, sharded, result):
+        """
+        Collects the result of a part of a project whose files are analysed in
+        shards
+
+        :param    executor:  The executor that will execute the shards
+        :param    results:   The queue the results are put in
+        :param    sharded:   The ProjectShards of the project
+        :param    result:    The result of the finished part
+
+        :returns: Tuple of the subreport of the project, if all parts are done
+                  otherwise None, and the number of newly queued jobs
+        """
+        if sharded.git_report is None:
+            sharded.git_report = result
+            return (None, self.__queue_shards(executor, results, sharded))
+
+        sharded.shards.append(result)
+        if not sharded.complete():
+            return (None, 0)
+        return (self.__merge_shards(sharded), 0)
+
+    def __collect_project_results(self, report, executor, results, jobs):
+        """
+        Collects the results of the jobs as they finish and puts the subreports
+        of the projects in the report - projects that are readied are queued
+        for their analysis and the prefetched reports of analysed projects are
+        added once they are done
+
+        :param    report:    The new report so far
+        :param    executor:  The executor that will analyse the readied
+                             projects and the shards of the projects whose
+                             files are analysed in shards
+        :param    results:   The queue the results of the jobs are put in
+        :param    jobs:      The number of queued jobs
 
         :returns: The report for a collection of functions that where run for
                   projects
         """
+        projects = report.setdefault('projects', {})
         i = 0
-        i_end = len(futures)
-        while len(futures) > 0:
-            for future in futures:
-                if not future.ready():
+        i_end = jobs
+
+        while jobs > 0:
+            key, result, error = results.get()
+            jobs -= 1
+
+            if isinstance(key, ProjectAcquisition) and error is None:
+                key.project.updated = result
+                self.__queue_project(executor, results, key.key)
+                jobs += 1
+                continue
+
+            project = key
+            sharded = None
+            if isinstance(key, ProjectPrefetch):
+                project = key.project
+                result, error = self.__collect_prefetched(key)
+            elif isinstance(key, ProjectAcquisition):
+                project = key.project
+            elif isinstance(key, ProjectShards):
+                sharded = key
+                project = sharded.project
+
+            if sharded and sharded.failed:
+                continue  # the error was already reported
+
+            try:
+                result = self.__get_task_result(project, result, error)
+                if sharded:
+                    result, queued = self.__collect_sharded_result(
+                        executor, results, sharded, result)
+                    jobs += queued
+                    if result is None:
+                        continue
+
+                futures = self.__prefetching.pop(project.id, None)
+                if futures and not isinstance(key, ProjectPrefetch):
+                    ProjectPrefetch(project, futures, results, result)
+                    jobs += 1
                     continue
 
                 i += 1
-                project = futures[future]
-
-                try:
-                    result = self.__get_task_result(project, future)
-                    report = deep_merge(
-                        report,
-                        {'projects': {project.id: result}}
-                    )
-                    # TODO replace by logger or process indication
-                    print("~~ [{}/{}] Done with '{}' project tasks ~~"
-                          "".format(i, i_end, project.name))
-                    # TODO write to report.part.yaml temporarily
-                except Exception as e:
-                    print("~~ [{}/{}] ERROR in '{}' project tasks ~~"
-                          "".format(i, i_end, project.name))
-                    traceback.print_exc()
-                del futures[future]
-                break
-            time.sleep(0.05)
+                projects[project.id] = result
+                if self.__journal is not None:
+                    self.__journal.append(project.id, result)
+                # TODO replace by logger or process indication
+                print("~~ [{}/{}] Done with '{}' project tasks ~~"
+                      "".format(i, i_end, project.name))
+            except Exception as e:
+                i += 1
+                if sharded:
+                    sharded.failed = True
+                print("~~ [{}/{}] ERROR in '{}' project tasks ~~"
+                      "".format(i, i_end, project.name))
+                traceback.print_exc()
         return report
 
     def __run_manual_task(self):
@@ -471,6 +1107,39 @@ class TaskExecutionManager:
             })
         return report
 
+    def __sum_file_statistics(self, report):
+        """
+        Sums the statistics of the file reads of the projects that were
+        analysed in this run
+
+        :param    report:  The report that contains the subreports of the
+                           projects
+
+        :returns: Dictionary with the number of files that were decoded with
+                  the fallback encoding and the number of skipped binary files
+        """
+        total = {'fallbacks': 0, 'binaries': 0}
+        for project_report in report.get('projects', {}).values():
+            statistics = project_report.get('.files', {})
+            for key in statistics:
+                total[key] = total.get(key, 0) + statistics[key]
+        return total
+
+    def __sum_command_statistics(self):
+        """
+        Sums the statistics of the external commands the jobs ran with the ones
+        of the commands this process ran itself, e.g. for the updates
+
+        :returns: Dictionary with the program and its first argument as key
+                  and a dictionary with the number of runs, the runtime in
+                  seconds, the output size in bytes and the number of
+                  timeouts as value
+        """
+        self.__add_command_statistics(command_statistics(reset=True))
+        for entry in self.__commands.values():
+            entry['seconds'] = round(entry['seconds'], 3)
+        return self.__commands
+
     def __run_project_tasks(self):
         """
         Runs the project (file and git) scrab tasks for the projects in parallel
@@ -482,10 +1151,35 @@ class TaskExecutionManager:
         """
         report = self.__add_scrab_task_meta_data('project_tasks',
                                                  self.__project_tasks)
-        executor = Pool(processes=int(cpu_count()*0.75))
-        futures = self.__queue_projects(executor)
+        projects = self.__resume_projects(report)
+        results = queue.Queue()
+        self.__commands = {}
+        command_statistics(reset=True)
+        updates = self.__update_projects(projects)
+        pending = self.__reuse_unchanged(results, projects, updates)
+        jobs = len(projects) - len(pending)
+
+        # the forked workers start with statistics of their own - they'd
+        # report the commands of the updates a second time otherwise
+        executor = Pool(processes=self.__processes,
+                        initializer=command_statistics, initargs=(True,))
+        acquirer = ThreadPool(processes=self.__acquisitions)
+        scheduler = ApiScheduler(self.__api_requests)
+        self.__prefetching = self.__prefetch(pending, scheduler, updates)
+        jobs += self.__queue_projects(acquirer, results, pending, updates)
 
-        deep_merge(report, self.__collect_project_results(report, futures))
+        try:
+            self.__collect_project_results(report, executor, results, jobs)
+        finally:
+            scheduler.close()
+            acquirer.close()
+            executor.close()
+            acquirer.join()
+            executor.join()
+
+        if self.__has_file_tasks():
+            report['files'] = self.__sum_file_statistics(report)
+        report['commands'] = self.__sum_command_statistics()
         return report
 
     def __run_report_tasks(self, report):
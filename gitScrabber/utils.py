@@ -25,7 +25,11 @@ THE SOFTWARE.
 
 import hashlib
 import os
+import signal
 import subprocess
+import tempfile
+import threading
+import time
 import regex
 
 
@@ -51,47 +55,220 @@ def __validate_exec_args(program, args):
                                         program))
 
 
-def __handle_result(process):
+# Number of runs, runtime in seconds, output size in bytes and number of
+# timeouts of the external commands run by this process - by the program and
+# its first argument, e.g. 'git clone'
+__statistics = {}
+__statistics_lock = threading.Lock()
+
+
+def __record(args, seconds, size, timed_out):
     """
-    handels the results from the executed program
+    Records the run of an external command
+
+    :param    args:       The program and arguments of the command
+    :param    seconds:    The runtime of the command
+    :param    size:       The number of bytes the command wrote to stdout
+    :param    timed_out:  Weather the command was killed by its timeout
+    """
+    command = ' '.join(args[:2])
+    with __statistics_lock:
+        entry = __statistics.setdefault(
+            command, {'runs': 0, 'seconds': 0.0, 'bytes': 0, 'timeouts': 0})
+        entry['runs'] += 1
+        entry['seconds'] += seconds
+        entry['bytes'] += size
+        entry['timeouts'] += int(timed_out)
+
+
+def command_statistics(reset=False):
+    """
+    :param    reset:  Weather the statistics are cleared afterwards - e.g. to
+                      pass them on from a worker process once its job is done
+
+    :returns: Dictionary with the program and its first argument as key and
+              a dictionary with the number of runs, the total runtime in
+              seconds, the total output size in bytes and the number of
+              timeouts of the commands run by this process as value
+    """
+    with __statistics_lock:
+        statistics = {command: dict(entry)
+                      for command, entry in __statistics.items()}
+        if reset:
+            __statistics.clear()
+        return statistics
+
+
+def merge_command_statistics(total, statistics):
+    """
+    Adds the statistics of external commands to the total statistics
+
+    :param    total:       The total statistics - they are modified
+    :param    statistics:  The statistics returned by command_statistics
+
+    :returns: The total statistics
+    """
+    for command, entry in statistics.items():
+        total_entry = total.setdefault(
+            command, {'runs': 0, 'seconds': 0.0, 'bytes': 0, 'timeouts': 0})
+        for key in entry:
+            total_entry[key] += entry[key]
+    return total
+
+
+def __start(program, args, cwd, stderr, timeout):
+    """
+    Starts a given program with given arguments in a specific dir
+
+    :param    program:  The program
+    :param    args:     The arguments
+    :param    cwd:      The working directory for the program
+    :param    stderr:   Where stderr of the program is written to
+    :param    timeout:  The timeout of the program or None - programs with a
+                        timeout are started in their own process group so that
+                        they can be killed together with their children. As
+                        they have no controlling terminal they can't prompt
+                        for input.
+
+    :returns: The process
+    """
+    __validate_exec_args(program, args)
+    new_env = dict(os.environ)  # Copy current environment
+    new_env['LC_ALL'] = 'C'  # force English output for PISIX conform programs
+    return subprocess.Popen(
+        [program, *(args or [])], cwd=cwd, env=new_env,
+        stdout=subprocess.PIPE, stderr=stderr,
+        start_new_session=timeout is not None)
+
+
+def __kill(process):
+    """
+    Kills the process - and the processes it started if it runs in its own
+    process group, like the helpers 'git clone' starts for the transport
 
     :param    process:  The process
+    """
+    try:
+        if os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass  # already gone
 
-    :returns: the data from stdout of the program
+
+def __expire(process, expired):
     """
-    out = process.communicate()
-    if process.returncode is not 0:
+    Kills the process as its timeout expired
+
+    :param    process:  The process
+    :param    expired:  The event that is set to mark the timeout
+    """
+    expired.set()
+    __kill(process)
+
+
+def __handle_result(process, error, timeout, timed_out):
+    """
+    handels the results from the executed program
+
+    :param    process:    The process
+    :param    error:      The data from stderr of the program
+    :param    timeout:    The timeout of the program
+    :param    timed_out:  Weather the program was killed by its timeout
+    """
+    if timed_out:
+        raise Exception("When executing "
+                        "'{}' timed out after {} seconds".format(
+                            process.args, timeout))
+    if process.returncode != 0:
         raise Exception("When executing "
                         "'{}' exited with return code: '{}' "
                         " and message:\n{}".format(
-                            process.args, process.returncode, out[1].decode()))
-    return out[0].decode(errors='ignore')
+                            process.args, process.returncode,
+                            error.decode(errors='ignore')))
 
 
-def run(program, args=[], cwd=None):
+def run(program, args=[], cwd=None, timeout=None, errors='ignore'):
     """
     Executes a given program with given arguments in a specific dir
 
     :param    program:  The program
     :param    args:     The arguments
     :param    cwd:      The working directory for the program
+    :param    timeout:  The number of seconds after which the program is
+                        killed or None to wait forever
+    :param    errors:   How bytes of stdout that aren't UTF-8 are decoded -
+                        'surrogateescape' keeps them like file paths do
 
     :returns: the data from stdout of the program
     """
-    __validate_exec_args(program, args)
-    process = None
-    new_env = dict(os.environ)  # Copy current environment
-    new_env['LC_ALL'] = 'C'  # force English output for PISIX conform programs
-    if(args is not None):
-        process = subprocess.Popen(
-            [program, *args], cwd=cwd, env=new_env,
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    else:
-        process = subprocess.Popen(
-            [program], cwd=cwd, env=new_env,
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    start = time.monotonic()
+    process = __start(program, args, cwd, subprocess.PIPE, timeout)
+    timed_out = False
+
+    try:
+        out = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        __kill(process)
+        out = process.communicate()
+        timed_out = True
+    except BaseException:
+        __kill(process)  # e.g. interrupted - don't leave it running
+        process.wait()
+        raise
+
+    __record(process.args, time.monotonic() - start, len(out[0]),
+             timed_out)
+    __handle_result(process, out[1], timeout, timed_out)
+    return out[0].decode(errors=errors)
+
+
+def stream(program, args=[], cwd=None, timeout=None):
+    """
+    Executes a given program with given arguments in a specific dir and
+    yields the lines of its stdout as they arrive - unlike run the output is
+    never held in memory as a whole. stderr is spooled to a temporary file.
+    The program is killed if the generator is closed before the end of the
+    output.
+
+    :param    program:  The program
+    :param    args:     The arguments
+    :param    cwd:      The working directory for the program
+    :param    timeout:  The number of seconds after which the program is
+                        killed or None to wait forever
 
-    return __handle_result(process)
+    :returns: Generator of the decoded lines from stdout of the program -
+              without the line break
+    """
+    start = time.monotonic()
+    with tempfile.TemporaryFile() as error:
+        process = __start(program, args, cwd, error, timeout)
+        expired = threading.Event()
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, __expire, [process, expired])
+            timer.start()
+
+        size = 0
+        finished = False
+        try:
+            for line in process.stdout:
+                size += len(line)
+                yield line.decode(errors='ignore').rstrip('\n')
+            finished = True
+        finally:
+            if timer is not None:
+                timer.cancel()  # before the process id could be reused
+            if not finished:
+                __kill(process)  # the generator was closed early
+            process.wait()
+            process.stdout.close()
+            __record(process.args, time.monotonic() - start, size,
+                     expired.is_set())
+
+        error.seek(0)
+        __handle_result(process, error.read(), timeout, expired.is_set())
 
 
 def deep_merge(a, b, overwrite=False, path=None):
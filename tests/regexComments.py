@@ -0,0 +1,379 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+"""
+The regular expressions ProjectMetrics used to remove the comments before the
+CommentTokenizer replaced them - kept as reference for the differential test
+"""
+
+import regex
+
+
+def c_style_comment_query():
+    """
+    Regex to remove c style comments from a string. This is a modified /
+    improved version of the code found at [1]. Mainly the newlines from
+    comments are also removed if this line was only used by a comment.
+
+    [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
+
+    :returns: Regex with match group 1 that contains all code that is not a
+              comment
+    """
+    pattern = r"""
+                         ## ---- SOLITARY MULTI LINE COMMENT ----
+        ^[\t\f\v ]*      ##  Start with only spaces on line
+        /\*              ##  Start of /* ... */ comment
+        [^*]*\*+         ##  Non-* followed by 1-or-more *'s
+        (?:              ##
+          [^/*][^*]*\*+  ##
+        )*               ##  0-or-more things which don't start with /
+                         ##     but do end with '*'
+        /                ##  End of /* ... */ comment
+        \n               ##  match trailing new line as this line was only
+                         ##     used for a comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- MULTI LINE COMMENT ----
+        /\*              ##  Start of /* ... */ comment
+        [^*]*\*+         ##  Non-* followed by 1-or-more *'s
+        (?:              ##
+          [^/*][^*]*\*+  ##
+        )*               ##  0-or-more things which don't start with /
+                         ##     but do end with '*'
+        /                ##  End of /* ... */ comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- SOLITARY SINGLE LINE COMMENT ----
+         ^[\t\f\v ]*     ##  Start with only spaces on line
+         //              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+         \n              ##  match trailing new line as this line was only
+                         ##     used for a comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- SINGLE LINE COMMENT ----
+         //              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+      |                  ## ---------------- OR ----------------
+        (                ## ---- " ... " STRING ----
+          "              ##  Start of " ... " string
+          (?:            ##
+            (?:          ##
+              \\.        ##  Escaped char
+            )*           ##
+          |              ## ---------------- OR ----------------
+            [^"\\]*      ##  Non "\ characters
+          )*             ##
+          "              ##  End of " ... " string
+        |                ## ---------------- OR ----------------
+                         ## ---- ' ... ' STRING ----
+          '              ##  Start of ' ... ' string
+          (?:            ##
+            (?:          ##
+              \\.        ##  Escaped char
+            )*           ##
+          |              ## ---------------- OR ----------------
+            [^'\\]*      ##  Non '\ characters
+          )*             ##
+          '              ##  End of ' ... ' string
+        |                ## ---------------- OR ----------------
+                         ## ---- ANYTHING ELSE ----
+          .              ##  Anything other char
+          [^/"'\\]*      ##  Chars which doesn't start a comment, string
+        )                ##    or escape
+    """
+    flags = regex.VERBOSE | regex.MULTILINE | regex.DOTALL
+    return regex.compile(pattern, flags)
+
+def php_style_comment_query():
+    """
+    Regex to remove php style comments from a string. This is a modified /
+    improved version of the code found at [1]. Mainly the newlines from
+    comments are also removed if this line was only used by a comment.
+
+    [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
+
+    :returns: Regex with match group 1 that contains all code that is not a
+              comment
+    """
+    pattern = r"""
+                         ## ---- SOLITARY MULTI LINE COMMENT ----
+        ^[\t\f\v ]*      ##  Start with only spaces on line
+        /\*              ##  Start of /* ... */ comment
+        [^*]*\*+         ##  Non-* followed by 1-or-more *'s
+        (?:              ##
+          [^/*][^*]*\*+  ##
+        )*               ##  0-or-more things which don't start with /
+                         ##     but do end with '*'
+        /                ##  End of /* ... */ comment
+        \n               ##  match trailing new line as this line was only
+                         ##     used for a comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- MULTI LINE COMMENT ----
+        /\*              ##  Start of /* ... */ comment
+        [^*]*\*+         ##  Non-* followed by 1-or-more *'s
+        (?:              ##
+          [^/*][^*]*\*+  ##
+        )*               ##  0-or-more things which don't start with /
+                         ##     but do end with '*'
+        /                ##  End of /* ... */ comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- SOLITARY SINGLE LINE COMMENT ----
+         ^[\t\f\v ]*     ##  Start with only spaces on line
+         //              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+         \n              ##  match trailing new line as this line was only
+                         ##     used for a comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- SINGLE LINE COMMENT ----
+         //              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+      |                  ## ---------------- OR ----------------
+                         ## ---- SOLITARY SINGLE LINE COMMENT ----
+         ^[\t\f\v ]*     ##  Start with only spaces on line
+         \#              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+         \n              ##  match trailing new line as this line was only
+                         ##     used for a comment
+      |                  ## ---------------- OR ----------------
+                         ## ---- SINGLE LINE COMMENT ----
+         \#              ##  Single line comment
+         [^\n]*          ##  match anything but new line
+      |                  ## ---------------- OR ----------------
+        (                ## ---- " ... " STRING ----
+          "              ##  Start of " ... " string
+          (?:            ##
+             (?:         ##
+               \\.       ##  Escaped char
+             )*          ##
+          |              ## ---------------- OR ----------------
+            [^"\\]*      ##  Non "\ characters
+          )*             ##
+          "              ##  End of " ... " string
+        |                ## ---------------- OR ----------------
+                         ## ---- ' ... ' STRING ----
+          '              ##  Start of ' ... ' string
+          (?:            ##
+             (?:         ##
+               \\.       ##  Escaped char
+             )*          ##
+          |              ## ---------------- OR ----------------
+            [^'\\]*      ##  Non '\ characters
+          )*             ##
+          '              ##  End of ' ... ' string
+        |                ## ---------------- OR ----------------
+                         ## ---- ANYTHING ELSE ----
+          .              ##  Anything other char
+          [^/"'\\]*      ##  Chars which doesn't start a comment, string
+        )                ##    or escape
+    """
+    flags = regex.VERBOSE | regex.MULTILINE | regex.DOTALL
+    return regex.compile(pattern, flags)
+
+def python_style_comment_query():
+    """
+    Regex to remove python style comments from a string. This is a modified
+    / improved version of the code found at [1]. Mainly the newlines from
+    comments are also removed if this line was only used by a comment.
+
+    [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
+
+    :returns: Regex with match group 1 that contains all code that is not a
+              comment
+    """
+    pattern = r"""
+                          ## ---- ""DocString"" ----
+        ^[\t\f\v ]*       ##  Start with only spaces on line
+        \"\"\"            ##  Start of DocString comment
+        .*?               ##  Anything
+        \"\"\"            ##  End of DocString comment
+        \n                ##  match trailing new line as this line was
+                          ##    only used for a comment
+      |                   ## ---------------- OR ----------------
+                          ## ---- ''DocString'' ----
+        ^[\t\f\v ]*       ##  Start with only spaces on line
+        \'\'\'            ##  Start of DocString comment
+        .*?               ##  Anything
+        \'\'\'            ##  End of DocString comment
+        \n                ##  match trailing new line as this line was
+                          ##    only used for a comment
+      |                   ## ---------------- OR ----------------
+                          ## ---- SOLITARY SINGLE LINE COMMENT ----
+         ^[\t\f\v ]*      ##  Start with only spaces on line
+         \#               ##  Single line comment
+         [^\n]*           ##  match anything but new line
+         \n               ##  match trailing new line as this line was
+                          ##    only used for a comment
+      |                   ## ---------------- OR ----------------
+                          ## ---- SINGLE LINE COMMENT ----
+         \#               ##  Single line comment
+         [^\n]*           ##  match anything but new line
+      |                   ## ---------------- OR ----------------
+        (                 ## ---- ""Multiline String"" ----
+            \"\"\"        ##  Start of Multiline String comment
+            .*?           ##  Anything
+            \"\"\"        ##  End of /* ... */ comment
+          |               ## ---------------- OR ----------------
+                          ## ---- ''Multiline String'' ----
+            \'\'\'        ##  Start of Multiline String comment
+            .*?           ##  Anything
+            \'\'\'        ##  End of /* ... */ comment
+          |               ## ---------------- OR ----------------
+            \"            ## ---- " ... " STRING ----
+              (?:         ##
+                (?:       ##
+                  \\.     ##  Escaped char
+                )*        ##
+              |           ## ---------------- OR ----------------
+                [^"\\]*   ##  Non "\ characters
+              )*          ##
+            \"            ##  End of " ... " string
+          |               ## ---------------- OR ----------------
+            \'            ## ---- ' ... ' STRING ----
+              (?:         ##
+                (?:       ##
+                  \\.     ##  Escaped char
+                )*        ##
+              |           ## ---------------- OR ----------------
+                [^'\\]*   ##  Non "\ characters
+              )*          ##
+            \'            ##  End of ' ... ' string
+          |               ## ---------------- OR ----------------
+                          ## ---- ANYTHING ELSE ----
+            .             ##  Anything other char
+        )                 ##
+    """
+    return regex.compile(pattern, regex.VERBOSE | regex.MULTILINE
+                         | regex.DOTALL)
+
+def ruby_style_comment_query():
+    """
+    Regex to remove ruby style comments from a string. This is a modified
+    / improved version of the code found at [1]. Mainly the newlines from
+    comments are also removed if this line was only used by a comment.
+
+    this regex is not perfect, but probable good enough - string literals
+    are messed up in ruby, see [2]. As far as our usages this *should* be
+    fine tough.
+
+    [1] https://www.saltycrane.com/blog/2007/11/remove-c-comments-python/
+    [2] http://docs.huihoo.com/ruby/ruby-man-1.4/syntax.html#string
+
+    :returns: Regex with match group 1 that contains all code that is not a
+              comment
+    """
+    pattern = r"""
+                          ## ---- ""DocString"" ----
+        ^[\t\f\v ]*       ##  Start with only spaces on line
+        =begin            ##  Start of DocString comment
+        .*?               ##  Anything
+        =end              ##  End of DocString comment
+        \n                ##  match trailing new line as this line was only
+                          ##      used for a comment
+      |                   ## ---------------- OR ----------------
+                          ## ---- SOLITARY SINGLE LINE COMMENT ----
+         ^[\t\f\v ]*      ##  Start with only spaces on line
+         \#               ##  Single line comment
+         [^\n]*           ##  match anything but new line
+         \n               ##  match trailing new line as this line was only
+                          ##      used for a comment
+      |                   ## ---------------- OR ----------------
+                          ## ---- SINGLE LINE COMMENT ----
+         \#               ##  Single line comment
+         [^\n]*           ##  match anything but new line
+      |                   ## ---------------- OR ----------------
+        (                 ##
+                          ## ---- ""Multiline String"" ----
+            \"            ## ---- " ... " STRING ----
+              (?:         ##
+                (?:       ##
+                  \\.     ##  Escaped char
+                )*        ##
+              |           ## ---------------- OR ----------------
+                [^"\\]*    ##  Non "\ characters
+              )*          ##
+            \"            ##  End of " ... " string
+          |               ## ---------------- OR ----------------
+            \'            ## ---- ' ... ' STRING ----
+              (?:         ##
+                (?:       ##
+                  \\.     ##  Escaped char
+                )*        ##r
+              |           ## ---------------- OR ----------------
+                [^"\\]*   ##  Non "\ characters
+              )*          ##
+            \'            ##  End of ' ... ' string
+          |               ## ---------------- OR ----------------
+            \%[qQ]?       ## ---- Special Ruby String ----
+            ([^\(\{\<\[]) ##  String start character
+            .*?           ##  Anything
+            \2            ##  End start character
+          |               ## ---------------- OR ----------------
+            \%[qQ]?       ## ---- Special Ruby String ----
+            \(            ##  String start character
+            .*?           ##  Anything
+            \)            ##  End start character
+          |               ## ---------------- OR ----------------
+            \%[qQ]?       ## ---- Special Ruby String ----
+            \{            ##  String start character
+            .*?           ##  Anything
+            \}            ##  End start character
+          |               ## ---------------- OR ----------------
+            \%[qQ]?       ## ---- Special Ruby String ----
+            \[            ##  String start character
+            .*?           ##  Anything
+            \]            ##  End start character
+          |               ## ---------------- OR ----------------
+            \%[qQ]?       ## ---- Special Ruby String ----
+            \<            ##  String start character
+            .*?           ##  Anything
+            \>            ##  End start character
+          |               ## ---------------- OR ----------------
+                          ## ---- ANYTHING ELSE ----
+            .             ##  Anything other char
+        )                 ##
+    """
+    return regex.compile(pattern, regex.VERBOSE | regex.MULTILINE
+                         | regex.DOTALL)
+
+
+queries = {
+    '.c': c_style_comment_query(),
+    '.php': php_style_comment_query(),
+    '.py': python_style_comment_query(),
+    '.rb': ruby_style_comment_query()
+}
+
+
+def cleaned_loc(extension, text):
+    """
+    Counts the LOC without comments like ProjectMetrics did with the regexes
+
+    :param    extension:  The file extension - one of the keys of queries
+    :param    text:       The file contents
+
+    :returns: The number of LOC without comments
+    """
+    noncomments = [m.group(1) for m in queries[extension].finditer(text)
+                   if m.group(1)]
+    return "".join(noncomments).rstrip().count('\n')
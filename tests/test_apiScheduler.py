@@ -0,0 +1,116 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from apiScheduler import ApiScheduler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import threading
+import time
+
+
+class RateLimitStub(BaseHTTPRequestHandler):
+    """
+    Answers the first request for /primary with the primary rate limit and
+    the first request for /secondary with a secondary rate limit
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, time.time()))
+        headers = {}
+        status = 200
+        if self.path not in self.server.limited:
+            self.server.limited.add(self.path)
+            if self.path == '/primary':
+                status = 403
+                headers = {'X-RateLimit-Remaining': '0',
+                           'X-RateLimit-Reset': str(int(time.time()) + 2)}
+            elif self.path == '/secondary':
+                status = 403
+                headers = {'Retry-After': '1'}
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RateLimitStub)
+    server.requests = []
+    server.limited = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = 'http://127.0.0.1:{}'.format(server.server_port)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def sent(server, path):
+    return [at for request, at in server.requests if request == path]
+
+
+def test_primary_rate_limit_blocks_only_its_resource(server):
+    scheduler = ApiScheduler()
+    try:
+        limited = scheduler.submit(scheduler.request, 'GET',
+                                   server.url + '/primary', 'limited')
+        while not sent(server, '/primary'):
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        start = time.time()
+        other = scheduler.request('GET', server.url + '/other', 'other')
+        assert other.status_code == 200
+        assert time.time() - start < 1
+
+        assert limited.result(timeout=10).status_code == 200
+        first, retry = sent(server, '/primary')
+        assert retry - first > 1
+    finally:
+        scheduler.close()
+
+
+def test_secondary_rate_limit_blocks_all_resources(server):
+    scheduler = ApiScheduler()
+    try:
+        limited = scheduler.submit(scheduler.request, 'GET',
+                                   server.url + '/secondary', 'limited')
+        while not sent(server, '/secondary'):
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+        other = scheduler.request('GET', server.url + '/other', 'other')
+        assert other.status_code == 200
+        assert sent(server, '/other')[0] - sent(server, '/secondary')[0] > 0.9
+        assert limited.result(timeout=10).status_code == 200
+    finally:
+        scheduler.close()
@@ -0,0 +1,154 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from commitHistory import CommitHistory
+
+import os
+import pytest
+import subprocess
+
+
+class Repository:
+    """
+    A temporary git repository whose commits are dated one day apart
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.__day = 0
+        os.makedirs(location)
+        self.git('init', '-q')
+
+    def git(self, *args, author='Alice'):
+        environment = dict(os.environ)
+        date = '{} +0200'.format(1483264800 + self.__day * 86400)
+        environment.update({
+            'GIT_AUTHOR_NAME': author, 'GIT_AUTHOR_EMAIL': author + '@a',
+            'GIT_COMMITTER_NAME': 'c', 'GIT_COMMITTER_EMAIL': 'c@a',
+            'GIT_AUTHOR_DATE': date, 'GIT_COMMITTER_DATE': date})
+        return subprocess.run(
+            ['git'] + list(args), cwd=self.location, env=environment,
+            check=True, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL).stdout.decode()
+
+    def commit(self, author, name=None, text=None):
+        self.__day += 1
+        name = name or 'file{}'.format(self.__day)
+        with open(os.path.join(self.location, name), 'w') as file:
+            file.write(text or name)
+        self.git('add', name)
+        self.git('commit', '-q', '-m', name, author=author)
+
+
+def aggregates(location, cache_path=None):
+    history = CommitHistory(location, cache_path)
+    return (history.author_commits(), history.first_commit_date(),
+            history.last_commit_date())
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = Repository(str(tmp_path / 'repository'))
+    for author in ('Alice', 'Bob', 'Alice'):
+        repository.commit(author)
+    return repository
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'history.pickle')
+
+
+def test_append(repository, cache_path):
+    aggregates(repository.location, cache_path)
+    repository.git('checkout', '-q', '-b', 'side')
+    repository.commit('Carol')
+    repository.git('checkout', '-q', '-')
+    repository.commit('Dave')
+    repository.git('merge', '-q', '--no-edit', 'side')
+
+    incremental = aggregates(repository.location, cache_path)
+    assert incremental == aggregates(repository.location)
+    assert incremental[0] == [(2, 'Alice'), (1, 'Bob'), (1, 'Carol'),
+                              (1, 'Dave')]
+    assert aggregates(repository.location, cache_path) == incremental
+
+
+def test_new_branch_of_merged_side_branch(tmp_path, cache_path):
+    repository = Repository(str(tmp_path / 'repository'))
+    repository.git('checkout', '-q', '--orphan', 'side')
+    repository.commit('Alice')
+    repository.git('checkout', '-q', '--orphan', 'main')
+    repository.git('rm', '-r', '-q', '-f', '.')
+    repository.commit('Bob')
+    repository.git('merge', '-q', '--no-edit', '--allow-unrelated-histories',
+                   'side')
+    repository.git('branch', '-q', '-D', 'side')
+    # the side root isn't reached along the first parents
+    assert aggregates(repository.location, cache_path)[1].startswith(
+        '2017-01-03')
+
+    repository.git('checkout', '-q', '-b', 'branch', 'HEAD^2')
+    repository.commit('Carol')
+    repository.git('checkout', '-q', 'main')
+
+    incremental = aggregates(repository.location, cache_path)
+    assert incremental == aggregates(repository.location)
+    assert incremental[1].startswith('2017-01-02')
+
+
+def test_force_push_rewrite(repository, cache_path):
+    aggregates(repository.location, cache_path)
+    repository.git('reset', '-q', '--hard', 'HEAD~2')
+    repository.commit('Erin')
+
+    rewritten = aggregates(repository.location, cache_path)
+    assert rewritten == aggregates(repository.location)
+    assert rewritten[0] == [(1, 'Alice'), (1, 'Erin')]
+
+
+def test_mailmap_change(repository, cache_path):
+    before = aggregates(repository.location, cache_path)
+    repository.commit('Alice', '.mailmap', 'Bob Builder <Bob@a>\n')
+
+    remapped = aggregates(repository.location, cache_path)
+    assert remapped == aggregates(repository.location)
+    assert remapped[0] == [(3, 'Alice'), (1, 'Bob Builder')]
+    assert remapped[1] == before[1]
+
+
+def test_deepened_shallow_clone(repository, cache_path, tmp_path):
+    clone = str(tmp_path / 'clone')
+    subprocess.run(['git', 'clone', '-q', '--depth', '1',
+                    'file://' + repository.location, clone], check=True,
+                   stderr=subprocess.DEVNULL)
+    shallow = aggregates(clone, cache_path)
+    assert shallow[0] == [(1, 'Alice')]
+
+    subprocess.run(['git', 'fetch', '-q', '--unshallow'], cwd=clone,
+                   check=True, stderr=subprocess.DEVNULL)
+    deepened = aggregates(clone, cache_path)
+    assert deepened == aggregates(clone)
+    assert deepened[0] == [(2, 'Alice'), (1, 'Bob')]
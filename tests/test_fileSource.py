@@ -0,0 +1,114 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from fileSource import GitFileSource, WalkFileSource
+
+import os
+import pytest
+import subprocess
+
+
+def git(cwd, *args):
+    subprocess.run(['git'] + list(args), cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    for variable in ('GIT_AUTHOR', 'GIT_COMMITTER'):
+        monkeypatch.setenv(variable + '_NAME', 'a')
+        monkeypatch.setenv(variable + '_EMAIL', 'a@b')
+
+    location = tmp_path / 'repository'
+    write(str(location / 'main.c'), b'int main;\n')
+    write(str(location / 'dir' / 'a.c'), b'int a;\n' * 100)
+    write(str(location / '.hidden' / 'secret.c'), b'int secret;\n')
+    write(os.fsencode(str(location)) + b'/caf\xe9.c', b'int cafe;\n')
+    links = {
+        'file': 'main.c',
+        'chain': 'file',
+        'linkdir': 'dir',
+        'through': 'linkdir/a.c',
+        'parent': 'dir/../dir/a.c',
+        'up': '../main.c',
+        'revealed': '.hidden/secret.c',
+        'dangling': 'missing.c',
+        'absolute': '/nonexistent/file.c',
+        'loop': 'loop',
+    }
+    for name, target in links.items():
+        os.symlink(target, str(location / name))
+    os.symlink('../main.c', str(location / 'dir' / 'up'))
+
+    git(str(location), 'init', '-q')
+    git(str(location), 'add', '-A')
+    git(str(location), 'commit', '-q', '-m', 'files')
+    return str(location)
+
+
+def contents(source):
+    """
+    :returns: Dictionary with the path as key and a tuple of the size and
+              the contents of the file as value
+    """
+    files = {}
+    try:
+        for path in source.files():
+            with source.open(path) as file:
+                files[path] = (source.size(path), file.read())
+    finally:
+        source.close()
+    return files
+
+
+def test_git_source_matches_walk_source(repository):
+    walked = contents(WalkFileSource(repository))
+    listed = contents(GitFileSource(repository))
+
+    assert listed == walked
+    assert sorted(listed) == [
+        'caf\udce9.c', 'chain', 'dir/a.c', 'dir/up', 'file', 'main.c',
+        'parent', 'revealed', 'through']
+
+
+def test_partial_clone_sizes(repository, tmp_path):
+    git(repository, 'config', 'uploadpack.allowFilter', 'true')
+    clone = str(tmp_path / 'clone')
+    git(str(tmp_path), 'clone', '-q', '--no-checkout', '--filter=blob:none',
+        'file://' + repository, clone)
+
+    source = GitFileSource(clone)
+    try:
+        sizes = {path: source.size(path) for path in source.files()}
+    finally:
+        source.close()
+    assert sizes['dir/a.c'] == 700
+    assert sizes['through'] == 700
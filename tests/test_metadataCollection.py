@@ -0,0 +1,204 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from apiScheduler import ApiScheduler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import json
+import pytest
+import scrabTasks.git.metadataCollection as metadataCollection
+import threading
+
+# the repositories the stub serves - the languages are ordered by their size
+repositories = {
+    ('owner', 'alpha'): {
+        'stars': 10, 'forks': 2, 'licence': ('MIT License', 'MIT'),
+        'languages': [('C', 900), ('Python', 100)]},
+    ('owner', 'beta'): {
+        'stars': 0, 'forks': 0, 'licence': None, 'languages': []},
+    ('owner', 'gamma'): {
+        'stars': 3, 'forks': 1, 'licence': ('Other', 'NOASSERTION'),
+        'languages': [('Go', 5)]},
+    ('other', 'delta'): {
+        'stars': 7, 'forks': 4, 'licence': ('Apache License 2.0',
+                                            'Apache-2.0'),
+        'languages': [('Rust', 50), ('Shell', 20), ('C', 10)]},
+    ('other', 'epsilon'): {
+        'stars': 1, 'forks': 0, 'licence': ('MIT License', 'MIT'),
+        'languages': [('Ruby', 1)]},
+}
+
+
+class GithubStub(BaseHTTPRequestHandler):
+    """
+    Serves canned replies of the github GraphQL and REST api - repositories
+    in the server's graphql_missing set are not resolved by the GraphQL api
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def __reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(
+            int(self.headers['Content-Length'])))
+        variables = request['variables']
+        count = len(variables) // 2
+        self.server.requests.append(('graphql', count))
+
+        data = {}
+        errors = []
+        for i in range(count):
+            key = (variables['owner{}'.format(i)],
+                   variables['name{}'.format(i)])
+            if key in self.server.graphql_missing:
+                data['r{}'.format(i)] = None
+                errors.append({'type': 'NOT_FOUND', 'path': ['r{}'.format(i)]})
+                continue
+
+            repository = repositories[key]
+            licence = repository['licence']
+            data['r{}'.format(i)] = {
+                'stargazerCount': repository['stars'],
+                'forkCount': repository['forks'],
+                'licenseInfo': licence and {'name': licence[0],
+                                            'spdxId': licence[1]},
+                'languages': {'nodes': [{'name': name} for name, _
+                                        in repository['languages']]}
+            }
+        self.__reply(200, {'data': data, 'errors': errors})
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        self.server.requests.append(('rest', tuple(parts[1:3])))
+        repository = repositories.get(tuple(parts[1:3]))
+
+        if repository is None:
+            self.__reply(404, {'message': 'Not Found'})
+        elif parts[3:] == ['languages']:
+            self.__reply(200, dict(repository['languages']))
+        else:
+            licence = repository['licence']
+            self.__reply(200, {
+                'stargazers_count': repository['stars'],
+                'forks': repository['forks'],
+                'license': licence and {'name': licence[0],
+                                        'spdx_id': licence[1]}})
+
+
+class GlobalArgs:
+
+    def __init__(self, github_token):
+        self.github_token = github_token
+        self.http_cache = None
+        self.http_cache_ttl = None
+        self.offline = False
+
+
+class Project:
+
+    def __init__(self, owner, name):
+        self.id = '{}_{}'.format(owner, name)
+        self.url = 'https://github.com/{}/{}'.format(owner, name)
+
+
+@pytest.fixture
+def github(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GithubStub)
+    server.requests = []
+    server.graphql_missing = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    url = 'http://127.0.0.1:{}'.format(server.server_port)
+    monkeypatch.setattr(metadataCollection, 'graphql_url', url + '/graphql')
+    monkeypatch.setattr(metadataCollection, 'rest_url', url + '/repos/')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def prefetch(parameter, token):
+    """
+    Prefetches the reports of all repositories of the stub
+
+    :param    parameter:  The parameter of the task
+    :param    token:      The github token or None
+
+    :returns: Dictionary with the project id as key and the report as value
+    """
+    projects = [Project(*key) for key in repositories]
+    scheduler = ApiScheduler(2)
+    try:
+        futures = metadataCollection.prefetch(
+            projects, parameter, GlobalArgs(token), scheduler)
+        return {project_id: future.result(timeout=30)
+                for project_id, future in futures.items()}
+    finally:
+        scheduler.close()
+
+
+def test_graphql_batches(github):
+    reports = prefetch({'batch': 2}, 'token')
+
+    assert len(reports) == len(repositories)
+    assert sorted(github.requests) == [
+        ('graphql', 1), ('graphql', 2), ('graphql', 2)]
+
+
+def test_partial_graphql_errors_fall_back_to_rest(github):
+    github.graphql_missing.add(('owner', 'gamma'))
+    reports = prefetch({'batch': 10}, 'token')
+
+    assert github.requests.count(('graphql', 5)) == 1
+    assert {key for kind, key in github.requests if kind == 'rest'} == {
+        ('owner', 'gamma')}
+    assert reports['owner_gamma'] == {
+        'stars': 3, 'languages': ['Go'], 'main_language': 'Go', 'forks': 1,
+        'licence': {'name': None, 'abb': None}}
+
+
+def test_graphql_reports_match_rest(github):
+    graphql = prefetch({}, 'token')
+    assert all(kind == 'graphql' for kind, _ in github.requests)
+
+    del github.requests[:]
+    rest = prefetch({'batch': 0}, 'token')
+    assert all(kind == 'rest' for kind, _ in github.requests)
+
+    assert graphql == rest
+    assert rest['other_delta'] == {
+        'stars': 7, 'languages': ['Rust', 'Shell', 'C'],
+        'main_language': 'Rust', 'forks': 4,
+        'licence': {'name': 'Apache License 2.0', 'abb': 'Apache-2.0'}}
+    assert rest['owner_beta'] == {
+        'stars': 0, 'languages': None, 'main_language': None, 'forks': 0,
+        'licence': {'name': None, 'abb': None}}
@@ -0,0 +1,121 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from projectTaskRunner import ProjectFile
+from scrabTasks.file.projectMetrics import ProjectMetrics
+
+import pytest
+import regexComments
+
+snippets = {
+    '.c': [
+        'int a;\n/* one */\nint b;\n',
+        '/* multi\n   line\n   comment */\nint a;\n',
+        'int a; /* trailing */\nint b; // trailing\n',
+        '/* outer /* nested */ still code */\nint a;\n',
+        '/* unterminated\nint a;\nint b;\n',
+        'int a;\n// unterminated line comment',
+        'char *s = "/* no comment */";\nint a;\n',
+        'char *s = "// no comment";\n// comment\n',
+        'char *s = "escaped \\" /* quote */";\nint a;\n',
+        "char c = '\\'';\n/* c */\nint a;\n",
+        "char c = '\"'; // quote\nint a;\n",
+        'int a;\r\n/* crlf */\r\nint b;\r\n// crlf\r\nint c;\r\n',
+        '  \t/* indented */\n\t// indented\nint a;\n',
+        'int a = 4 / 2 * 3;\nint b = a/*x*/+1;\n',
+        '/**/\n/***/\n/* ** */\nint a;\n',
+        'char *s = "unterminated\nint a;\n/* c */\n',
+        '',
+        '\n\n\n',
+    ],
+    '.php': [
+        '<?php\n# hash comment\n$a = 1;\n',
+        '<?php\n$a = 1; # trailing\n// line\n/* block */\n',
+        '<?php\n$s = "# not a comment";\n$t = \'/* nor this */\';\n',
+        '<?php\n/* unterminated\n$a = 1;\n',
+        '<?php\r\n# crlf\r\n$a = 1;\r\n',
+        '<?php\n$s = "esc \\" # quote";\n$a = 1;\n',
+    ],
+    '.py': [
+        '# comment\na = 1\n',
+        'a = 1  # trailing\nb = 2\n',
+        '"""\ndocstring\n"""\na = 1\n',
+        "'''\ndocstring\n'''\na = 1\n",
+        'def f():\n    """doc"""\n    return 1\n',
+        's = "# not a comment"\nt = \'# nor this\'\n',
+        's = "esc \\" # quote"\na = 1\n',
+        'x = """\nmulti line string\n"""\n',
+        '"""unterminated\na = 1\n',
+        '# a\r\na = 1\r\n"""\r\ndoc\r\n"""\r\nb = 2\r\n',
+        's = "unterminated\n# comment\na = 1\n',
+    ],
+    '.rb': [
+        '# comment\na = 1\n',
+        '=begin\nblock comment\n=end\na = 1\n',
+        'a = 1 # trailing\nb = 2\n',
+        's = "# not a comment"\nt = \'# nor this\'\n',
+        's = %q(# not a comment)\na = 1\n',
+        's = %Q{# not {a} comment}\na = 1\n',
+        's = %[# nor this]\nt = %<# nor this>\n',
+        's = %|# nor this|\na = 1\n',
+        's = "esc \\" # quote"\na = 1\n',
+        '=begin\nunterminated\na = 1\n',
+        '# a\r\na = 1\r\n=begin\r\nx\r\n=end\r\nb = 2\r\n',
+        'a = 5 % 3 # modulo\nb = 2\n',
+    ]
+}
+
+
+class GlobalArgs:
+    github_token = None
+
+
+class Project:
+    location = '/project'
+
+
+def tokenizer_loc(extension, text):
+    """
+    Counts the LOC without comments with the CommentTokenizer of
+    ProjectMetrics
+
+    :param    extension:  The file extension
+    :param    text:       The file contents
+
+    :returns: The number of LOC without comments
+    """
+    filepath = '/project/file' + extension
+    file = ProjectFile(filepath, lambda path, limit=None: text,
+                       sizer=lambda path: len(text))
+    task = ProjectMetrics({}, GlobalArgs())
+    return task.scrab(Project(), filepath, file)[1]
+
+
+@pytest.mark.parametrize('extension, text', [
+    (extension, text)
+    for extension in snippets for text in snippets[extension]])
+def test_cleaned_loc_matches_regexes(extension, text):
+    assert (tokenizer_loc(extension, text)
+            == regexComments.cleaned_loc(extension, text))
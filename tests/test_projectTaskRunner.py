@@ -0,0 +1,165 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from projectTaskRunner import FileTaskRunner
+from scrabTasks.scrabTask import FileInput, FileTask
+
+import os
+import pickle
+import pytest
+
+
+class TextRecorder(FileTask):
+    """
+    Records the texts of the files it is given - limited to the prefix given
+    as parameter or complete
+    """
+
+    def __init__(self, parameter, global_args):
+        super(TextRecorder, self).__init__(
+            'TextRecorder', '1.0.0', parameter, global_args)
+        self.texts = {}
+
+    def file_input(self):
+        if self._parameter is None:
+            return FileInput('full')
+        return FileInput('prefix', limit=self._parameter)
+
+    def scrab(self, project, filepath, file):
+        self.add(project, filepath, file.text())
+        return self.texts[os.path.basename(filepath)]
+
+    def add(self, project, filepath, result):
+        self.texts[os.path.basename(filepath)] = result
+
+    def partial(self):
+        return self.texts
+
+    def merge(self, partial):
+        self.texts.update(partial)
+
+    def report(self):
+        return self.texts
+
+
+class TaskWrapper:
+
+    def __init__(self):
+        self.name = 'TextRecorder'
+        self.kind = 'file'
+        self.version = '1.0.0'
+        self.construct = TextRecorder
+
+
+class ScrabTaskManager:
+
+    def get_task(self, name):
+        return TaskWrapper()
+
+
+class MetaTask:
+
+    def __init__(self, parameter):
+        self.name = 'TextRecorder'
+        self.parameter = parameter
+
+
+class Project:
+
+    def __init__(self, location):
+        self.id = 'project'
+        self.name = 'project'
+        self.kind = 'archive'
+        self.updated = True
+        self.location = location
+        self.cache_location = location + '.cache'
+        os.makedirs(self.cache_location)
+
+
+def create(location, files):
+    os.makedirs(location)
+    for name, data in files.items():
+        with open(os.path.join(location, name), 'wb') as file:
+            file.write(data)
+    return Project(location)
+
+
+def read(tmp_path, files, limit):
+    """
+    Reads the files with a FileTaskRunner
+
+    :param    tmp_path:  The directory the project is created in
+    :param    files:     Dictionary with the file name as key and the bytes of
+                         the file as value
+    :param    limit:     The number of characters the task needs or None
+
+    :returns: Tuple of the texts of the files and the file statistics
+    """
+    project = create(str(tmp_path / ('prefix' if limit else 'full')), files)
+    report = FileTaskRunner(project, [MetaTask(limit)], None, None, None,
+                            ScrabTaskManager()).run_tasks()
+    return (report['TextRecorder'], report['.files'])
+
+
+files = {
+    'utf8.txt': 'Café über\r\n'.encode() * 500,
+    # valid UTF-8 up to a late iso-8859-15 byte
+    'late.txt': 'Café\n'.encode() * 1000 + b'\xa4\n',
+    'early.txt': b'\xe4' + b'x' * 5000,
+    'short.txt': 'Café'.encode(),
+    'cut.txt': b'x' * 9 + '€'.encode() + b'\xff',
+}
+
+
+@pytest.mark.parametrize('limit', [1, 10, 100])
+def test_prefix_reads_match_full_reads(tmp_path, limit):
+    full, full_statistics = read(tmp_path, files, None)
+    prefix, prefix_statistics = read(tmp_path, files, limit)
+
+    for name in files:
+        assert len(prefix[name]) >= min(limit, len(full[name]))
+        assert full[name].startswith(prefix[name])
+    assert full['late.txt'].startswith('CafÃ©')
+    assert prefix_statistics == full_statistics == {'fallbacks': 3,
+                                                    'binaries': 0}
+
+
+def test_shards_pass_back_partial_results(tmp_path):
+    project = create(str(tmp_path / 'project'), files)
+    shards = []
+    for index in range(3):
+        runner = FileTaskRunner(project, [MetaTask(None)], None, None, None,
+                                ScrabTaskManager(), (index, 3))
+        # the shards are passed back from the worker processes
+        shards.append(pickle.loads(pickle.dumps(runner.run_shard())))
+
+    for partials, entries, statistics in shards:
+        assert all(isinstance(partials[task_name], dict)
+                   for task_name in partials)
+
+    merged = FileTaskRunner(project, [MetaTask(None)], None, None, None,
+                            ScrabTaskManager()).merge_shards(shards)
+    full, statistics = read(tmp_path, files, None)
+    assert merged == {'TextRecorder': full, '.files': statistics}
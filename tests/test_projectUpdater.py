@@ -0,0 +1,86 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from projectUpdater import ProjectUpdater
+
+import projectUpdater
+import threading
+import time
+
+
+class Project:
+
+    def __init__(self, url):
+        self.id = url
+        self.name = url
+        self.url = url
+        self.kind = 'git'
+        self.location = '/nonexistent'
+
+
+class Recorder:
+    """
+    Records when the fake managers update which project
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.most = {}
+        self.started = {}
+
+    def manager(self, project, timeout):
+        recorder = self
+
+        class Manager:
+
+            def update(self):
+                host = projectUpdater.urlsplit(project.url).hostname
+                with recorder.lock:
+                    recorder.started[project.url] = time.monotonic()
+                    recorder.running[host] = recorder.running.get(host, 0) + 1
+                    recorder.most[host] = max(recorder.most.get(host, 0),
+                                              recorder.running[host])
+                time.sleep(0.2)
+                with recorder.lock:
+                    recorder.running[host] -= 1
+                return project.url.endswith('0')
+
+        return Manager()
+
+
+def test_updates_projects_of_free_hosts_first(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(projectUpdater, 'GitProjectManager', recorder.manager)
+    projects = [Project('https://busy.org/r{}'.format(i)) for i in range(4)]
+    projects.append(Project('https://idle.org/r0'))
+
+    start = time.monotonic()
+    updates = ProjectUpdater(projects, 2, 1).run()
+
+    assert sorted(updates) == sorted(p.url for p in projects)
+    assert sum(1 for u in updates.values() if u['changed']) == 2
+    assert recorder.most == {'busy.org': 1, 'idle.org': 1}
+    assert recorder.started['https://idle.org/r0'] - start < 0.1
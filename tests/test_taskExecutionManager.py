@@ -0,0 +1,90 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2017 Roland Jaeger
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+from scrabTaskManager import ScrabTaskManager
+from taskExecutionManager import TaskExecutionManager
+
+import os
+import pytest
+import subprocess
+import taskExecutionManager
+
+
+class GlobalArgs:
+
+    def __init__(self):
+        self.github_token = None
+        self.http_cache = None
+        self.http_cache_ttl = None
+        self.offline = False
+
+
+def git(cwd, *args):
+    subprocess.run(['git'] + list(args), cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def commit(origin, name):
+    with open(os.path.join(origin, name), 'w') as file:
+        file.write('int {};\n'.format(name.replace('.', '_')))
+    git(origin, 'add', name)
+    git(origin, 'commit', '-q', '-m', name)
+
+
+@pytest.fixture
+def origins(tmp_path, monkeypatch):
+    for variable in ('GIT_AUTHOR', 'GIT_COMMITTER'):
+        monkeypatch.setenv(variable + '_NAME', 'a')
+        monkeypatch.setenv(variable + '_EMAIL', 'a@b')
+    # analyse with several worker processes
+    monkeypatch.setattr(taskExecutionManager, 'cpu_count', lambda: 4)
+
+    origins = []
+    for name in ('a', 'b', 'c'):
+        origin = str(tmp_path / 'origin' / name)
+        os.makedirs(origin)
+        git(origin, 'init', '-q')
+        commit(origin, 'first.c')
+        origins.append(origin)
+    return origins
+
+
+def create_report(tmp_path, origins, old_report):
+    return TaskExecutionManager(
+        str(tmp_path / 'data'), ['ProjectDates', 'ProjectMetrics'], [],
+        [{'git': 'file://' + origin} for origin in origins], old_report,
+        True, GlobalArgs(), ScrabTaskManager(), acquisitions=2).create_report()
+
+
+def test_update_commands_are_counted_once(tmp_path, origins):
+    report = create_report(tmp_path, origins, None)
+    commit(origins[0], 'second.c')
+    report = create_report(tmp_path, origins, report)
+
+    # the sizes of the object stores are measured before and after the
+    # updates - only by the main process
+    commands = report['commands']
+    assert commands['git count-objects']['runs'] == 2 * len(origins)
+    assert commands['git ls-remote']['runs'] == len(origins)